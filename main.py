@@ -1,7 +1,13 @@
 from src.config import get_config
 from src.xmlprocessor import XMLProcessor
 from src.texttransformer import TextTransformer
+from src.pipeline import Checkpoint, Pipeline
+from src.checkpoint import CheckpointStore, fingerprint
+from src.memory import BatchSizer, MemoryMonitor, SpillStore
+from src.writer import make_writer
+import argparse
 import logging
+import pandas as pd
 
 # Logging config
 def setup_logging():
@@ -15,31 +21,137 @@ def setup_logging():
     )
     return logging.getLogger(__name__)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parse and transform Berufenet XML extracts")
+    parser.add_argument(
+        "--stages", nargs="+", default=None, choices=["meta", "parse", "transform"],
+        help="stages to run, including the stages they depend on (default: all)"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="run the selected stages even if their checkpoints are up to date"
+    )
+    return parser.parse_args()
+
+def meta_checkpoint(processor):
+    return Checkpoint(
+        fingerprint=processor.meta_fingerprint,
+        outputs=lambda meta_df: [processor.metadata_path()],
+        load=processor.load_metadata,
+    )
+
+def build_pipeline(cfg, writer):
+    processor = XMLProcessor(config=cfg, writer=writer)
+    transformer = TextTransformer(config=cfg, writer=writer)
+
+    def transform(df_dict_raw):
+        if not df_dict_raw:
+            return {}
+        return transformer.run_transformation_pipeline(df_dict_raw)
+
+    checkpoints = None
+    if cfg.params.checkpoints:
+        checkpoints = CheckpointStore(cfg.paths.intermediate_data_dir)
+        checkpoints.load()
+
+    # metadata does not depend on the occupation files, so it runs alongside parsing
+    pipeline = Pipeline(checkpoints=checkpoints, writer=writer, monitor=MemoryMonitor())
+    if cfg.params.memory_budget_mb > 0:
+        return add_budget_stages(pipeline, cfg, processor, transformer)
+    if cfg.params.stream_batch_size > 0:
+        return add_streaming_stages(pipeline, cfg, processor, transformer)
+
+    pipeline.add_stage("meta", processor.run_metaparsing_pipeline, checkpoint=meta_checkpoint(processor))
+    pipeline.add_stage(
+        "parse", processor.run_occparsing_pipeline,
+        checkpoint=Checkpoint(
+            fingerprint=processor.occ_fingerprint,
+            outputs=lambda bfield_dict: [processor.bfield_dict_path()],
+            load=processor.load_bfield_dict,
+        )
+    )
+    pipeline.add_stage(
+        "transform", transform, deps=["parse"],
+        checkpoint=Checkpoint(
+            fingerprint=transformer.fingerprint,
+            outputs=lambda df_dict: [
+                path for b_field in df_dict if transformer.is_requested(b_field)
+                for path in transformer.output_paths(b_field)
+            ],
+            load=transformer.load_transformed,
+        )
+    )
+    return pipeline
+
+def add_streaming_stages(pipeline, cfg, processor, transformer):
+    # parse -> transform as one bounded-memory stream over batches of files, without checkpoints
+    def stream():
+        batches = processor.iter_bfield_batches(cfg.params.stream_batch_size)
+        return transformer.run_transformation_stream(batches)
+
+    pipeline.add_stage("meta", processor.run_metaparsing_pipeline)
+    pipeline.add_stage("transform", stream)
+    return pipeline
+
+def add_budget_stages(pipeline, cfg, processor, transformer):
+    # batch sizes follow the measured memory cost per file and per row; parsed batches wait on disk
+    budget_mb = cfg.params.memory_budget_mb
+    spill = SpillStore(cfg.paths.intermediate_data_dir / "spill")
+    parse_sizer = BatchSizer(
+        budget_mb, initial=cfg.params.parse_chunksize, monitor=pipeline.monitor, name="parse batch"
+    )
+    transform_sizer = BatchSizer(
+        budget_mb, initial=cfg.params.nlp_batch_size, monitor=pipeline.monitor, name="transform chunk"
+    )
+
+    pipeline.add_stage("meta", processor.run_metaparsing_pipeline, checkpoint=meta_checkpoint(processor))
+    pipeline.add_stage(
+        "parse", lambda: processor.run_occparsing_spilled(spill, parse_sizer),
+        checkpoint=Checkpoint(
+            fingerprint=lambda: fingerprint(processor.occ_fingerprint(), "spill"),
+            outputs=lambda spilled: [spilled.root],
+            load=lambda: spill,
+        )
+    )
+    pipeline.add_stage(
+        "transform", lambda spilled: transformer.run_transformation_stream(
+            spilled.iter_batches(), sizer=transform_sizer
+        ),
+        deps=["parse"]
+    )
+    return pipeline
+
 if __name__ == "__main__":
 
+    args = parse_args()
     main_logger = setup_logging()
     main_logger.info("--- Starting ---")
 
+    # copy-on-write for the whole run: the transformation shares unchanged columns with its input frames.
+    # Set once here, since the option is process-wide and stages run on several threads
+    pd.set_option("mode.copy_on_write", True)
+
+    writer = None
     try:
         cfg = get_config()
 
-        main_logger.info(f"Initializing processor for raw data directory: {cfg.paths.raw_data_dir}")
-        processor = XMLProcessor(config=cfg)
-
-        meta_df = processor.run_metaparsing_pipeline()
+        # outputs are written in the background while the next stage runs
+        writer = make_writer(cfg.params.write_queue_size)
 
-        df_dict_raw = processor.run_occparsing_pipeline()
-
-        if df_dict_raw:
-            text_transformer = TextTransformer(config=cfg)
+        main_logger.info(f"Initializing processor for raw data directory: {cfg.paths.raw_data_dir}")
+        pipeline = build_pipeline(cfg, writer)
 
-            df_dict_transformed = text_transformer.run_transformation_pipeline(df_dict_raw)
+        # the pipeline logs the status, runtime and peak RSS of every stage when it ends
+        pipeline.run(args.stages, force=args.force)
 
         # todo instantiate final data sanity checks and run sanity check pipeline
 
     except Exception as e:
         main_logger.critical(f"Critical error in main process: {e}")
 
-
-
-
+    finally:
+        # wait for pending writes before exiting
+        if writer is not None:
+            failures = writer.close()
+            if failures:
+                main_logger.error(f"{len(failures)} output writes failed: {', '.join(label for label, _ in failures)}")
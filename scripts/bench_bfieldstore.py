@@ -0,0 +1,81 @@
+"""Memory of the b-field split: per-field copies ("wide") vs. the long BFieldStore ("long").
+
+Reports the peak and retained memory of the split and the memory added by accessing every field once.
+The texts are created before measuring, so the numbers cover the frames, indexes and value arrays.
+Run from the project root:
+    python -m scripts.bench_bfieldstore --rows 200000 --fields 6
+"""
+import argparse
+import dataclasses
+import gc
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import Config, Paths, Params
+from src.xmlprocessor import XMLProcessor
+
+
+def make_frame(rows: int, bfields: list[str], seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_arrays(
+        [np.arange(rows) // 5, 2020 + np.arange(rows) % 5], names=["dkz_id", "year"]
+    )
+    data = {}
+    for bfield in bfields:
+        # about a tenth of the occupation-years lack each field
+        present = rng.random(rows) > 0.1
+        data[f"{bfield}_revd"] = np.where(present, "2024-01-01", None)
+        data[f"{bfield}_text"] = [f"{bfield} text {i}" if p else None for i, p in enumerate(present)]
+    return pd.DataFrame(data, index=index)
+
+
+def make_processor(bfields: list[str], storage_mode: str) -> XMLProcessor:
+    tmp = Path(".")
+    params = Params(
+        tag_map={bfield: bfield for bfield in bfields},
+        tags_to_extract=bfields,
+        core_input_columns={"id": "dkz_id", "date": "year"},
+        prefix_occdata="beschreibung_beruf_",
+        prefix_metadata="berufe",
+    )
+    params = dataclasses.replace(params, storage_mode=storage_mode)
+    return XMLProcessor(config=Config(paths=Paths(tmp, tmp, tmp, tmp), params=params))
+
+
+def measure(storage_mode: str, df: pd.DataFrame, bfields: list[str]) -> tuple[float, float, float]:
+    processor = make_processor(bfields, storage_mode)
+    gc.collect()
+    tracemalloc.start()
+    split = processor._split_frame(df)
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    frames = [split[bfield] for bfield in split]
+    accessed, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del frames
+    return peak / 2 ** 20, kept / 2 ** 20, (accessed - kept) / 2 ** 20 / len(bfields)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--fields", type=int, default=6)
+    args = parser.parse_args()
+    # as in main.py
+    pd.set_option("mode.copy_on_write", True)
+
+    bfields = [f"b{10 + i}-0" for i in range(args.fields)]
+    df = make_frame(args.rows, bfields)
+
+    print(f"rows: {args.rows}, b-fields: {args.fields}")
+    print(f"{'':<8} {'split peak MiB':>15} {'kept MiB':>9} {'MiB per field access':>21}")
+    for storage_mode in ("wide", "long"):
+        peak, kept, per_access = measure(storage_mode, df, bfields)
+        print(f"{storage_mode:<8} {peak:>15.1f} {kept:>9.1f} {per_access:>21.2f}")
+
+
+if __name__ == "__main__":
+    main()
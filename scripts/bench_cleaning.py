@@ -0,0 +1,83 @@
+"""Micro-benchmark of text cleaning: per-row re.sub lambda vs. TextTransformer._clean_text_columns.
+
+Run from the project root:
+    python -m scripts.bench_cleaning --rows 200000
+"""
+import argparse
+import dataclasses
+import random
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import Config, Paths, Params
+from src.texttransformer import TextTransformer, CLEANING_PATTERN
+
+WORDS = ["Kunden", "beraten,", "Anlagen", "warten;", "Maschinen", "(CNC)", "einrichten", "100%", "Qualität", "prüfen!"]
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choices(WORDS, k=rng.randint(5, 30))) for _ in range(n)]
+    return pd.DataFrame({"b11-2_text": texts})
+
+
+def make_transformer(storage: str) -> TextTransformer:
+    tmp = Path(".")
+    params = Params(
+        tag_map={"b11-2": "Tasks"},
+        tags_to_extract=["b11-2"],
+        core_input_columns={"id": "dkz_id", "date": "year"},
+        prefix_occdata="beschreibung_beruf_",
+        prefix_metadata="berufe",
+    )
+    params = dataclasses.replace(params, string_storage=storage)
+    return TextTransformer(config=Config(paths=Paths(tmp, tmp, tmp, tmp), params=params))
+
+
+def legacy_clean(df: pd.DataFrame) -> pd.DataFrame:
+    df.loc[:, "b11-2_text"] = (
+        df["b11-2_text"].astype(str).apply(lambda text: re.sub(CLEANING_PATTERN, "", text))
+    )
+    return df
+
+
+def timed(func, df: pd.DataFrame, repeat: int) -> tuple[float, pd.DataFrame]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        work = df.copy()
+        start = time.perf_counter()
+        result = func(work)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    legacy_seconds, expected = timed(legacy_clean, df, args.repeat)
+    print(f"{'legacy apply(re.sub)':<28} {legacy_seconds:>8.3f}s {1:>6.2f}x")
+
+    storages = ["python"]
+    try:
+        import pyarrow  # noqa: F401
+        storages.append("pyarrow")
+    except ImportError:
+        pass
+
+    for storage in storages:
+        transformer = make_transformer(storage)
+        seconds, result = timed(lambda work: transformer._clean_text_columns(work, "b11-2"), df, args.repeat)
+        assert result["b11-2_text"].tolist() == expected["b11-2_text"].tolist()
+        print(f"{'vectorized string[' + storage + ']':<28} {seconds:>8.3f}s {legacy_seconds / seconds:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Peak memory of a b-field transformation: former copy-first steps vs. copy-on-write vs. in-place mode.
+
+spaCy is replaced by a stub that returns one shared empty token list, so the numbers cover the frame handling
+(copies, cleaning, deduplication) around the lemmatization.
+Run from the project root:
+    python -m scripts.bench_cow --rows 100000
+"""
+import argparse
+import dataclasses
+import gc
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src.config import Config, Paths, Params
+from src.texttransformer import TextTransformer
+
+B_FIELD = "b11-2"
+WORDS = ["Kunden", "beraten,", "Anlagen", "warten;", "Maschinen", "(CNC)", "einrichten", "100%", "Qualität", "prüfen!"]
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    index = pd.MultiIndex.from_arrays(
+        [np.arange(n) // 10, 2020 + np.arange(n) % 5, np.arange(n) % 10], names=["dkz_id", "year", "task_no"]
+    )
+    texts = [
+        " ".join(rng.choices(WORDS, k=rng.randint(5, 30))) if rng.random() > 0.02 else None
+        for _ in range(n)
+    ]
+    return pd.DataFrame({f"{B_FIELD}_revd": "2024-01-01", f"{B_FIELD}_text": texts}, index=index)
+
+
+def make_transformer(storage: str, inplace: bool = False) -> TextTransformer:
+    tmp = Path(".")
+    params = Params(
+        tag_map={B_FIELD: "Tasks"},
+        tags_to_extract=[B_FIELD],
+        core_input_columns={"id": "dkz_id", "date": "year"},
+        prefix_occdata="beschreibung_beruf_",
+        prefix_metadata="berufe",
+    )
+    params = dataclasses.replace(
+        params, string_storage=storage, lemma_cache_size=0, incremental_transform=False, transform_inplace=inplace
+    )
+    return TextTransformer(config=Config(paths=Paths(tmp, tmp, tmp, tmp), params=params))
+
+
+def legacy_transform(transformer: TextTransformer, df: pd.DataFrame) -> pd.DataFrame:
+    # the former steps: a full copy first, a second frame from dropna and a str copy of the text column
+    with pd.option_context("mode.copy_on_write", False):
+        df_working = df.copy()
+        df_working = df_working.dropna(subset=f"{B_FIELD}_text")
+        df_working = transformer._clean_text_columns(df_working, B_FIELD)
+        codes, uniques = pd.factorize(df_working[f"{B_FIELD}_text"].astype(str))
+        normalized = transformer._normalize_unique(uniques.tolist())
+        df_working[f"{B_FIELD}_normalized"] = [normalized[code] for code in codes]
+        return transformer._textlen(df_working, B_FIELD)
+
+
+def transform(transformer: TextTransformer, df: pd.DataFrame) -> pd.DataFrame:
+    return transformer._transform_field(df, B_FIELD)
+
+
+def measure(func, transformer: TextTransformer, rows: int) -> tuple[float, float, pd.DataFrame]:
+    # peak above the input frame, which is built inside the trace so that in-place mode can free its columns
+    gc.collect()
+    tracemalloc.start()
+    df = make_frame(rows)
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = func(transformer, df)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, (peak - baseline) / 2 ** 20, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--storage", default="python", choices=["python", "pyarrow"])
+    args = parser.parse_args()
+    # as in main.py
+    pd.set_option("mode.copy_on_write", True)
+
+    no_tokens = []
+
+    def normalize(texts, *args, **kwargs):
+        return [no_tokens] * len(texts)
+
+    with patch.object(TextTransformer, "normalize", side_effect=normalize):
+        results = {
+            "copy first (former)": measure(legacy_transform, make_transformer(args.storage), args.rows),
+            "copy-on-write": measure(transform, make_transformer(args.storage), args.rows),
+            "in-place": measure(transform, make_transformer(args.storage, inplace=True), args.rows),
+        }
+
+    expected = results["copy first (former)"][2]
+    for _, _, result in results.values():
+        pd.testing.assert_frame_equal(result, expected)
+
+    print(f"rows: {args.rows}, storage: {args.storage}")
+    print(f"{'':<22} {'seconds':>8} {'peak MiB':>9}")
+    for name, (seconds, peak, _) in results.items():
+        print(f"{name:<22} {seconds:>8.3f} {peak:>9.1f}")
+    legacy_peak = results["copy first (former)"][1]
+    for name in ("copy-on-write", "in-place"):
+        peak = results[name][1]
+        print(f"{name}: saved {legacy_peak - peak:.1f} MiB peak ({1 - peak / legacy_peak:.0%})")
+
+
+if __name__ == "__main__":
+    main()
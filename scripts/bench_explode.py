@@ -0,0 +1,74 @@
+"""Peak memory and runtime of the b11-2 task explosion: DataFrame.explode vs. XMLProcessor.explode_tasks.
+
+Run from the project root on synthetic data or on a parsed b-field dictionary:
+    python -m scripts.bench_explode --occupations 20000
+    python -m scripts.bench_explode --bfield-dict data/intermediate/bfield_dict.pkl
+"""
+import argparse
+import gc
+import pickle
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.xmlprocessor import XMLProcessor
+
+TASK_COL = "b11-2_text"
+
+
+def legacy_explode(df: pd.DataFrame, task_col: str) -> pd.DataFrame:
+    return df.copy().explode(task_col).reset_index(drop=True)
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    index = pd.MultiIndex.from_arrays(
+        [range(n), [2020 + i % 5 for i in range(n)]], names=["dkz_id", "year"]
+    )
+    tasks = [
+        [f"Aufgabe {i}-{j} " + "x" * rng.randint(20, 120) for j in range(rng.randint(0, 25))]
+        for i in range(n)
+    ]
+    return pd.DataFrame({TASK_COL: tasks, "b11-2_revd": "2024-01-01"}, index=index)
+
+
+def measure(func, df: pd.DataFrame) -> tuple[float, float, pd.DataFrame]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(df, TASK_COL)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--occupations", type=int, default=20000)
+    parser.add_argument("--bfield-dict", default=None, help="path to an intermediate bfield_dict.pkl")
+    args = parser.parse_args()
+
+    if args.bfield_dict:
+        with open(args.bfield_dict, "rb") as f:
+            df = pickle.load(f)["b11-2"]
+        if not isinstance(df[TASK_COL].dropna().iloc[0], list):
+            raise SystemExit("b11-2 in this dictionary is already exploded")
+    else:
+        df = make_frame(args.occupations)
+
+    legacy_seconds, legacy_peak, legacy = measure(legacy_explode, df)
+    new_seconds, new_peak, new = measure(XMLProcessor.explode_tasks, df)
+    assert legacy[TASK_COL].reset_index(drop=True).equals(new[TASK_COL].reset_index(drop=True))
+
+    print(f"input rows: {df.shape[0]}, exploded rows: {new.shape[0]}")
+    print(f"{'':<22} {'seconds':>8} {'peak MiB':>9}")
+    print(f"{'DataFrame.explode':<22} {legacy_seconds:>8.3f} {legacy_peak:>9.1f}")
+    print(f"{'explode_tasks':<22} {new_seconds:>8.3f} {new_peak:>9.1f}")
+    print(f"saved {legacy_peak - new_peak:.1f} MiB peak ({1 - new_peak / legacy_peak:.0%})")
+
+
+if __name__ == "__main__":
+    main()
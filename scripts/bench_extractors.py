@@ -0,0 +1,130 @@
+"""Runtime of the b-field text extractors: former recursive versions vs. the extractors of each XML backend.
+
+Synthetic b-fields: deeply nested markup and list-heavy task lists (nested lists, markup, excluded tags).
+Every extractor result is checked against the former implementation. Run from the project root:
+    python -m scripts.bench_extractors --depth 800 --items 2000
+Deep items (e.g. --depth 20000) show the cost of copying an item's text at every level.
+"""
+import argparse
+import random
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+from src.xmlbackend import LxmlBackend, StdlibBackend, lxml_etree
+
+EXCLUDE = ["note"]
+
+
+def legacy_extract_text(element, exclude_tags=None):
+    exclude_tags = set() if exclude_tags is None else set(exclude_tags)
+    texts = []
+
+    def recurse(elem):
+        if elem.tag in exclude_tags:
+            return ""
+        if elem.text and elem.text.strip():
+            texts.append(elem.text.strip())
+        for child in elem:
+            recurse(child)
+            if child.tail and child.tail.strip():
+                texts.append(child.tail.strip())
+
+    recurse(element)
+    return texts
+
+
+def legacy_extract_text_b110(element, exclude_tags=None):
+    exclude_tags = set() if exclude_tags is None else set(exclude_tags)
+    if element is None or element.tag in exclude_tags:
+        return None
+    return " ".join(text.strip() for text in element.itertext() if text.strip() and text.strip() != "")
+
+
+def legacy_extract_text_b112(element, exclude_tags=None, listitem_tag="listitem"):
+    def recurse(subelement):
+        text = subelement.text or ""
+        for child in subelement:
+            if child.tag == listitem_tag:
+                text += child.tail or ""
+            elif exclude_tags and child.tag in exclude_tags:
+                pass
+            else:
+                text += recurse(child)
+                text += child.tail or ""
+        return text.strip()
+
+    result_list = []
+    for item in element.findall(f".//{listitem_tag}"):
+        list_item_text = recurse(item)
+        if list_item_text:
+            result_list.append(list_item_text)
+    return result_list
+
+
+def nested_xml(depth: int) -> str:
+    # one list item wrapping a chain of inline elements, each with text and tail
+    opening = "".join(f"<i>level {level} " for level in range(depth))
+    closing = "".join(f"</i> tail {level} " for level in reversed(range(depth)))
+    return f"<b11-2><listitem>start {opening}{closing}end</listitem></b11-2>"
+
+
+def list_xml(items: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for i in range(items):
+        markup = rng.choice([
+            "Anlagen <b>warten</b> und  pruefen",
+            "Kunden <i>beraten</i><note>intern</note> nach Vorgabe",
+            "Teile <b>fertigen <i>und</i> montieren</b>",
+            "Unterpunkte <ul><listitem>erste <b>Stufe</b></listitem><listitem>zweite</listitem></ul> danach",
+        ])
+        parts.append(f"<listitem>Aufgabe {i}: {markup} </listitem>")
+    return f"<b11-2>{''.join(parts)}</b11-2>"
+
+
+def run(name: str, element, backend: StdlibBackend, number: int):
+    cases = [
+        ("extract_text", legacy_extract_text, backend.default_extractor),
+        ("extract_text_b110", legacy_extract_text_b110, backend.extractor("b11-0")),
+        ("extract_text_b112", legacy_extract_text_b112, backend.extractor("b11-2")),
+    ]
+    for label, legacy, new in cases:
+        for exclude in (None, frozenset(EXCLUDE)):
+            assert new(element, exclude) == legacy(element, exclude), f"{label} differs on {name}"
+            # alternating repeats, so that load changes on the machine affect both sides alike
+            legacy_seconds = new_seconds = float("inf")
+            for _ in range(7):
+                legacy_seconds = min(legacy_seconds, timeit.timeit(lambda: legacy(element, exclude), number=number))
+                new_seconds = min(new_seconds, timeit.timeit(lambda: new(element, exclude), number=number))
+            print(
+                f"{name:<16} {label:<18} {'exclude' if exclude else '':<8} "
+                f"{legacy_seconds / number * 1e3:>10.3f} {new_seconds / number * 1e3:>10.3f} "
+                f"{legacy_seconds / new_seconds:>7.2f}x"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=800, help="nesting depth")
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    # the former extractors recurse once per level
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 2 * args.depth + 1000))
+
+    print(f"{'input':<16} {'extractor':<18} {'':<8} {'former ms':>10} {'new ms':>10} {'speedup':>8}")
+    for name, xml in (("nested", nested_xml(args.depth)), ("list-heavy", list_xml(args.items))):
+        run(f"{name} stdlib", ET.fromstring(xml), StdlibBackend(), args.number)
+        if lxml_etree is not None:
+            try:
+                element = lxml_etree.fromstring(xml, lxml_etree.XMLParser(huge_tree=True))
+            except lxml_etree.XMLSyntaxError as e:
+                # libxml2 limits the nesting depth even for huge trees
+                print(f"{name + ' lxml':<16} skipped: {e}")
+                continue
+            run(f"{name} lxml", element, LxmlBackend(), args.number)
+
+
+if __name__ == "__main__":
+    main()
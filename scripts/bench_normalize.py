@@ -0,0 +1,63 @@
+"""Throughput of TextTransformer.normalize for different numbers of spaCy processes.
+
+Run from the project root:
+    python -m scripts.bench_normalize --texts 20000 --processes 1 2 4
+"""
+import argparse
+import os
+import random
+import time
+
+import spacy
+
+from src.texttransformer import TextTransformer, SPACY_MODEL, SPACY_EXCLUDE
+
+WORDS = [
+    "Kunden", "beraten", "Anlagen", "warten", "Maschinen", "einrichten", "Aufträge", "bearbeiten",
+    "Material", "prüfen", "Bauteile", "montieren", "Daten", "erfassen", "Rechnungen", "erstellen",
+    "Patienten", "betreuen", "Werkstücke", "fräsen", "Qualität", "sichern", "Pläne", "lesen",
+]
+
+
+def make_texts(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(4, 16))) for _ in range(n)]
+
+
+def load_model(name: str):
+    if name.startswith("blank:"):
+        return spacy.blank(name.split(":", 1)[1])
+    return spacy.load(name, exclude=list(SPACY_EXCLUDE))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=SPACY_MODEL, help="model name or blank:<lang>")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    nlp = load_model(args.model)
+    texts = make_texts(args.texts)
+
+    baseline = None
+    serial_rate = None
+    print(f"{'n_process':>9} {'seconds':>9} {'texts/s':>10} {'speedup':>8}")
+    for n_process in sorted(set(args.processes)):
+        start = time.perf_counter()
+        result = TextTransformer.normalize(texts, nlp=nlp, n_process=n_process, batch_size=args.batch_size)
+        seconds = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = result
+        # output order must not depend on the number of processes
+        assert result == baseline, f"n_process={n_process} changed the output"
+
+        rate = len(texts) / seconds
+        serial_rate = serial_rate or rate
+        print(f"{n_process:>9} {seconds:>9.2f} {rate:>10.0f} {rate / serial_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
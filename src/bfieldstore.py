@@ -0,0 +1,235 @@
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+class BFieldStore(MutableMapping):
+    """All b-fields in one long table keyed by (dkz_id, year, bfield) with text and revd columns.
+
+    The rows of each b-field are contiguous, so indexing by b-field returns a view of its rows as the former
+    per-field frame (``<bfield>_revd``, ``<bfield>_text``, indexed by ``(dkz_id, year)``) without copying them.
+    Assigning a frame, e.g. the exploded b11-2 tasks, stores it as is and drops the field from the long table.
+    Each column has the dtype its b-fields share, e.g. the union of their ``_revd`` categories; a b-field whose
+    dtype differs from it gets its own dtype back on access.
+    """
+
+    FIELD_LEVEL = "bfield"
+    COLUMNS = ["revd", "text"]
+
+    def __init__(
+            self,
+            table: pd.DataFrame,
+            frames: Dict[str, pd.DataFrame] | None = None,
+            dtypes: Dict[str, Dict[str, object]] | None = None
+    ):
+        self._frames: Dict[str, pd.DataFrame] = dict(frames or {})
+        # per b-field dtypes of the columns that differ from the table's, restored on access
+        self._dtypes: Dict[str, Dict[str, object]] = dict(dtypes or {})
+        self._set_table(table)
+
+    @classmethod
+    def from_wide(
+            cls,
+            df: pd.DataFrame,
+            bfields: List[str]
+    ) -> "BFieldStore":
+        # rows of each b-field in df; occupation-years without the b-field are not stored
+        columns, masks = {}, {}
+        for bfield in bfields:
+            text_col, revd_col = f"{bfield}_text", f"{bfield}_revd"
+            if text_col not in df.columns and revd_col not in df.columns:
+                continue
+            columns[bfield] = [df[col] if col in df.columns else None for col in (revd_col, text_col)]
+            mask = np.zeros(df.shape[0], dtype=bool)
+            for series in columns[bfield]:
+                if series is not None:
+                    mask |= series.notna().to_numpy()
+            masks[bfield] = mask
+
+        if not masks:
+            return cls(cls._empty_table(df.index.names))
+
+        # key codes are gathered once, field after field, into preallocated arrays; the key levels are
+        # reused instead of re-factorizing the keys
+        parent_index = df.index
+        if not isinstance(parent_index, pd.MultiIndex):
+            parent_index = pd.MultiIndex.from_arrays([parent_index])
+        counts = [int(mask.sum()) for mask in masks.values()]
+        key_codes = [np.empty(sum(counts), dtype=codes.dtype) for codes in parent_index.codes]
+        start = 0
+        for mask, count in zip(masks.values(), counts):
+            for dest, codes in zip(key_codes, parent_index.codes):
+                dest[start:start + count] = codes[mask]
+            start += count
+
+        # each column keeps the dtype its b-fields share (categoricals are unioned); fields whose dtype
+        # differs from the combined one get it back on access
+        data, dtypes = {}, {}
+        for i, name in enumerate(cls.COLUMNS):
+            sources = [columns[bfield][i] for bfield in masks]
+            data[name] = cls._concat_rows(sources, list(masks.values()), counts)
+            for bfield, source in zip(masks, sources):
+                if source is not None and source.dtype != data[name].dtype:
+                    dtypes.setdefault(bfield, {})[name] = source.dtype
+
+        field_codes = np.repeat(np.arange(len(counts), dtype=np.min_scalar_type(len(counts))), counts)
+        index = pd.MultiIndex(
+            levels=list(parent_index.levels) + [pd.Index(list(masks))],
+            codes=key_codes + [field_codes],
+            names=list(df.index.names) + [cls.FIELD_LEVEL],
+            verify_integrity=False
+        )
+        # typed Series are taken as they are, without inferring a type per column or consolidating them
+        series = {
+            name: pd.Series(values, index=index, dtype=values.dtype, copy=False) for name, values in data.items()
+        }
+        table = pd.DataFrame(series, columns=cls.COLUMNS, copy=False)
+        return cls(table, dtypes=dtypes)
+
+    @staticmethod
+    def _concat_rows(
+            sources: List[pd.Series | None],
+            masks: List[np.ndarray],
+            counts: List[int]
+    ):
+        # the masked rows of every source, one after the other, in the dtype the sources share.
+        # Missing sources become missing values
+        present = [source for source in sources if source is not None]
+        if all(isinstance(source.dtype, pd.CategoricalDtype) for source in present):
+            dtype = union_categoricals(present, ignore_order=True).dtype
+        elif all(source.dtype == present[0].dtype for source in present):
+            dtype = present[0].dtype
+        else:
+            dtype = np.dtype(object)
+        if len(present) < len(sources) and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            # numpy dtypes other than object and float have no missing value
+            dtype = dtype if dtype.kind in "Of" else np.dtype(object)
+
+        if isinstance(dtype, np.dtype):
+            # filled field after field into one preallocated array
+            values = np.empty(sum(counts), dtype=dtype)
+            start = 0
+            for source, mask, count in zip(sources, masks, counts):
+                if source is None:
+                    values[start:start + count] = None if dtype.kind == "O" else np.nan
+                else:
+                    values[start:start + count] = source.to_numpy(dtype=dtype)[mask]
+                start += count
+            return values
+
+        parts = [
+            source.array[mask].astype(dtype, copy=False) if source is not None
+            else pd.array(np.full(count, None, dtype=object)).astype(dtype)
+            for source, mask, count in zip(sources, masks, counts)
+        ]
+        return type(parts[0])._concat_same_type(parts)
+
+    @classmethod
+    def _empty_table(
+            cls,
+            key_names
+    ) -> pd.DataFrame:
+        index = pd.MultiIndex.from_arrays(
+            [[] for _ in list(key_names) + [cls.FIELD_LEVEL]],
+            names=list(key_names) + [cls.FIELD_LEVEL]
+        )
+        return pd.DataFrame(np.empty((0, 2), dtype=object), index=index, columns=cls.COLUMNS)
+
+    def _set_table(
+            self,
+            table: pd.DataFrame
+    ):
+        # (start, stop) row range of every b-field in the table
+        self.table = table
+        position = table.index.names.index(self.FIELD_LEVEL)
+        level, codes = table.index.levels[position], table.index.codes[position]
+        starts = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        if len(codes):
+            starts = np.insert(starts, 0, 0)
+        stops = np.append(starts[1:], len(codes))
+        self._bounds: Dict[str, Tuple[int, int]] = {
+            level[codes[start]]: (int(start), int(stop)) for start, stop in zip(starts, stops)
+        }
+
+    def _table_fields(self) -> List[str]:
+        return [field for field in self._bounds if field not in self._frames]
+
+    def _without_rows(
+            self,
+            bfields: Iterable[str]
+    ) -> pd.DataFrame:
+        # the remaining b-fields are copied once, dropped rows are released
+        keep = [np.arange(start, stop) for field, (start, stop) in self._bounds.items() if field not in bfields]
+        if len(keep) == len(self._bounds):
+            return self.table
+        rows = np.concatenate(keep) if keep else np.empty(0, dtype=np.intp)
+        return self.table.iloc[rows]
+
+    def __getitem__(
+            self,
+            bfield: str
+    ) -> pd.DataFrame:
+        if bfield in self._frames:
+            return self._frames[bfield]
+        if bfield not in self._bounds:
+            raise KeyError(bfield)
+        start, stop = self._bounds[bfield]
+        # a new frame over the same values: assigning a column replaces it in this frame only
+        frame = self.table.iloc[start:stop].copy(deep=False)
+        frame.index = frame.index.droplevel(self.FIELD_LEVEL)
+        frame.columns = [f"{bfield}_{column}" for column in self.COLUMNS]
+        for column, dtype in self._dtypes.get(bfield, {}).items():
+            frame[f"{bfield}_{column}"] = frame[f"{bfield}_{column}"].astype(dtype, copy=False)
+        return frame
+
+    def __setitem__(
+            self,
+            bfield: str,
+            frame: pd.DataFrame
+    ):
+        self._frames[bfield] = frame
+        if bfield in self._bounds:
+            self._set_table(self._without_rows([bfield]))
+
+    def __delitem__(
+            self,
+            bfield: str
+    ):
+        if bfield not in self:
+            raise KeyError(bfield)
+        self._frames.pop(bfield, None)
+        if bfield in self._bounds:
+            self._set_table(self._without_rows([bfield]))
+
+    def __contains__(
+            self,
+            bfield
+    ) -> bool:
+        return bfield in self._frames or bfield in self._bounds
+
+    def __iter__(self) -> Iterator[str]:
+        # snapshot, so fields can be replaced while iterating over the store
+        return iter(self._table_fields() + list(self._frames))
+
+    def __len__(self) -> int:
+        return len(self._table_fields()) + len(self._frames)
+
+    def __repr__(self) -> str:
+        return f"BFieldStore(fields={list(self)}, rows={self.table.shape[0]})"
+
+    def copy(self) -> "BFieldStore":
+        # shallow: the table is replaced, never modified, on assignment. The stored frames are handed out
+        # as they are, so the copy gets its own frame objects in case they are transformed in place
+        frames = {bfield: frame.copy(deep=False) for bfield, frame in self._frames.items()}
+        return BFieldStore(self.table, frames, self._dtypes)
+
+    def select(
+            self,
+            bfields: List[str]
+    ) -> "BFieldStore":
+        table = self._without_rows([field for field in self._bounds if field not in bfields])
+        frames = {bfield: frame for bfield, frame in self._frames.items() if bfield in bfields}
+        dtypes = {bfield: dtypes for bfield, dtypes in self._dtypes.items() if bfield in bfields}
+        return BFieldStore(table, frames, dtypes)
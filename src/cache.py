@@ -0,0 +1,269 @@
+import os
+import json
+import pickle
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
+from src.sources import input_stat, is_streamed, open_input
+
+
+def file_digest(
+        path: str | os.PathLike,
+        chunk_size: int = 1 << 20
+) -> str:
+    # plain file or archive member
+    digest = hashlib.sha256()
+    with open_input(path) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Manifest of parsed input files (size, mtime, content hash) plus their parsed rows."""
+
+    def __init__(
+            self,
+            cache_dir: Path,
+            fingerprint: str,
+            name: str = "occ"
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.manifest_path = Path(cache_dir) / f"{name}_manifest.json"
+        self.rows_path = Path(cache_dir) / f"{name}_rows.pkl"
+        self.fingerprint = fingerprint
+
+        self.manifest: Dict[str, Dict] = {}
+        self.rows: Dict[str, Dict] = {}
+
+        # (size, mtime_ns, digest) of files checked in this run
+        self._current: Dict[str, Tuple[int, int, str | None]] = {}
+
+    def load(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            with open(self.rows_path, "rb") as f:
+                rows = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+            self.logger.warning(f"Ignoring unreadable parse cache. Error: {e}")
+            return
+
+        if manifest.get("fingerprint") != self.fingerprint:
+            self.logger.info("Parser settings changed. Parse cache invalidated")
+            return
+        self.manifest = manifest.get("files", {})
+        self.rows = rows
+
+    def is_current(
+            self,
+            path: str
+    ) -> bool:
+        size, mtime_ns = input_stat(path)
+        entry = self.manifest.get(path)
+        if entry is None or path not in self.rows:
+            self._current[path] = (size, mtime_ns, None)
+            return False
+
+        if entry["size"] == size and entry["mtime_ns"] == mtime_ns:
+            self._current[path] = (size, mtime_ns, entry["sha256"])
+            return True
+
+        if is_streamed(path):
+            # hashing a tar member reopens the archive; its index entry is trusted and the
+            # digest is taken from the bytes read while parsing
+            self._current[path] = (size, mtime_ns, None)
+            return False
+
+        # touched or rewritten: fall back to the content hash
+        digest = file_digest(path)
+        self._current[path] = (size, mtime_ns, digest)
+        if digest == entry["sha256"]:
+            self.manifest[path] = {"size": size, "mtime_ns": mtime_ns, "sha256": digest}
+            return True
+        return False
+
+    def update(
+            self,
+            path: str,
+            row: Dict,
+            digest: str | None = None
+    ):
+        # digest: sha256 of the content, if the caller already read it
+        size, mtime_ns, current_digest = self._current.get(path) or (None, None, None)
+        if size is None:
+            size, mtime_ns = input_stat(path)
+        digest = digest or current_digest
+        if digest is None:
+            digest = file_digest(path)
+        self.manifest[path] = {"size": size, "mtime_ns": mtime_ns, "sha256": digest}
+        self.rows[path] = row
+
+    def prune(
+            self,
+            paths: List[str]
+    ) -> int:
+        keep = set(paths)
+        deleted = [path for path in self.manifest if path not in keep]
+        for path in deleted:
+            del self.manifest[path]
+            self.rows.pop(path, None)
+        return len(deleted)
+
+    def save(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.rows_path, "wb") as f:
+            pickle.dump(self.rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "files": self.manifest}, f)
+
+
+def text_hash(text) -> str:
+    return hashlib.blake2b(str(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TransformStore:
+    """Cleaned and normalized texts of one b-field, keyed by (row key, b-field, revd, text hash)."""
+
+    def __init__(
+            self,
+            cache_dir: Path,
+            b_field: str,
+            fingerprint: str
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.b_field = b_field
+        self.path = Path(cache_dir) / f"transformed_{b_field}.pkl"
+        self.fingerprint = fingerprint
+        self.entries: Dict[Tuple, Tuple] = {}
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                stored = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            self.logger.warning(f"Ignoring unreadable transform store '{self.path}'. Error: {e}")
+            return
+
+        if stored.get("fingerprint") != self.fingerprint:
+            self.logger.info(f"Transformation settings changed. Store for {self.b_field} invalidated")
+            return
+        self.entries = stored["entries"]
+
+    def make_keys(
+            self,
+            index,
+            revds,
+            texts
+    ) -> List[Tuple]:
+        return [
+            (idx, self.b_field, revd, text_hash(text))
+            for idx, revd, text in zip(index, revds, texts)
+        ]
+
+    def prune(
+            self,
+            keys: List[Tuple]
+    ):
+        keep = set(keys)
+        self.entries = {key: value for key, value in self.entries.items() if key in keep}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            pickle.dump(
+                {"fingerprint": self.fingerprint, "entries": self.entries},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+
+
+class LemmaCache:
+    """Size-bounded, persistent LRU cache of normalized token lists, keyed by (namespace, text hash)."""
+
+    def __init__(
+            self,
+            cache_dir: Path,
+            namespace: str,
+            max_entries: int,
+            name: str = "lemma_cache"
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path = Path(cache_dir) / f"{name}.pkl"
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, List[str]] = OrderedDict()
+        # entries put since the last pop_added, handed from worker processes to the parent
+        self.added: Dict[str, List[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return text_hash(f"{self.namespace}\x00{text}")
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                self.entries = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            self.logger.warning(f"Ignoring unreadable lemma cache '{self.path}'. Error: {e}")
+
+    def get_many(
+            self,
+            texts: List[str]
+    ) -> List[List[str] | None]:
+        results = []
+        for text in texts:
+            key = self._key(text)
+            tokens = self.entries.get(key)
+            if tokens is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            results.append(tokens)
+        return results
+
+    def put_many(
+            self,
+            texts: List[str],
+            normalized: List[List[str]]
+    ):
+        for text, tokens in zip(texts, normalized):
+            key = self._key(text)
+            self.entries[key] = tokens
+            self.entries.move_to_end(key)
+            self.added[key] = tokens
+        self._evict()
+
+    def pop_added(self) -> Dict[str, List[str]]:
+        added, self.added = self.added, {}
+        return added
+
+    def merge(
+            self,
+            entries: Dict[str, List[str]]
+    ):
+        # keys are already namespaced hashes, e.g. from another process's pop_added
+        for key, tokens in entries.items():
+            self.entries[key] = tokens
+            self.entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        self._evict()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
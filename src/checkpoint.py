@@ -0,0 +1,88 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List
+from src.sources import input_name, input_stat
+
+
+def fingerprint(*parts) -> str:
+    # parts must be JSON-serializable; paths and other objects are stringified
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_stats(paths: Iterable[str | os.PathLike]) -> List[tuple]:
+    # (name, size, mtime) of the inputs, plain files or archive members: cheap to compute, changes with every rewrite
+    return [(input_name(path), *input_stat(path)) for path in sorted(str(p) for p in paths)]
+
+
+class CheckpointStore:
+    """Fingerprint and output paths of each completed pipeline stage, kept in ``checkpoints.json``.
+
+    A checkpoint is valid while the stage's fingerprint is unchanged and all outputs recorded with it still exist.
+    """
+
+    def __init__(
+            self,
+            checkpoint_dir: Path,
+            name: str = "checkpoints"
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path = Path(checkpoint_dir) / f"{name}.json"
+        self.entries: Dict[str, Dict] = {}
+        # stages record and invalidate from pipeline and writer threads
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint file '{self.path}'. Error: {e}")
+
+    def is_valid(
+            self,
+            stage: str,
+            stage_fingerprint: str
+    ) -> bool:
+        entry = self.entries.get(stage)
+        if entry is None or entry["fingerprint"] != stage_fingerprint:
+            return False
+        return all(Path(output).exists() for output in entry["outputs"])
+
+    def record(
+            self,
+            stage: str,
+            stage_fingerprint: str,
+            outputs: Iterable[str | os.PathLike]
+    ):
+        with self._lock:
+            self.entries[stage] = {
+                "fingerprint": stage_fingerprint,
+                "outputs": [str(output) for output in outputs],
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._save()
+        self.logger.info(f"Recorded checkpoint for stage '{stage}'")
+
+    def invalidate(
+            self,
+            stage: str
+    ):
+        with self._lock:
+            if self.entries.pop(stage, None) is not None:
+                self._save()
+
+    def _save(self):
+        # write-then-rename, so an interrupted run never leaves a truncated file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
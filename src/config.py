@@ -1,5 +1,6 @@
+import os
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # ----------- PATHS -----------
 
@@ -21,6 +22,29 @@ class Params:
     core_input_columns: dict[str, str]
     prefix_occdata: str
     prefix_metadata: str
+    parse_workers: int = 1
+    parse_chunksize: int = 32
+    incremental_parsing: bool = False
+    incremental_transform: bool = False
+    spacy_model: str = "de_core_news_lg"
+    spacy_exclude: tuple[str, ...] = ("parser", "ner")
+    nlp_n_process: int = 1
+    nlp_batch_size: int = 256
+    field_workers: int = 1
+    lemma_cache_size: int = 0
+    cleaning_rules: dict[str, list[tuple[str, str]]] = field(default_factory=dict)
+    string_storage: str = "auto"
+    compact_tokens: bool = False
+    storage_mode: str = "wide"
+    output_format: str = "pickle"
+    export_csv: bool = True
+    optimize_dtypes: bool = False
+    write_queue_size: int = 0
+    checkpoints: bool = False
+    stream_batch_size: int = 0
+    memory_budget_mb: int = 0
+    transform_inplace: bool = False
+    xml_backend: str = "stdlib"
     
 @dataclass(frozen=True)
 class Config:
@@ -69,7 +93,27 @@ def get_config(base_dir: Path = BASE_DIR) -> Config:
             "text_long": "b11-2_text"
             },
         prefix_occdata = "beschreibung_beruf_",
-        prefix_metadata = "berufe"
+        prefix_metadata = "berufe",
+        parse_workers = max(1, (os.cpu_count() or 1) - 1),
+        parse_chunksize = 32,
+        incremental_parsing = True,
+        incremental_transform = True,
+        spacy_model = "de_core_news_lg",
+        spacy_exclude = ("parser", "ner"),
+        nlp_n_process = max(1, (os.cpu_count() or 1) - 1),
+        nlp_batch_size = 512,
+        field_workers = max(1, (os.cpu_count() or 1) - 1),
+        lemma_cache_size = 500_000,
+        cleaning_rules = {},
+        string_storage = "auto",
+        compact_tokens = False,
+        storage_mode = "wide",
+        output_format = "parquet",
+        export_csv = False,
+        optimize_dtypes = True,
+        write_queue_size = 2,
+        checkpoints = True,
+        xml_backend = "auto"
         )
     
     return Config(paths=paths, params=params)
@@ -0,0 +1,87 @@
+import logging
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ID_COLUMNS = ("dkz_id", "nf_dkz_id", "vg_dkz_id", "fuenfsteller", "nf_fuenfsteller", "vg_fuenfsteller")
+YEAR_COLUMNS = ("year",)
+META_CATEGORY_COLUMNS = ("qualistufe", "bkgr", "reglementiert")
+
+
+def resolve_string_storage(storage: str) -> str:
+    # "auto" prefers Arrow-backed strings, whose regex replace runs in C++
+    if storage != "auto":
+        return storage
+    try:
+        import pyarrow  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "python"
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def _narrow_int(values):
+    # smallest signed int dtype holding all values, nullable ints stay nullable
+    if not pd.api.types.is_integer_dtype(values.dtype) or len(values) == 0:
+        return values
+    nullable = isinstance(values.dtype, pd.api.extensions.ExtensionDtype)
+    low, high = values.min(), values.max()
+    if pd.isna(low):
+        return values
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            target = pd.api.types.pandas_dtype(dtype.__name__.capitalize()) if nullable else dtype
+            return values.astype(target)
+    return values
+
+
+def _optimize_column(
+        series: pd.Series,
+        name: str,
+        category_cols: Iterable[str],
+        string_dtype: pd.StringDtype
+) -> pd.Series:
+    if name in ID_COLUMNS or name in YEAR_COLUMNS or name.endswith("_len"):
+        return _narrow_int(series)
+    if name.endswith("_revd") or name in category_cols:
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "string":
+        return series.astype(string_dtype)
+    return series
+
+
+def optimize_dtypes(
+        df: pd.DataFrame,
+        stage: str,
+        category_cols: Iterable[str] = (),
+        string_storage: str = "python"
+) -> pd.DataFrame:
+    """Narrow ids/years, categorize revd and code fields, store plain text as a pandas string dtype."""
+    if df is None or df.empty:
+        return df
+    before = memory_mb(df)
+    string_dtype = pd.StringDtype(string_storage)
+    category_cols = set(category_cols)
+
+    data = {
+        col: _optimize_column(df[col], str(col), category_cols, string_dtype)
+        for col in df.columns
+    }
+    optimized = pd.DataFrame(data, index=df.index, columns=df.columns)
+
+    if isinstance(df.index, pd.MultiIndex):
+        optimized.index = df.index.set_levels([
+            _narrow_int(level) if level.name in ID_COLUMNS + YEAR_COLUMNS else level
+            for level in df.index.levels
+        ])
+    elif df.index.name in ID_COLUMNS + YEAR_COLUMNS:
+        optimized.index = _narrow_int(df.index)
+
+    logger.info(f"Optimized dtypes after {stage}: {before:.1f} MB -> {memory_mb(optimized):.1f} MB")
+    return optimized
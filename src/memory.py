@@ -0,0 +1,305 @@
+import os
+import sys
+import shutil
+import logging
+import pickle
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import pandas as pd
+from src.bfieldstore import BFieldStore
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:  # optional, measures memory where there is no /proc, e.g. on Windows
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# finding child processes reads every process's status, so the list is refreshed at most this often
+_CHILD_SCAN_INTERVAL = 0.5
+_child_scan: Tuple[float, List[int]] = (float("-inf"), [])
+
+
+def _proc_rss_mb(pid: int | str = "self") -> float | None:
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _proc_descendants(pid: int) -> List[int]:
+    parents = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat", "rb") as f:
+                stat = f.read()
+            # the field after the parenthesized command name is the state, then the parent pid
+            parents[int(entry.name)] = int(stat[stat.rindex(b")") + 2:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    descendants, frontier = [], {pid}
+    while frontier:
+        frontier = {child for child, parent in parents.items() if parent in frontier}
+        descendants.extend(frontier)
+    return descendants
+
+
+def _child_pids() -> List[int]:
+    # worker pools of this process, e.g. parse workers and spaCy processes
+    global _child_scan
+    scanned_at, pids = _child_scan
+    now = time.monotonic()
+    if now - scanned_at >= _CHILD_SCAN_INTERVAL:
+        if psutil is not None:
+            pids = [child.pid for child in psutil.Process().children(recursive=True)]
+        else:
+            pids = _proc_descendants(os.getpid())
+        _child_scan = (now, pids)
+    return pids
+
+
+def rss_measurable() -> bool:
+    """Whether ``rss_mb`` can measure memory on this platform."""
+    return psutil is not None or _proc_rss_mb() is not None or resource is not None
+
+
+def rss_mb(children: bool = False) -> float:
+    """Resident set size of this process in MiB, with ``children`` including that of its child processes.
+
+    Pages shared between the processes, e.g. after a fork, are counted once per process. Returns 0.0 if
+    ``rss_measurable`` is False.
+    """
+    if psutil is not None:
+        total = psutil.Process().memory_info().rss
+        for pid in _child_pids() if children else []:
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                # exited since the last scan
+                continue
+        return total / 2 ** 20
+
+    current = _proc_rss_mb()
+    if current is not None:
+        if children:
+            current += sum(filter(None, (_proc_rss_mb(pid) for pid in _child_pids())))
+        return current
+
+    if resource is None:
+        return 0.0
+    # no procfs: the peak so far is the best available estimate (KiB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if children:
+        # peak of the largest terminated child
+        peak += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+@dataclass
+class MemoryWindow:
+    start_mb: float
+    peak_mb: float
+
+    @property
+    def growth_mb(self) -> float:
+        return max(self.peak_mb - self.start_mb, 0.0)
+
+
+class MemoryMonitor:
+    """Samples the RSS of the process and its child processes on a background thread while at least one
+    measurement window is open.
+
+    Windows opened concurrently, e.g. by pipeline stages running side by side, all see the RSS of the whole
+    process tree. With ``children=False``, only this process is measured.
+    """
+
+    def __init__(
+            self,
+            interval: float = 0.02,
+            children: bool = True
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.interval = interval
+        self.children = children
+        self._windows: List[MemoryWindow] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def current_mb(self) -> float:
+        return rss_mb(self.children)
+
+    def open(self) -> MemoryWindow:
+        current = self.current_mb()
+        window = MemoryWindow(start_mb=current, peak_mb=current)
+        with self._lock:
+            self._windows.append(window)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample, name="rss-monitor", daemon=True)
+                self._thread.start()
+        return window
+
+    def close(
+            self,
+            window: MemoryWindow
+    ) -> MemoryWindow:
+        # one last sample, so windows shorter than the interval still see their end state
+        self._update(self.current_mb())
+        with self._lock:
+            self._windows.remove(window)
+        return window
+
+    @contextmanager
+    def measure(self) -> Iterator[MemoryWindow]:
+        window = self.open()
+        try:
+            yield window
+        finally:
+            self.close(window)
+
+    def _update(
+            self,
+            current: float
+    ):
+        with self._lock:
+            for window in self._windows:
+                window.peak_mb = max(window.peak_mb, current)
+
+    def _sample(self):
+        while True:
+            with self._lock:
+                if not self._windows:
+                    return
+            self._update(self.current_mb())
+            time.sleep(self.interval)
+
+
+class BatchSizer:
+    """Picks the number of items of the next batch from the measured memory cost per item and the free budget.
+
+    Each batch runs between ``start`` and ``stop``; its cost is the RSS growth during the batch divided by its size.
+    The next batch gets ``safety`` times the remaining budget, at the highest cost of the last few batches.
+    """
+
+    def __init__(
+            self,
+            budget_mb: float,
+            initial: int,
+            minimum: int = 1,
+            maximum: int | None = None,
+            safety: float = 0.5,
+            monitor: MemoryMonitor | None = None,
+            name: str = "batch"
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.budget_mb = budget_mb
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.safety = safety
+        self.monitor = monitor or MemoryMonitor()
+        self.name = name
+        if not rss_measurable():
+            # the budget would not limit anything
+            raise ImportError(
+                "A memory budget requires psutil on platforms without /proc. Install it with 'pip install psutil'"
+            )
+        self.costs = deque(maxlen=3)
+        self._window: MemoryWindow | None = None
+        self._over_budget = False
+
+    def headroom_mb(self) -> float:
+        return self.budget_mb - self.monitor.current_mb()
+
+    def next_size(self) -> int:
+        headroom = self.headroom_mb()
+        cost = max(self.costs, default=0.0)
+        if headroom <= 0:
+            size = self.minimum
+        elif cost <= 0:
+            # no measurable growth yet
+            size = self.initial
+        else:
+            size = int(self.safety * headroom / cost)
+        if (size < self.minimum or headroom <= 0) and not self._over_budget:
+            # once per sizer, the size is recomputed for every batch
+            self._over_budget = True
+            self.logger.warning(
+                f"{self.name}: {self.budget_mb - headroom:.0f} MiB in use of a {self.budget_mb:.0f} MiB budget, "
+                f"continuing with the minimum size {self.minimum}"
+            )
+        size = max(size, self.minimum)
+        return min(size, self.maximum) if self.maximum else size
+
+    def start(self):
+        self._window = self.monitor.open()
+
+    def stop(
+            self,
+            n_items: int
+    ):
+        window, self._window = self._window, None
+        if window is None:
+            return
+        self.monitor.close(window)
+        if n_items > 0:
+            self.costs.append(window.growth_mb / n_items)
+
+    @contextmanager
+    def batch(
+            self,
+            n_items: int
+    ) -> Iterator[None]:
+        self.start()
+        try:
+            yield
+        finally:
+            self.stop(n_items)
+
+
+class SpillStore:
+    """Finished batches of b-field frames pickled to ``part-NNNNN.pkl`` files, read back one at a time."""
+
+    def __init__(
+            self,
+            root: Path
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.root = Path(root)
+
+    def clear(self):
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def parts(self) -> List[Path]:
+        return sorted(self.root.glob("part-*.pkl"))
+
+    def __len__(self) -> int:
+        return len(self.parts())
+
+    def append(
+            self,
+            bfield_dict: Dict[str, pd.DataFrame] | BFieldStore
+    ) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"part-{len(self):05d}.pkl"
+        with open(path, "wb") as f:
+            pickle.dump(bfield_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    def iter_batches(self) -> Iterator[Dict[str, pd.DataFrame] | BFieldStore]:
+        for path in self.parts():
+            with open(path, "rb") as f:
+                yield pickle.load(f)
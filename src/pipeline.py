@@ -0,0 +1,315 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+from src.checkpoint import CheckpointStore, fingerprint
+from src.memory import MemoryMonitor
+from src.writer import SyncWriter
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+CACHED = "cached"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """How to fingerprint a stage's settings and inputs, list its outputs and load them back instead of re-running."""
+    fingerprint: Callable[[], str]
+    outputs: Callable[[Any], List[Path]]
+    load: Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A pipeline step; ``func`` is called with the results of ``deps`` in that order."""
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    checkpoint: Checkpoint | None = None
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str = PENDING
+    seconds: float | None = None
+    value: Any = field(default=None, repr=False)
+    error: BaseException | None = None
+    peak_rss_mb: float | None = None
+
+
+class Pipeline:
+    """Runs stages as soon as their dependencies are done, independent stages concurrently on threads.
+
+    With a ``CheckpointStore``, stages with a valid checkpoint are not run. Their outputs are only loaded
+    if a stage that has to run depends on them. With a ``MemoryMonitor``, the peak RSS of the process while a stage
+    runs is recorded in its result.
+    """
+
+    def __init__(
+            self,
+            max_workers: int | None = None,
+            checkpoints: CheckpointStore | None = None,
+            writer: SyncWriter | None = None,
+            monitor: MemoryMonitor | None = None
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_workers = max_workers
+        self.checkpoints = checkpoints
+        # checkpoints are recorded through the stages' output writer, after their outputs
+        self.writer = writer
+        self.monitor = monitor
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, StageResult] = {}
+        self.fingerprints: Dict[str, str | None] = {}
+
+    def add_stage(
+            self,
+            name: str,
+            func: Callable[..., Any],
+            deps: Iterable[str] = (),
+            checkpoint: Checkpoint | None = None
+    ) -> Stage:
+        # dependencies must be declared first, which keeps the graph acyclic
+        deps = tuple(deps)
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already declared")
+        unknown = [dep for dep in deps if dep not in self.stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on undeclared stages: {unknown}")
+        self.stages[name] = Stage(name, func, deps, checkpoint)
+        return self.stages[name]
+
+    def select(
+            self,
+            targets: Iterable[str] | None = None
+    ) -> List[str]:
+        # requested stages plus everything they depend on, in declaration order
+        if targets is None:
+            return list(self.stages)
+        selected = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'. Declared stages: {list(self.stages)}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.stages[name].deps)
+        return [name for name in self.stages if name in selected]
+
+    def _compute_fingerprints(
+            self,
+            selected: List[str]
+    ) -> Dict[str, str | None]:
+        # a stage's fingerprint covers its own settings and inputs and those of its dependencies
+        fingerprints = {}
+        for name in selected:
+            stage = self.stages[name]
+            dep_fingerprints = [fingerprints[dep] for dep in stage.deps]
+            if stage.checkpoint is None or None in dep_fingerprints:
+                fingerprints[name] = None
+            else:
+                fingerprints[name] = fingerprint(name, stage.checkpoint.fingerprint(), dep_fingerprints)
+        return fingerprints
+
+    def _is_cached(
+            self,
+            name: str,
+            unloadable: Set[str] = frozenset()
+    ) -> bool:
+        stage_fingerprint = self.fingerprints.get(name)
+        return (
+            name not in unloadable
+            and self.checkpoints is not None
+            and stage_fingerprint is not None
+            and self.checkpoints.is_valid(name, stage_fingerprint)
+        )
+
+    def _plan(
+            self,
+            targets: List[str],
+            unloadable: Set[str] = frozenset()
+    ) -> Tuple[Set[str], Set[str], Set[str]]:
+        # walk back from the targets: stop at valid checkpoints, load them only if a running stage needs them
+        to_run, to_load, cached = set(), set(), set()
+
+        def require(name: str, as_input: bool):
+            if name in to_run:
+                return
+            if self._is_cached(name, unloadable):
+                cached.add(name)
+                if as_input:
+                    to_load.add(name)
+                return
+            to_run.add(name)
+            for dep in self.stages[name].deps:
+                require(dep, True)
+
+        for target in targets:
+            require(target, False)
+        return to_run, to_load, cached
+
+    def run(
+            self,
+            targets: Iterable[str] | None = None,
+            force: bool = False
+    ) -> Dict[str, StageResult]:
+        selected = self.select(targets)
+        targets = selected if targets is None else [name for name in selected if name in targets]
+        self.fingerprints = self._compute_fingerprints(selected)
+        if force:
+            to_run, to_load, cached = set(selected), set(), set()
+        else:
+            to_run, to_load, cached = self._plan(targets)
+
+        self.results = {name: StageResult(name) for name in selected if name in to_run | cached}
+        for name in cached - to_load:
+            self.results[name].status = CACHED
+        self.logger.info(
+            f"Running stages: {[n for n in selected if n in to_run]}, "
+            f"up to date: {[n for n in selected if n in cached]}"
+        )
+
+        pending = [name for name in selected if name in to_run | to_load]
+        running = {}
+        unloadable = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(pending) or 1) as executor:
+            while pending or running:
+                for name in list(pending):
+                    if name in to_load:
+                        pending.remove(name)
+                        self.results[name].status = RUNNING
+                        running[executor.submit(self._load_stage, self.stages[name])] = name
+                        continue
+                    stage = self.stages[name]
+                    dep_status = [self.results[dep].status for dep in stage.deps]
+                    if any(status in (FAILED, SKIPPED) for status in dep_status):
+                        pending.remove(name)
+                        self.results[name].status = SKIPPED
+                        self.logger.warning(f"Skipped stage '{name}': a dependency did not complete")
+                    elif all(status in (DONE, CACHED) for status in dep_status):
+                        pending.remove(name)
+                        inputs = [self.results[dep].value for dep in stage.deps]
+                        self.results[name].status = RUNNING
+                        running[executor.submit(self._run_stage, stage, inputs)] = name
+
+                if running:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        if name in to_load and self.results[name].status != CACHED:
+                            pending.extend(self._replan_unloadable(name, to_run, to_load, unloadable))
+
+        self.logger.info(f"Stage summary: {self.summary()}")
+        return self.results
+
+    def _replan_unloadable(
+            self,
+            name: str,
+            to_run: Set[str],
+            to_load: Set[str],
+            unloadable: Set[str]
+    ) -> List[str]:
+        # a checkpoint that cannot be loaded (corrupt file, objects pickled by older code) is treated as
+        # missing: the stage runs again, with its dependencies run or loaded as needed
+        self.logger.warning(f"Running stage '{name}' again instead of loading its checkpoint")
+        unloadable.add(name)
+        to_load.discard(name)
+        run_now, load_now, _ = self._plan([name], unloadable)
+        added = []
+        for stage_name in self.stages:
+            if stage_name in run_now - to_run or stage_name in load_now - to_load:
+                # also resets dependencies that were up to date but not loaded so far
+                self.results[stage_name] = StageResult(stage_name)
+                added.append(stage_name)
+        to_run |= run_now
+        to_load |= load_now
+        return added
+
+    def _run_stage(
+            self,
+            stage: Stage,
+            inputs: List[Any]
+    ):
+        result = self.results[stage.name]
+        stage_fingerprint = self.fingerprints.get(stage.name)
+        if self.checkpoints is not None:
+            # outputs are rewritten now, the old checkpoint no longer describes them
+            self.checkpoints.invalidate(stage.name)
+        failures_before = len(self.writer.failures) if self.writer is not None else 0
+
+        self.logger.info(f"Started stage '{stage.name}'")
+        window = self.monitor.open() if self.monitor is not None else None
+        start = time.perf_counter()
+        try:
+            result.value = stage.func(*inputs)
+            result.status = DONE
+        except Exception as e:
+            result.error = e
+            result.status = FAILED
+            self.logger.error(f"Stage '{stage.name}' failed. Error: {e}")
+        finally:
+            result.seconds = time.perf_counter() - start
+            if window is not None:
+                result.peak_rss_mb = self.monitor.close(window).peak_mb
+        self.logger.info(f"Finished stage '{stage.name}' ({result.status}) in {result.seconds:.1f} s")
+
+        if result.status == DONE and self.checkpoints is not None and stage_fingerprint is not None:
+            outputs = stage.checkpoint.outputs(result.value)
+            if self.writer is not None:
+                # queued behind the stage's own writes, so it is only recorded once they are on disk
+                self.writer.submit(
+                    f"{stage.name} checkpoint", self._record_checkpoint,
+                    stage.name, stage_fingerprint, outputs, failures_before
+                )
+            else:
+                self._record_checkpoint(stage.name, stage_fingerprint, outputs, failures_before)
+
+    def _record_checkpoint(
+            self,
+            name: str,
+            stage_fingerprint: str,
+            outputs: List[Path],
+            failures_before: int
+    ):
+        if self.writer is not None and len(self.writer.failures) > failures_before:
+            self.logger.warning(f"No checkpoint recorded for stage '{name}': output writes failed")
+            return
+        self.checkpoints.record(name, stage_fingerprint, outputs)
+
+    def _load_stage(
+            self,
+            stage: Stage
+    ):
+        result = self.results[stage.name]
+        start = time.perf_counter()
+        try:
+            result.value = stage.checkpoint.load()
+            result.status = CACHED
+            self.logger.info(f"Loaded stage '{stage.name}' from its checkpoint")
+        except Exception as e:
+            # the stage stays running until the pipeline has planned its re-run
+            result.error = e
+            self.logger.warning(f"Loading the checkpoint of stage '{stage.name}' failed. Error: {e}")
+        finally:
+            result.seconds = time.perf_counter() - start
+
+    def status(self) -> Dict[str, str]:
+        return {name: result.status for name, result in self.results.items()}
+
+    def summary(self) -> str:
+        def details(result: StageResult) -> str:
+            parts = []
+            if result.seconds is not None:
+                parts.append(f"{result.seconds:.1f} s")
+            if result.peak_rss_mb is not None:
+                parts.append(f"peak RSS {result.peak_rss_mb:.0f} MiB")
+            return f" ({', '.join(parts)})" if parts else ""
+
+        return ", ".join(f"{name}={result.status}{details(result)}" for name, result in self.results.items())
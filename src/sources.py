@@ -0,0 +1,234 @@
+import os
+import logging
+import tarfile
+import threading
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# archive members are addressed as "<archive path>!/<member name>"
+MEMBER_SEPARATOR = "!/"
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+def archive_kind(path: str | os.PathLike) -> str | None:
+    name = os.fspath(path).lower()
+    if name.endswith(ZIP_SUFFIXES):
+        return "zip"
+    if name.endswith(TAR_SUFFIXES):
+        return "tar"
+    return None
+
+
+def member_locator(
+        archive: str | os.PathLike,
+        member: str
+) -> str:
+    return f"{os.fspath(archive)}{MEMBER_SEPARATOR}{member}"
+
+
+def split_locator(locator: str | os.PathLike) -> Tuple[str, str | None]:
+    # (path, None) for plain files, (archive path, member name) for archive members
+    locator = os.fspath(locator)
+    archive, sep, member = locator.partition(MEMBER_SEPARATOR)
+    if sep and archive_kind(archive) is not None:
+        return archive, member
+    return locator, None
+
+
+def input_name(locator: str | os.PathLike) -> str:
+    # location-independent name, e.g. for fingerprints
+    path, member = split_locator(locator)
+    name = os.path.basename(path)
+    return f"{name}{MEMBER_SEPARATOR}{member}" if member is not None else name
+
+
+def is_streamed(locator: str | os.PathLike) -> bool:
+    # tar members have no random access and are read in one pass with iter_member_bytes
+    path, member = split_locator(locator)
+    return member is not None and archive_kind(path) == "tar"
+
+
+def _zip_mtime_ns(info: zipfile.ZipInfo) -> int:
+    return int(datetime(*info.date_time).timestamp() * 1_000_000_000)
+
+
+@lru_cache(maxsize=32)
+def _read_archive_index(
+        path: str,
+        size: int,
+        mtime_ns: int
+) -> Dict[str, Tuple[int, int]]:
+    # size and mtime of the archive are part of the cache key, so rewritten archives are listed again
+    if archive_kind(path) == "zip":
+        with zipfile.ZipFile(path) as zf:
+            return {
+                info.filename: (info.file_size, _zip_mtime_ns(info))
+                for info in zf.infolist() if not info.is_dir()
+            }
+    with tarfile.open(path, mode="r:*") as tf:
+        return {
+            member.name: (member.size, int(member.mtime * 1_000_000_000))
+            for member in tf if member.isfile()
+        }
+
+
+def archive_index(path: str | os.PathLike) -> Dict[str, Tuple[int, int]]:
+    """(size, mtime_ns) of every file member of a zip or tar archive."""
+    path = os.fspath(path)
+    stat = os.stat(path)
+    return _read_archive_index(path, stat.st_size, stat.st_mtime_ns)
+
+
+def list_inputs(
+        directory: str | os.PathLike,
+        prefix: str
+) -> List[str]:
+    """Plain files and archive members in ``directory`` whose file name starts with ``prefix``."""
+    inputs = []
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path):
+            continue
+        if archive_kind(filename) is None:
+            if filename.startswith(prefix):
+                inputs.append(path)
+            continue
+        try:
+            members = archive_index(path)
+        except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+            logger.error(f"Could not read archive '{path}'. Error: {e}")
+            continue
+        inputs.extend(
+            member_locator(path, member) for member in members
+            if os.path.basename(member).startswith(prefix)
+        )
+    return inputs
+
+
+def input_stat(locator: str | os.PathLike) -> Tuple[int, int]:
+    path, member = split_locator(locator)
+    if member is None:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    try:
+        return archive_index(path)[member]
+    except KeyError:
+        raise FileNotFoundError(f"No member '{member}' in archive '{path}'") from None
+
+
+# zip files opened by this process; keyed by pid, because forked workers must not share file offsets
+_open_zips: Dict[Tuple[int, str, int], zipfile.ZipFile] = {}
+# number of open archive_session scopes per process; zip files are only kept open inside one
+_zip_sessions: Dict[int, int] = defaultdict(int)
+_zip_lock = threading.Lock()
+
+
+def _reset_zip_lock():
+    # a pool forked while another thread holds the lock would leave the child's copy locked for good
+    global _zip_lock
+    _zip_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_zip_lock)
+
+
+def _zip_file(path: str) -> zipfile.ZipFile:
+    key = (os.getpid(), path, os.stat(path).st_mtime_ns)
+    with _zip_lock:
+        zf = _open_zips.get(key)
+        if zf is None:
+            zf = _open_zips[key] = zipfile.ZipFile(path)
+    return zf
+
+
+def _close_own_zips():
+    # caller holds _zip_lock
+    pid = os.getpid()
+    for key in [key for key in _open_zips if key[0] == pid]:
+        _open_zips.pop(key).close()
+
+
+def close_archives():
+    with _zip_lock:
+        _close_own_zips()
+        _open_zips.clear()
+
+
+def hold_archives():
+    """Keeps the zip files opened by ``open_input`` open until the matching ``release_archives``."""
+    with _zip_lock:
+        _zip_sessions[os.getpid()] += 1
+
+
+def release_archives():
+    """Closes this process's zip files once every ``hold_archives`` has been released."""
+    pid = os.getpid()
+    with _zip_lock:
+        _zip_sessions[pid] -= 1
+        if _zip_sessions[pid] <= 0:
+            del _zip_sessions[pid]
+            _close_own_zips()
+
+
+@contextmanager
+def archive_session() -> Iterator[None]:
+    """Scope in which each zip file is opened once; sessions of concurrent stages share the open files."""
+    hold_archives()
+    try:
+        yield
+    finally:
+        release_archives()
+
+
+@contextmanager
+def open_input(locator: str | os.PathLike) -> Iterator[BinaryIO]:
+    """Binary stream of a plain file or an archive member."""
+    path, member = split_locator(locator)
+    if member is None:
+        with open(path, "rb") as f:
+            yield f
+    elif archive_kind(path) == "zip":
+        with _zip_lock:
+            in_session = _zip_sessions.get(os.getpid(), 0) > 0
+        if in_session:
+            with _zip_file(path).open(member) as f:
+                yield f
+        else:
+            with zipfile.ZipFile(path) as zf, zf.open(member) as f:
+                yield f
+    else:
+        # random access into a compressed tar decompresses everything before the member
+        with tarfile.open(path, mode="r:*") as tf:
+            f = tf.extractfile(member)
+            if f is None:
+                raise FileNotFoundError(f"No file member '{member}' in archive '{path}'")
+            yield f
+
+
+def iter_member_bytes(locators: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+    """Contents of the given inputs, reading each tar archive in a single sequential pass.
+
+    Plain files and zip members are yielded in the given order, then the members of each tar archive in archive order.
+    """
+    by_tar = defaultdict(set)
+    for locator in locators:
+        if is_streamed(locator):
+            path, member = split_locator(locator)
+            by_tar[path].add(member)
+            continue
+        with open_input(locator) as f:
+            yield locator, f.read()
+
+    for path, members in by_tar.items():
+        with tarfile.open(path, mode="r|*") as tf:
+            for info in tf:
+                if info.isfile() and info.name in members:
+                    yield member_locator(path, info.name), tf.extractfile(info).read()
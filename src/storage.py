@@ -0,0 +1,175 @@
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+# Parquet layout: <root>/bfield=<b-field>/year=<year>/part-*.parquet
+BFIELD_PARTITION = "bfield"
+YEAR_PARTITION = "year"
+INDEX_COLUMNS = ("dkz_id", "year", "task_no")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.fs
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "The parquet output format requires pyarrow. Install it with 'pip install pyarrow'"
+        ) from e
+    return pyarrow
+
+
+def bfield_path(
+        root: Path,
+        bfield: str
+) -> Path:
+    return Path(root) / f"{BFIELD_PARTITION}={bfield}"
+
+
+def write_bfield(
+        df: pd.DataFrame,
+        root: Path,
+        bfield: str,
+        append: bool = False
+) -> Path:
+    pa = _require_pyarrow()
+    path = bfield_path(root, bfield)
+    if path.exists() and not append:
+        shutil.rmtree(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    # index levels (dkz_id, year[, task_no]) become columns, year is the partition key
+    frame = df.reset_index() if any(name is not None for name in df.index.names) else df
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    partition_cols = [YEAR_PARTITION] if YEAR_PARTITION in frame.columns else None
+    pa.parquet.write_to_dataset(
+        table,
+        root_path=str(path),
+        partition_cols=partition_cols,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return path
+
+
+def read_bfield(
+        root: Path,
+        bfield: str,
+        columns: List[str] | None = None,
+        years: List[int] | None = None,
+        memory_map: bool = True,
+        set_index: bool = True
+) -> pd.DataFrame:
+    pa = _require_pyarrow()
+    path = bfield_path(root, bfield)
+    if not path.exists():
+        raise FileNotFoundError(f"No parquet data for b-field '{bfield}' in '{root}'")
+
+    dataset = pa.dataset.dataset(
+        str(path),
+        format="parquet",
+        partitioning="hive",
+        filesystem=pa.fs.LocalFileSystem(use_mmap=memory_map),
+    )
+
+    # keep the index columns when projecting, so the result can be joined back
+    read_columns = None
+    if columns is not None:
+        names = dataset.schema.names
+        read_columns = [c for c in INDEX_COLUMNS if c in names and c not in columns] + list(columns)
+    row_filter = None
+    if years is not None:
+        row_filter = pa.dataset.field(YEAR_PARTITION).isin(list(years))
+
+    df = dataset.to_table(columns=read_columns, filter=row_filter).to_pandas()
+    df = _restore_column_dtypes(df, dataset.schema.pandas_metadata, [YEAR_PARTITION])
+    index_cols = [c for c in INDEX_COLUMNS if c in df.columns]
+    if set_index and index_cols:
+        df = df.sort_values(index_cols, kind="stable").set_index(index_cols)
+    return df
+
+
+def read_order(df: pd.DataFrame) -> np.ndarray:
+    # row positions of df in the order read_bfield returns them, for data kept aligned with the rows
+    frame = df.index.to_frame(index=False) if any(name is not None for name in df.index.names) else df
+    index_cols = [c for c in INDEX_COLUMNS if c in frame.columns]
+    if not index_cols:
+        return np.arange(df.shape[0])
+    order = frame[index_cols].reset_index(drop=True).sort_values(index_cols, kind="stable")
+    return order.index.to_numpy()
+
+
+def read_bfields(
+        root: Path,
+        bfields: List[str] | None = None,
+        **kwargs
+) -> Dict[str, pd.DataFrame]:
+    if bfields is None:
+        prefix = f"{BFIELD_PARTITION}="
+        bfields = sorted(
+            p.name[len(prefix):] for p in Path(root).glob(f"{prefix}*") if p.is_dir()
+        )
+    return {bfield: read_bfield(root, bfield, **kwargs) for bfield in bfields}
+
+
+def write_frame(
+        df: pd.DataFrame,
+        path: Path
+):
+    pa = _require_pyarrow()
+    pa.parquet.write_table(pa.Table.from_pandas(df, preserve_index=True), str(path))
+
+
+def read_frame(
+        path: Path,
+        columns: List[str] | None = None,
+        memory_map: bool = True
+) -> pd.DataFrame:
+    pa = _require_pyarrow()
+    table = pa.parquet.read_table(str(path), columns=columns, memory_map=memory_map)
+    return _restore_index_dtypes(table.to_pandas(), table.schema.pandas_metadata)
+
+
+def _written_dtypes(pandas_metadata: dict | None) -> Dict[str, str]:
+    # pandas dtype of every column and index level when it was written; categoricals record their codes' type
+    if not pandas_metadata:
+        return {}
+    return {
+        column["name"]: column["numpy_type"] for column in pandas_metadata["columns"]
+        if column["name"] and column["pandas_type"] != "categorical"
+    }
+
+
+def _restore_column_dtypes(
+        df: pd.DataFrame,
+        pandas_metadata: dict | None,
+        columns: List[str]
+) -> pd.DataFrame:
+    # partition keys come back with the type inferred from the directory names, e.g. year as int32
+    dtypes = _written_dtypes(pandas_metadata)
+    for column in columns:
+        if column in df.columns and column in dtypes and str(df[column].dtype) != dtypes[column]:
+            df[column] = df[column].astype(dtypes[column])
+    return df
+
+
+def _restore_index_dtypes(
+        df: pd.DataFrame,
+        pandas_metadata: dict | None
+) -> pd.DataFrame:
+    # index levels lose nullable integer dtypes, e.g. the Int64 metadata index comes back as int64
+    dtypes = _written_dtypes(pandas_metadata)
+    levels = [df.index.get_level_values(i) for i in range(df.index.nlevels)]
+    restored = [
+        level.astype(dtypes[level.name]) if level.name in dtypes and str(level.dtype) != dtypes[level.name]
+        else level
+        for level in levels
+    ]
+    if any(new is not old for new, old in zip(restored, levels)):
+        df.index = restored[0] if len(restored) == 1 else pd.MultiIndex.from_arrays(restored)
+    return df
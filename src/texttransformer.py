@@ -1,49 +1,306 @@
-import re
+import json
+import shutil
+import hashlib
 import logging
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
 import pandas as pd
 import spacy
+from src.cache import LemmaCache, TransformStore
+from src.tokens import TokenTable
+from src.checkpoint import fingerprint
+from src.memory import BatchSizer
+from src.storage import bfield_path, read_bfield, read_order, write_bfield
+from src.dtypes import optimize_dtypes, resolve_string_storage
+from src.writer import SyncWriter, make_writer
+
+CLEANING_PATTERN = r"[^a-zA-ZäöüßÄÖÜ ]+"
+# (pattern, replacement) rules for b-fields without an entry in Params.cleaning_rules
+DEFAULT_CLEANING_RULES = ((CLEANING_PATTERN, ""),)
+SPACY_MODEL = "de_core_news_lg"
+# components not needed for lemmas and token flags
+SPACY_EXCLUDE = ("parser", "ner")
+# token filter applied in normalize, part of the lemma cache key
+TOKEN_FILTER = "punct,stop,digit,space,currency,min_len=2"
+
+
+@lru_cache(maxsize=None)
+def load_nlp(
+        model_name: str = SPACY_MODEL,
+        exclude: Tuple[str, ...] = SPACY_EXCLUDE
+):
+    """Loads a spaCy model once per process for each (model, excluded components) pair."""
+    return spacy.load(model_name, exclude=list(exclude))
+
+
+# Per-process transformer used by the b-field worker pool
+_worker_transformer = None
+
+
+def _init_transform_worker(
+        config,
+        n_process: int
+):
+    global _worker_transformer
+    _worker_transformer = TextTransformer(config)
+    # the workers share the spaCy processes of a sequential run
+    _worker_transformer.n_process = n_process
+
+
+def _transform_in_worker(
+        df: pd.DataFrame,
+        b_field: str
+) -> Tuple[pd.DataFrame, TokenTable | None, Tuple[str, Dict[str, List[str]]] | None]:
+    df = _worker_transformer._transform_field(df, b_field)
+    cache = _worker_transformer._lemma_cache
+    lemmas = (cache.namespace, cache.pop_added()) if cache else None
+    return df, _worker_transformer.token_tables.pop(b_field, None), lemmas
+
 
 class TextTransformer:
     def __init__(
             self,
-            config
+            config,
+            writer: SyncWriter | None = None
     ):
         self.logger = logging.getLogger(self.__class__.__name__)
         self._config = config
 
+        # output writer shared with the caller; a private one is used per run otherwise
+        self.writer = writer
+
+        # projection: only these b-fields are transformed (all if empty)
+        self.bfields = self._config.params.tags_to_extract
+
+        # text cleaning
+        self.string_dtype = pd.StringDtype(resolve_string_storage(self._config.params.string_storage))
+
+        # spaCy model, loaded lazily through the process-wide cache
+        self.model_name = self._config.params.spacy_model
+        self.model_exclude = tuple(self._config.params.spacy_exclude)
+        self.n_process = self._config.params.nlp_n_process
+        self.batch_size = self._config.params.nlp_batch_size
+
+        # transform the input frames themselves instead of copy-on-write copies of them
+        self.inplace = self._config.params.transform_inplace
+
+        # b-fields transformed concurrently in worker processes, each loading the model once
+        self.field_workers = self._config.params.field_workers
+
+        # persistent lemma cache shared by all b-fields, disabled if size is 0
+        self.lemma_cache_size = self._config.params.lemma_cache_size
+        self._lemma_cache: LemmaCache | None = None
+
+        # compact token storage: normalized tokens live in token_tables instead of
+        # an object column, row-aligned with the transformed frame of the b-field
+        self.compact_tokens = self._config.params.compact_tokens
+        self.token_tables: Dict[str, TokenTable] = {}
+
     def run_transformation_pipeline(
             self,
             df_dict: Dict[str, pd.DataFrame],
             save=True
     ):
         self.logger.info("---Started text transformation pipeline---")
+        writer = self.writer or make_writer(self._config.params.write_queue_size)
+        try:
+            self._transform_fields(df_dict, save, writer)
+        finally:
+            if writer is not self.writer:
+                self._report_write_failures(writer.close())
+
+        self._save_lemma_cache()
+        self.logger.info(f"Completed text transformation pipeline")
+        return df_dict
+
+    def run_transformation_stream(
+            self,
+            batches: Iterable[Dict[str, pd.DataFrame]],
+            save=True,
+            sizer: BatchSizer | None = None
+    ) -> Dict[str, int]:
+        """Transforms b-field batches, e.g. from ``XMLProcessor.iter_bfield_batches``, and appends them to the outputs.
+
+        Only the current batch and the writer's queue are held in memory, so transformed frames are not returned;
+        the result is the number of rows written per b-field. With a ``sizer``, the frames of a batch are
+        cleaned and normalized in chunks of the number of rows it picks.
+        """
+        self.logger.info("---Started streaming text transformation pipeline---")
+        writer = self.writer or make_writer(self._config.params.write_queue_size)
+        rows: Dict[str, int] = {}
+        parts: Dict[str, int] = {}
+        # every batch and chunk would start a new spaCy pool that loads the model again,
+        # so streams lemmatize single-process like the field workers
+        n_process, self.n_process = self.n_process, 1
+        try:
+            for batch_no, batch in enumerate(batches):
+                for b_field in batch:
+                    if not self.is_requested(b_field):
+                        continue
+                    for chunk in self._iter_chunks(batch[b_field], sizer):
+                        df_working = self._transform_field(chunk, b_field, streaming=True)
+                        part_no = parts.get(b_field, 0)
+                        parts[b_field] = part_no + 1
+                        rows[b_field] = rows.get(b_field, 0) + df_working.shape[0]
+                        if save:
+                            writer.submit(
+                                f"{b_field} part {part_no}", self._save_part,
+                                df_working, b_field, part_no, part_no == 0
+                            )
+                self.logger.info(f"Transformed batch {batch_no}, rows so far: {rows}")
+        finally:
+            self.n_process = n_process
+            if writer is not self.writer:
+                self._report_write_failures(writer.close())
+
+        self._save_lemma_cache()
+        self.logger.info(f"Completed streaming text transformation pipeline")
+        return rows
+
+    @staticmethod
+    def _iter_chunks(
+            df: pd.DataFrame,
+            sizer: BatchSizer | None
+    ) -> Iterator[pd.DataFrame]:
+        # each chunk is measured while the caller transforms it
+        if sizer is None:
+            yield df
+            return
+        start = 0
+        while start < df.shape[0]:
+            size = sizer.next_size()
+            with sizer.batch(min(size, df.shape[0] - start)):
+                yield df.iloc[start:start + size]
+            start += size
+
+    def _transform_fields(
+            self,
+            df_dict: Dict[str, pd.DataFrame],
+            save: bool,
+            writer: SyncWriter
+    ):
+        b_fields = []
+        for b_field in df_dict:
+            if not self.is_requested(b_field):
+                self.logger.info(f"Skipped b-field not in tags_to_extract: {b_field}")
+                continue
+            b_fields.append(b_field)
+
+        if self.field_workers > 1 and len(b_fields) > 1:
+            results = self._transform_fields_parallel(df_dict, b_fields)
+        else:
+            results = ((b_field, self._transform_field(df_dict[b_field], b_field)) for b_field in b_fields)
 
-        for b_field, df_original in df_dict.items():
-            self.logger.info(f"Starting text transformations for b-field: {b_field}")
+        transformed = {}
+        for b_field, df_working in results:
+            if save:
+                # the writer applies backpressure once its queue is full
+                writer.submit(f"{b_field} output", self._save_df, df_working, b_field)
+                self.logger.info(f"Submitted transformed data of {b_field} for saving")
+            transformed[b_field] = df_working
 
-            # copy df
-            df_working = df_original.copy()
+        # replaced in input order, independent of the order in which workers finish
+        for b_field in b_fields:
+            df_dict[b_field] = transformed[b_field]
 
-            # drop n/a
-            df_working = self._dropna(df_working, b_field)
+    def _transform_fields_parallel(
+            self,
+            df_dict: Dict[str, pd.DataFrame],
+            b_fields: List[str]
+    ):
+        # largest fields first, so the longest job does not start last
+        ordered = sorted(b_fields, key=lambda b: self._field_cost(df_dict[b], b), reverse=True)
+        n_workers = min(self.field_workers, len(ordered))
+        # the cores of nlp_n_process are split between the workers, so with few fields each one
+        # still lemmatizes with several processes
+        n_process = max(1, self.n_process // n_workers)
+        self.logger.info(
+            f"Transforming {len(ordered)} b-fields with {n_workers} worker processes "
+            f"({n_process} spaCy processes each): {ordered}"
+        )
+
+        with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_transform_worker,
+                initargs=(self._config, n_process)
+        ) as executor:
+            futures = {
+                executor.submit(_transform_in_worker, df_dict[b_field], b_field): b_field
+                for b_field in ordered
+            }
+            for future in as_completed(futures):
+                b_field = futures[future]
+                df_working, token_table, lemmas = future.result()
+                if token_table is not None:
+                    self.token_tables[b_field] = token_table
+                if lemmas is not None:
+                    namespace, entries = lemmas
+                    self._get_lemma_cache(namespace).merge(entries)
+                yield b_field, df_working
+
+    @staticmethod
+    def _field_cost(
+            df: pd.DataFrame,
+            b_field: str
+    ) -> int:
+        # characters to normalize dominate the runtime; row count if there is no text column
+        text_col = f"{b_field}_text"
+        if text_col not in df.columns:
+            return df.shape[0]
+        return int(df[text_col].str.len().fillna(0).sum())
 
+    def _transform_field(
+            self,
+            df_original: pd.DataFrame,
+            b_field: str,
+            streaming: bool = False
+    ) -> pd.DataFrame:
+        self.logger.info(f"Starting text transformations for b-field: {b_field}")
+        # the shallow copy shares all columns with the input until one is replaced, so only the columns
+        # written below are materialized (lazily copied under copy-on-write, which main.py enables).
+        # In place, the input frame itself is transformed
+        df_working = df_original if self.inplace else df_original.copy(deep=False)
+
+        # drop n/a
+        df_working = self._dropna(df_working, b_field)
+
+        # batches of a stream skip the per-field stores: the transform store would prune the rows of
+        # other batches, and token tables and narrowed dtypes would differ from part to part
+        if self._config.params.incremental_transform and not streaming:
+            # text cleaning and normalization of new or revised rows only
+            df_working = self._transform_incremental(df_working, b_field)
+        else:
             # text cleaning
             df_working = self._clean_text_columns(df_working, b_field)
 
             # normalization
             df_working = self._normalize_columns(df_working, b_field)
 
-            # text length
-            df_working = self._textlen(df_working, b_field)
+        if self.compact_tokens and not streaming:
+            df_working = self._compact_normalized(df_working, b_field)
 
-            if save:
-                self._save_df(df_working, b_field)
-                self.logger.info(f"Saved transformed data")
+        # text length
+        df_working = self._textlen(df_working, b_field)
 
-            df_dict[b_field] = df_working
-        self.logger.info(f"Completed text transformation pipeline")
-        return df_dict
+        # compact dtypes
+        if self._config.params.optimize_dtypes and not streaming:
+            df_working = optimize_dtypes(
+                df_working, f"transformation of {b_field}", string_storage=self.string_dtype.storage
+            )
+
+        return df_working
+
+    def _report_write_failures(
+            self,
+            failures: list
+    ):
+        if failures:
+            self.logger.error(
+                f"{len(failures)} output writes failed: {', '.join(label for label, _ in failures)}"
+            )
 
     def _clean_text_columns(
             self,
@@ -52,14 +309,22 @@ class TextTransformer:
     ) -> pd.DataFrame:
         transform_col = f"{b_field}_text"
         if transform_col in df.columns:
-            df.loc[:, transform_col] = (
-                df[transform_col]
-                .astype(str)
-                .apply(lambda text: re.sub(r"[^a-zA-ZäöüßÄÖÜ ]+", "", text))
-            )
+            # missing values stay <NA> instead of becoming the string "nan"
+            cleaned = df[transform_col].astype(self.string_dtype)
+            # rules run one after another, in the given order
+            for pattern, replacement in self._cleaning_rules(b_field):
+                cleaned = cleaned.str.replace(pattern, replacement, regex=True)
+            df[transform_col] = cleaned
             self.logger.info(f"Cleaned text in {transform_col}")
         return df
 
+    def _cleaning_rules(
+            self,
+            b_field: str
+    ) -> List[Tuple[str, str]]:
+        rules = self._config.params.cleaning_rules.get(b_field, DEFAULT_CLEANING_RULES)
+        return [tuple(rule) for rule in rules]
+
     def _normalize_columns(
             self,
             df: pd.DataFrame,
@@ -68,21 +333,153 @@ class TextTransformer:
         transform_col = f"{b_field}_text"
         norm_col = f"{b_field}_normalized"
         if transform_col in df.columns:
-            texts = df[transform_col].astype(str).tolist()
-            df[norm_col] = self.normalize(texts)
-            self.logger.info(f"Normalized column '{transform_col}' --> '{norm_col}'")
+            # normalize every distinct text once and scatter the results back. Cleaned columns are factorized
+            # as they are; converting them to str first would materialize one Python string per row
+            texts = df[transform_col]
+            if texts.hasnans or not isinstance(texts.dtype, pd.StringDtype):
+                texts = texts.astype(str)
+            codes, uniques = pd.factorize(texts)
+            normalized = np.empty(len(uniques), dtype=object)
+            for i, tokens in enumerate(self._normalize_unique(uniques.tolist())):
+                normalized[i] = tokens
+            df[norm_col] = pd.Series(normalized.take(codes), index=df.index)
+            self.logger.info(
+                f"Normalized column '{transform_col}' --> '{norm_col}' "
+                f"({len(uniques)} unique of {len(codes)} texts)"
+            )
+        return df
+
+    def _normalize_unique(
+            self,
+            texts: list[str]
+    ) -> list[list]:
+        cache = self._get_lemma_cache()
+        if cache is None:
+            return self._normalize_texts(texts)
+
+        results = cache.get_many(texts)
+        missing = [i for i, tokens in enumerate(results) if tokens is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self._normalize_texts(missing_texts)
+            for i, tokens in zip(missing, computed):
+                results[i] = tokens
+            cache.put_many(missing_texts, computed)
+        self.logger.info(f"Lemma cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        return results
+
+    def _normalize_texts(
+            self,
+            texts: list[str]
+    ) -> list[list]:
+        if not texts:
+            return []
+        return self.normalize(
+            texts,
+            model_name=self.model_name,
+            exclude=self.model_exclude,
+            n_process=self.n_process,
+            batch_size=self.batch_size
+        )
+
+    def _get_lemma_cache(
+            self,
+            namespace: str | None = None
+    ) -> LemmaCache | None:
+        if self.lemma_cache_size <= 0:
+            return None
+        if self._lemma_cache is None:
+            # workers pass their namespace, so the parent does not load the model for it
+            if namespace is None:
+                nlp = load_nlp(self.model_name, self.model_exclude)
+                # excluded components change the lemmas as well
+                exclude = ",".join(sorted(self.model_exclude))
+                namespace = f"{self.model_name}|{nlp.meta.get('version')}|{exclude}|{TOKEN_FILTER}"
+            self._lemma_cache = LemmaCache(
+                self._config.paths.intermediate_data_dir, namespace, self.lemma_cache_size
+            )
+            self._lemma_cache.load()
+        return self._lemma_cache
+
+    def _save_lemma_cache(self):
+        if self._lemma_cache is None:
+            return
+        try:
+            self._lemma_cache.save()
+            self.logger.info(f"Saved lemma cache with {len(self._lemma_cache.entries)} entries")
+        except Exception as e:
+            self.logger.error(f"Error saving lemma cache: {e}")
+
+    def _transform_fingerprint(
+            self,
+            b_field: str
+    ) -> str:
+        # stored lemmas are only valid for the model version and token filter that produced them
+        settings = {
+            "cleaning": self._cleaning_rules(b_field),
+            "model": self.model_name,
+            "model_version": spacy.util.get_package_version(self.model_name),
+            "exclude": sorted(self.model_exclude),
+            "token_filter": TOKEN_FILTER,
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _transform_incremental(
+            self,
+            df: pd.DataFrame,
+            b_field: str
+    ) -> pd.DataFrame:
+        text_col = f"{b_field}_text"
+        revd_col = f"{b_field}_revd"
+        norm_col = f"{b_field}_normalized"
+        if text_col not in df.columns:
+            return df
+
+        store = TransformStore(
+            self._config.paths.intermediate_data_dir, b_field, self._transform_fingerprint(b_field)
+        )
+        store.load()
+
+        revds = df[revd_col] if revd_col in df.columns else [None] * df.shape[0]
+        keys = store.make_keys(df.index, revds, df[text_col])
+        changed = [key not in store.entries for key in keys]
+
+        if any(changed):
+            df_changed = df.loc[changed]
+            df_changed = self._clean_text_columns(df_changed, b_field)
+            df_changed = self._normalize_columns(df_changed, b_field)
+            changed_keys = [key for key, is_changed in zip(keys, changed) if is_changed]
+            for key, cleaned, normalized in zip(changed_keys, df_changed[text_col], df_changed[norm_col]):
+                store.entries[key] = (cleaned, normalized)
+        self.logger.info(
+            f"Transformed {sum(changed)} new or revised rows, reused {len(keys) - sum(changed)} stored rows"
+        )
+
+        # the string dtype of a cold run's cleaned column
+        df[text_col] = pd.array([store.entries[key][0] for key in keys], dtype=self.string_dtype)
+        df[norm_col] = [store.entries[key][1] for key in keys]
+
+        store.prune(keys)
+        try:
+            store.save()
+        except Exception as e:
+            self.logger.error(f"Error saving transform store for {b_field}: {e}")
         return df
-    #todo fix SettingWithCopyWarning
 
     @staticmethod
     def normalize(
             list_of_texts: list[str],
-            nlp=None
+            nlp=None,
+            model_name: str = SPACY_MODEL,
+            exclude: Tuple[str, ...] = SPACY_EXCLUDE,
+            n_process: int = 1,
+            batch_size: int = 256
     ) -> list[list]:
         if nlp is None:
-            nlp = spacy.load("de_core_news_lg")
+            nlp = load_nlp(model_name, tuple(exclude))
         normalized_list = []
-        for doc in nlp.pipe(list_of_texts):
+        # nlp.pipe yields docs in input order, also with n_process > 1
+        for doc in nlp.pipe(list_of_texts, n_process=n_process, batch_size=batch_size):
             normalized_list.append(
                 [tok.lemma_.lower() for tok in doc
                  if not (tok.is_punct or tok.is_stop
@@ -97,29 +494,141 @@ class TextTransformer:
             b_field: str
     ) -> pd.DataFrame:
         len_col = f"{b_field}_len"
-        if f"{b_field}_normalized" in df.columns:
-            df[len_col] = df[f"{b_field}_normalized"].apply(lambda x: len(x))
+        if b_field in self.token_tables:
+            df[len_col] = self.token_tables[b_field].lengths()
+        elif f"{b_field}_normalized" in df.columns:
+            df[len_col] = df[f"{b_field}_normalized"].str.len()
         return df
 
+    def _compact_normalized(
+            self,
+            df: pd.DataFrame,
+            b_field: str
+    ) -> pd.DataFrame:
+        norm_col = f"{b_field}_normalized"
+        if norm_col in df.columns:
+            self.token_tables[b_field] = TokenTable.from_lists(df[norm_col])
+            df = df.drop(columns=norm_col)
+            self.logger.info(f"Stored '{norm_col}' as {self.token_tables[b_field]}")
+        return df
+
+    def get_normalized(
+            self,
+            b_field: str,
+            df: pd.DataFrame | None = None
+    ) -> TokenTable | pd.Series:
+        # lazy token lists of a compact b-field, or the object column otherwise
+        if b_field in self.token_tables:
+            return self.token_tables[b_field]
+        return df[f"{b_field}_normalized"]
+
     def _dropna(
             self,
             df: pd.DataFrame,
             b_field: str
     ):
         r_before = df.shape[0]
-        df = df.dropna(subset=f"{b_field}_text")
+        if self.inplace:
+            df.dropna(subset=f"{b_field}_text", inplace=True)
+        else:
+            df = df.dropna(subset=f"{b_field}_text")
         self.logger.info(
             f"Dropped {r_before - df.shape[0]} rows missing '{b_field}_text' values"
         )
         return df
 
+    def output_paths(
+            self,
+            b_field: str
+    ) -> List[Path]:
+        output_dir = self._config.paths.processed_data_dir
+        if self._config.params.output_format == "parquet":
+            paths = [bfield_path(output_dir / "bfields", b_field)]
+        else:
+            paths = [output_dir / f"{b_field}.pkl"]
+        if self.compact_tokens:
+            paths.append(output_dir / f"{b_field}_tokens.npz")
+        return paths
+
     def _save_df(
             self,
             df: pd.DataFrame,
             b_field: str
     ):
-        filename_csv = f"{b_field}.csv"
-        filename_pkl = f"{b_field}.pkl"
-        df.to_csv(self._config.paths.processed_data_dir / filename_csv, na_rep="NA")
-        df.to_pickle(self._config.paths.processed_data_dir / filename_pkl)
+        output_dir = self._config.paths.processed_data_dir
+        if self._config.params.output_format == "parquet":
+            write_bfield(df, output_dir / "bfields", b_field)
+        else:
+            df.to_pickle(output_dir / f"{b_field}.pkl")
+        if self._config.params.export_csv:
+            df.to_csv(output_dir / f"{b_field}.csv", na_rep="NA")
+        if b_field in self.token_tables:
+            token_table = self.token_tables[b_field]
+            if self._config.params.output_format == "parquet":
+                # read_bfield sorts the rows by key, the saved tokens follow that order
+                token_table = token_table.take(read_order(df))
+            token_table.save(output_dir / f"{b_field}_tokens.npz")
+
+    def _save_part(
+            self,
+            df: pd.DataFrame,
+            b_field: str,
+            part_no: int,
+            first: bool
+    ):
+        # the first part of a b-field replaces the outputs of earlier runs
+        output_dir = self._config.paths.processed_data_dir
+        if self._config.params.output_format == "parquet":
+            write_bfield(df, output_dir / "bfields", b_field, append=not first)
+        else:
+            parts_dir = output_dir / f"{b_field}_parts"
+            if first and parts_dir.exists():
+                shutil.rmtree(parts_dir)
+            parts_dir.mkdir(parents=True, exist_ok=True)
+            df.to_pickle(parts_dir / f"part-{part_no:05d}.pkl")
+        if self._config.params.export_csv:
+            df.to_csv(output_dir / f"{b_field}.csv", mode="w" if first else "a", header=first, na_rep="NA")
+
+    def is_requested(
+            self,
+            b_field: str
+    ) -> bool:
+        return not self.bfields or b_field in self.bfields
+
+    def fingerprint(self) -> str:
+        # settings that shape the transformed outputs; the parsed input is covered by the parse stage
+        return fingerprint(
+            self.bfields,
+            {b_field: self._cleaning_rules(b_field) for b_field in self._config.params.tag_map},
+            self.model_name,
+            spacy.util.get_package_version(self.model_name),
+            sorted(self.model_exclude),
+            TOKEN_FILTER,
+            self.compact_tokens,
+            self.string_dtype.storage,
+            self._config.params.optimize_dtypes,
+            self._config.params.output_format,
+            self._config.params.export_csv,
+        )
+
+    def load_transformed(
+            self,
+            b_fields: List[str] | None = None
+    ) -> Dict[str, pd.DataFrame]:
+        if b_fields is None:
+            b_fields = [b for b in self._config.params.tag_map if self.is_requested(b)]
+        output_dir = self._config.paths.processed_data_dir
+        df_dict = {}
+        for b_field in b_fields:
+            paths = self.output_paths(b_field)
+            if not all(path.exists() for path in paths):
+                continue
+            if self._config.params.output_format == "parquet":
+                df_dict[b_field] = read_bfield(output_dir / "bfields", b_field)
+            else:
+                df_dict[b_field] = pd.read_pickle(paths[0])
+            if self.compact_tokens:
+                self.token_tables[b_field] = TokenTable.load(paths[-1])
+        self.logger.info(f"Loaded transformed b-fields: {list(df_dict)}")
+        return df_dict
 
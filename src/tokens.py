@@ -0,0 +1,139 @@
+from collections.abc import Sequence
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, List
+import numpy as np
+import pandas as pd
+
+
+class TokenTable(Sequence):
+    """Token lists stored as a shared vocabulary plus int32 token ids and CSR offsets.
+
+    Row ``i`` holds the tokens ``vocab[ids[offsets[i]:offsets[i + 1]]]``. Indexing a
+    single row materializes a ``list[str]``, so the table can stand in for the former
+    list-of-lists wherever rows are read one at a time.
+    """
+
+    def __init__(
+            self,
+            vocab: np.ndarray,
+            ids: np.ndarray,
+            offsets: np.ndarray
+    ):
+        self.vocab = np.asarray(vocab, dtype=object)
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    @classmethod
+    def from_lists(
+            cls,
+            token_lists: Iterable[List[str]]
+    ) -> "TokenTable":
+        token_lists = list(token_lists)
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        offsets = np.zeros(len(token_lists) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        flat = np.fromiter(chain.from_iterable(token_lists), dtype=object, count=int(offsets[-1]))
+        ids, vocab = pd.factorize(flat)
+        return cls(np.asarray(vocab, dtype=object), ids, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += len(self)
+            if not 0 <= item < len(self):
+                raise IndexError("TokenTable index out of range")
+            return self.vocab[self.ids[self.offsets[item]:self.offsets[item + 1]]].tolist()
+        if isinstance(item, slice):
+            return self.take(np.arange(len(self))[item])
+        return self.take(item)
+
+    def __repr__(self) -> str:
+        return f"TokenTable(rows={len(self)}, tokens={self.n_tokens}, vocab={len(self.vocab)})"
+
+    @property
+    def n_tokens(self) -> int:
+        return int(self.offsets[-1])
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def row_ids(self) -> np.ndarray:
+        # row position of every token
+        return np.repeat(np.arange(len(self)), self.lengths())
+
+    def take(
+            self,
+            positions
+    ) -> "TokenTable":
+        positions = np.asarray(positions, dtype=np.int64)
+        lengths = self.lengths()[positions]
+        offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # source position of each output token: row start + position within the row
+        within = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+        ids = self.ids[np.repeat(self.offsets[:-1][positions], lengths) + within]
+        return TokenTable(self.vocab, ids, offsets)
+
+    def filter(
+            self,
+            mask
+    ) -> "TokenTable":
+        return self.take(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    def drop_tokens(
+            self,
+            tokens: Iterable[str]
+    ) -> "TokenTable":
+        drop_vocab = np.isin(self.vocab, list(tokens))
+        keep = ~drop_vocab[self.ids]
+        lengths = np.bincount(self.row_ids()[keep], minlength=len(self))
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return TokenTable(self.vocab, self.ids[keep], offsets)
+
+    def to_lists(self) -> List[List[str]]:
+        tokens = self.vocab[self.ids].tolist()
+        return [tokens[start:end] for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def to_series(
+            self,
+            index=None,
+            name: str | None = None
+    ) -> pd.Series:
+        return pd.Series(self.to_lists(), index=index, name=name, dtype=object)
+
+    def to_frame(
+            self,
+            index=None
+    ) -> pd.DataFrame:
+        # long format: one row per token with a categorical token column
+        rows = self.row_ids()
+        frame = pd.DataFrame({
+            "row": rows,
+            "position": np.arange(self.n_tokens) - self.offsets[:-1][rows],
+            "token": pd.Categorical.from_codes(self.ids, categories=pd.Index(self.vocab, dtype=object)),
+        })
+        if index is not None:
+            keys = pd.Index(index).take(rows)
+            frame.index = keys
+        return frame
+
+    def save(
+            self,
+            path: str | Path
+    ):
+        np.savez_compressed(path, vocab=self.vocab.astype(str), ids=self.ids, offsets=self.offsets)
+
+    @classmethod
+    def load(
+            cls,
+            path: str | Path
+    ) -> "TokenTable":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["vocab"].astype(object), data["ids"], data["offsets"])
@@ -0,0 +1,100 @@
+import logging
+import queue
+import threading
+from typing import Callable, List, Tuple
+
+
+class SyncWriter:
+    """Runs save callables immediately; same interface as AsyncWriter."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.failures: List[Tuple[str, Exception]] = []
+
+    def _run(
+            self,
+            label: str,
+            func: Callable,
+            args: tuple,
+            kwargs: dict
+    ):
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            self.failures.append((label, e))
+            self.logger.error(f"Writing {label} failed. Error: {e}")
+
+    def submit(
+            self,
+            label: str,
+            func: Callable,
+            *args,
+            **kwargs
+    ):
+        self._run(label, func, args, kwargs)
+
+    def close(self) -> List[Tuple[str, Exception]]:
+        return self.failures
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AsyncWriter(SyncWriter):
+    """Runs save callables on a writer thread fed by a bounded queue.
+
+    ``submit`` blocks while ``max_pending`` writes are queued, so producers cannot run
+    arbitrarily far ahead of the disk. ``close`` waits for all queued writes and returns
+    the failed ones.
+    """
+
+    _STOP = object()
+
+    def __init__(
+            self,
+            max_pending: int = 2,
+            name: str = "output-writer"
+    ):
+        super().__init__()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name=name, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                self._run(*item)
+            finally:
+                self._queue.task_done()
+
+    def submit(
+            self,
+            label: str,
+            func: Callable,
+            *args,
+            **kwargs
+    ):
+        if self._closed:
+            raise RuntimeError("Cannot submit to a closed writer")
+        self._queue.put((label, func, args, kwargs))
+
+    def close(self) -> List[Tuple[str, Exception]]:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(self._STOP)
+            self._thread.join()
+        return self.failures
+
+
+def make_writer(max_pending: int) -> SyncWriter:
+    # 0 keeps writes synchronous
+    if max_pending > 0:
+        return AsyncWriter(max_pending=max_pending)
+    return SyncWriter()
@@ -0,0 +1,290 @@
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Callable, Collection, Dict, Iterator, List
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# b-field extractors share one interface: extractor(element, exclude_tags) -> extracted value.
+# The generic ones below only use the ElementTree API, so they work on elements of both backends.
+
+
+def _contains_any(
+        element,
+        tags: Collection[str]
+) -> bool:
+    # C-level search of the subtree below element
+    return any(elem is not element for tag in tags for elem in element.iter(tag))
+
+
+def extract_text(
+        element,
+        exclude_tags: Collection[str] | None = None
+) -> List[str]:
+    exclude_tags = exclude_tags or ()
+    if element.tag in exclude_tags:
+        return []
+    if not _contains_any(element, exclude_tags):
+        # text and tails in document order, as the walk below visits them
+        return [text for text in map(str.strip, element.itertext()) if text]
+
+    # depth-first: an element's text, then each child followed by its tail; excluded children keep their tail
+    texts = []
+    stack = [element]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            texts.append(item)
+            continue
+        text = item.text.strip() if item.text else ""
+        if text:
+            texts.append(text)
+        for child in reversed(item):
+            tail = child.tail.strip() if child.tail else ""
+            if tail:
+                stack.append(tail)
+            if child.tag not in exclude_tags:
+                stack.append(child)
+    return texts
+
+
+def extract_text_b110(
+        element,
+        exclude_tags: Collection[str] | None = None
+) -> str:
+    if element is None or (exclude_tags and element.tag in exclude_tags):
+        return None
+    return " ".join(filter(None, map(str.strip, element.itertext())))
+
+
+def extract_text_b112(
+        element,
+        exclude_tags: Collection[str] | None = None,
+        listitem_tag: str = "listitem"
+) -> List[str]:
+    exclude_tags = exclude_tags or ()
+    result_list = []
+    for item in element.iter(listitem_tag):
+        if item is element:
+            continue
+        text = _listitem_text(item, exclude_tags, listitem_tag) if len(item) else (item.text or "").strip()
+        if text:
+            result_list.append(text)
+    return result_list
+
+
+def _listitem_text(
+        item,
+        exclude_tags: Collection[str],
+        listitem_tag: str
+) -> str:
+    # An item's text leaves out nested list items (but not their tails) and excluded elements (including
+    # their tails). The text below every other child is stripped before it is added to its parent's text.
+    # The fragments of all levels go to one list that is joined once, so deep items are not copied per level.
+    parts = [item.text or ""]
+    children = iter(item)
+    stack = []
+    while True:
+        for child in children:
+            tag = child.tag
+            if tag == listitem_tag:
+                pass
+            elif tag in exclude_tags:
+                continue
+            elif len(child):
+                # continue with this level once the child's text is complete; the child's children are
+                # copied to a list, lxml's child iterators get slow while many of them are open
+                stack.append((children, len(parts), child.tail))
+                children = iter(list(child))
+                parts.append(child.text or "")
+                break
+            elif child.text:
+                parts.append(child.text.strip())
+            if child.tail:
+                parts.append(child.tail)
+        else:
+            if not stack:
+                return "".join(parts).strip()
+            children, start, tail = stack.pop()
+            _strip_fragments(parts, start)
+            if tail:
+                parts.append(tail)
+
+
+def _strip_fragments(
+        parts: List[str],
+        start: int
+):
+    # strips the text of parts[start:] in place: the fragments at both ends lose their whitespace and
+    # the ones left empty are dropped, so that outer levels do not walk them again
+    end = len(parts)
+    while end > start:
+        fragment = parts[end - 1].rstrip()
+        if fragment:
+            parts[end - 1] = fragment
+            break
+        end -= 1
+    del parts[end:]
+    first = start
+    while first < end:
+        fragment = parts[first].lstrip()
+        if fragment:
+            parts[first] = fragment
+            break
+        first += 1
+    del parts[start:first]
+
+
+def get_comp_ids(
+        element,
+        exclude_tags: Collection[str] | None = None
+) -> list[str]:
+    ids = []
+    for extsysref in element.findall(".//extsysref"):
+        if extsysref.attrib.get("matrix") == "true":
+            ids.append(extsysref.attrib.get("idref"))
+    return ids
+
+
+# lxml extractors: compiled XPath selects the nodes in C
+if lxml_etree is not None:
+    _lxml_texts = lxml_etree.XPath("descendant::text()", smart_strings=False)
+    _lxml_matrix_refs = lxml_etree.XPath("descendant::extsysref[@matrix='true']")
+
+
+def lxml_extract_text(
+        element,
+        exclude_tags: Collection[str] | None = None
+) -> List[str]:
+    if not exclude_tags:
+        # text and tails in document order, as the generic walk visits them
+        return [text for text in map(str.strip, _lxml_texts(element)) if text]
+    if element.tag in exclude_tags:
+        return []
+    # the walk skips excluded subtrees in C; their tails are still visited at their end event
+    texts = []
+    walker = lxml_etree.iterwalk(element, events=("start", "end"))
+    for event, elem in walker:
+        if event == "start":
+            if elem.tag in exclude_tags:
+                walker.skip_subtree()
+            elif elem.text:
+                texts.append(elem.text)
+        elif elem.tail and elem is not element:
+            texts.append(elem.tail)
+    return [text for text in map(str.strip, texts) if text]
+
+
+def lxml_extract_text_b110(
+        element,
+        exclude_tags: Collection[str] | None = None
+) -> str:
+    if element is None or (exclude_tags and element.tag in exclude_tags):
+        return None
+    return " ".join(text for text in map(str.strip, _lxml_texts(element)) if text)
+
+
+def lxml_get_comp_ids(
+        element,
+        exclude_tags: Collection[str] | None = None
+) -> list[str]:
+    return [extsysref.get("idref") for extsysref in _lxml_matrix_refs(element)]
+
+
+class StdlibBackend:
+    """Parses with ``xml.etree.ElementTree``; always available."""
+    name = "stdlib"
+    extractors: Dict[str, Callable] = {
+        "b11-0": extract_text_b110,
+        "b11-2": extract_text_b112,
+        "b20-32": get_comp_ids,
+    }
+    default_extractor = staticmethod(extract_text)
+
+    def iter_children(
+            self,
+            source: BinaryIO,
+            tags: Collection[str],
+            streaming: bool = True
+    ) -> Iterator:
+        """Children of the root element whose tag is in ``tags``, each valid until the next one is requested."""
+        # one pass over start/end events: children are cleared once handed out, the subtrees of other
+        # children element by element without being handed out
+        depth = 0
+        root = None
+        skipping = False
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                elif depth == 1:
+                    skipping = elem.tag not in tags
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if not skipping:
+                    yield elem
+                skipping = False
+                root.clear()
+            elif skipping:
+                elem.clear()
+
+    def extractor(
+            self,
+            tag: str
+    ) -> Callable:
+        return self.extractors.get(tag, self.default_extractor)
+
+
+class LxmlBackend(StdlibBackend):
+    """Parses with lxml; extracts with compiled XPath and C-level text iteration."""
+    name = "lxml"
+    extractors: Dict[str, Callable] = {
+        "b11-0": lxml_extract_text_b110,
+        "b11-2": extract_text_b112,
+        "b20-32": lxml_get_comp_ids,
+    }
+    default_extractor = staticmethod(lxml_extract_text)
+
+    def iter_children(
+            self,
+            source: BinaryIO,
+            tags: Collection[str],
+            streaming: bool = True
+    ) -> Iterator:
+        # ElementTree drops comments and processing instructions, lxml would keep them as elements;
+        # huge_tree lifts lxml's nesting limit of 256 levels, which ElementTree does not have
+        options = dict(remove_comments=True, remove_pis=True, huge_tree=True)
+        if not streaming:
+            # small documents: building the tree in C is faster than handing every event to Python
+            root = lxml_etree.parse(source, lxml_etree.XMLParser(**options)).getroot()
+            for child in root:
+                if child.tag in tags:
+                    yield child
+            return
+
+        # only end events of the requested tags reach Python; handed-out children and the
+        # siblings before them are removed from the tree
+        for _, elem in lxml_etree.iterparse(source, events=("end",), tag=list(tags) or None, **options):
+            parent = elem.getparent()
+            if parent is None or parent.getparent() is not None or elem.tag not in tags:
+                continue
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def make_backend(name: str) -> StdlibBackend:
+    # "auto" prefers lxml if it is installed
+    if name == "auto":
+        name = "lxml" if lxml_etree is not None else "stdlib"
+    if name == "stdlib":
+        return StdlibBackend()
+    if name == "lxml":
+        if lxml_etree is None:
+            raise ImportError("The lxml XML backend requires lxml. Install it with 'pip install lxml'")
+        return LxmlBackend()
+    raise ValueError(f"Unknown XML backend '{name}'. Choose 'auto', 'stdlib' or 'lxml'")
@@ -1,17 +1,155 @@
+import io
 import os
 import re
+import json
+import hashlib
 import logging
 import pickle
-from typing import List, Dict
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import chain, islice
+from multiprocessing.util import Finalize
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Dict, Tuple
+import numpy as np
 import pandas as pd
-import xml.etree.ElementTree as ET
+from pathlib import Path
 from src.config import Config
+from src.cache import ParseCache
+from src.checkpoint import file_stats, fingerprint
+from src.bfieldstore import BFieldStore
+from src.sources import (
+    archive_session, hold_archives, is_streamed, iter_member_bytes, list_inputs, open_input, release_archives
+)
+from src.memory import BatchSizer, SpillStore
+from src.storage import read_bfield, read_frame, write_bfield, write_frame
+from src.writer import SyncWriter, make_writer
+from src.xmlbackend import make_backend
+from src.dtypes import META_CATEGORY_COLUMNS, optimize_dtypes, resolve_string_storage
+
+OCC_FILE_PREFIX = "beschreibung_beruf_"
+# list-valued b-field exploded to one row per task
+TASK_FIELD = "b11-2"
+META_FILE_PREFIX = "berufe"
+
+# Per-process parser used by the worker pool
+_worker_processor = None
+
+
+def _init_parse_worker(
+        config: Config,
+        exclude_tags: Iterable[str] | None,
+        extractors: Dict[str, Callable]
+):
+    global _worker_processor
+    _worker_processor = XMLProcessor(
+        config=config,
+        exclude_tags=exclude_tags,
+        tags_to_extract=list(extractors)
+    )
+    _worker_processor.extractors = extractors
+    # zip files stay open for the worker's lifetime and are closed when it shuts down
+    hold_archives()
+    Finalize(None, release_archives, exitpriority=10)
+
+
+def _parse_in_worker(batch: List[str]) -> List[Tuple[Dict | None, str | None]]:
+    return [_worker_processor._try_parse_occ_xml(input_file) for input_file in batch]
+
+
+def _parse_bytes_in_worker(batch: List[Tuple[str, bytes]]) -> List[Tuple[Dict | None, str | None]]:
+    # members read by the parent from a sequential archive
+    return [_worker_processor._try_parse_occ_xml(locator, io.BytesIO(data)) for locator, data in batch]
+
+
+class _MetaColumnBuffers:
+    """Typed column buffers filled one <beruf> element at a time."""
+
+    def __init__(self, id_col: str):
+        self.id_col = id_col
+        self.kinds: Dict[str, str] = {}
+        self.columns: Dict[str, object] = {}
+
+        self._add_ref_columns("")
+        for col, kind in (("qualistufe", "category"), ("reglementiert", "str"), ("bkgr", "category")):
+            self._add_column(col, kind)
+        self._add_ref_columns("nf_")
+        self._add_ref_columns("vg_")
+
+    def _id_name(self, prefix: str) -> str:
+        return f"{prefix}dkz_id" if prefix else self.id_col
+
+    def _add_ref_columns(self, prefix: str):
+        self._add_column(self._id_name(prefix), "int")
+        self._add_column(f"{prefix}codenr", "str")
+        self._add_column(f"{prefix}fuenfsteller", "int")
+        self._add_column(f"{prefix}kurzbezeichnung", "str")
+
+    def _add_column(self, col: str, kind: str):
+        self.kinds[col] = kind
+        if kind == "int":
+            # values and missing-value mask
+            self.columns[col] = (array("q"), bytearray())
+        elif kind == "category":
+            # codes and category lookup
+            self.columns[col] = (array("i"), {})
+        else:
+            self.columns[col] = []
+
+    def _put(self, col: str, value):
+        kind = self.kinds[col]
+        if kind == "int":
+            values, mask = self.columns[col]
+            values.append(0 if value is None else int(value))
+            mask.append(value is None)
+        elif kind == "category":
+            codes, categories = self.columns[col]
+            codes.append(-1 if value is None else categories.setdefault(value, len(categories)))
+        else:
+            self.columns[col].append(value)
+
+    def _append_ref(self, prefix: str, elem):
+        get = elem.get if elem is not None else (lambda key: None)
+        codenr = get("codenr")
+        self._put(self._id_name(prefix), get("id"))
+        self._put(f"{prefix}codenr", codenr)
+        self._put(f"{prefix}fuenfsteller", codenr[2:7] if codenr else None)
+        self._put(f"{prefix}kurzbezeichnung", get("kurzbezeichnung"))
+
+    def append(self, beruf):
+        self._append_ref("", beruf)
+        for col in ("qualistufe", "reglementiert", "bkgr"):
+            self._put(col, beruf.get(col))
+        self._append_ref("nf_", beruf.find("nachfolger"))
+        self._append_ref("vg_", beruf.find("vorgaenger"))
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {}
+        for col, kind in self.kinds.items():
+            if kind == "int":
+                values, mask = self.columns[col]
+                data[col] = pd.arrays.IntegerArray(
+                    np.frombuffer(values, dtype=np.int64).copy(),
+                    np.frombuffer(mask, dtype=bool).copy()
+                )
+            elif kind == "category":
+                codes, categories = self.columns[col]
+                data[col] = pd.Categorical.from_codes(
+                    np.frombuffer(codes, dtype=np.int32), categories=list(categories)
+                )
+            else:
+                data[col] = self.columns[col]
+        return pd.DataFrame(data)
+
 
 class XMLProcessor:
     def __init__(
             self,
             config: Config,
-            exclude_tags: List[str] = None,
+            exclude_tags: Iterable[str] = None,
+            tags_to_extract: List[str] = None,
+            writer: SyncWriter = None,
     ):
         # logging
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -24,20 +162,46 @@ class XMLProcessor:
         self.raw_dir = self._paths.raw_data_dir
         self.tag_dict = self._params.tag_map
         self.core_cols = self._params.core_input_columns
-        self.exclude_tags = exclude_tags
+        # built once, extractors test every element against it
+        self.exclude_tags = frozenset(exclude_tags) if exclude_tags is not None else None
+
+        # projection: only these b-fields are extracted (all of tag_map if empty)
+        if tags_to_extract is None:
+            tags_to_extract = self._params.tags_to_extract
+        self.bfields = [
+            tag for tag in self.tag_dict
+            if not tags_to_extract or tag in tags_to_extract
+        ]
+
+        # XML parser and the b-field extractors matching its elements, called with (element, exclude_tags)
+        self.backend = make_backend(self._params.xml_backend)
+        self.extractors: Dict[str, Callable] = {
+            tag: self.backend.extractor(tag) for tag in self.bfields
+        }
+
+        # dtype optimization
+        self._string_storage = resolve_string_storage(self._params.string_storage)
+
+        # parallel parsing
+        self.n_workers = self._params.parse_workers
+        self.chunksize = self._params.parse_chunksize
 
         # raw inputs
         self.occ_input_files: List[str] = []
         self.meta_input_files: List[str] = []
+        self.failed_files: List[str] = []
+
+        # output writer shared with the caller; a private one is used per run otherwise
+        self.writer = writer
 
         # outputs
-        self.bfield_dict: Dict[str, pd.DataFrame] = {}
+        self.bfield_dict: Dict[str, pd.DataFrame] | BFieldStore = {}
         self.full_occ_df: pd.DataFrame = None
         self.meta_df: pd.DataFrame = None
 
     def run_occparsing_pipeline(self, save=True):
         self.logger.info("--- Started raw occupation data parsing pipeline ---")
-        self.logger.info(f"The following tags will be extracted: {list(self.tag_dict)}")
+        self.logger.info(f"The following tags will be extracted: {list(self.extractors)}")
 
         # base df
         self._process_occdata_to_dataframe()
@@ -48,6 +212,12 @@ class XMLProcessor:
         # set and clean index
         self._set_and_clean_index()
 
+        # compact dtypes
+        if self._params.optimize_dtypes:
+            self.full_occ_df = optimize_dtypes(
+                self.full_occ_df, "occupation parsing", string_storage=self._string_storage
+            )
+
         # split df by b-field
         self._split_by_bfield()
 
@@ -56,7 +226,14 @@ class XMLProcessor:
 
         # save
         if save:
-            self._save_bfield_dict()
+            # the writer gets frames of its own: later stages replace fields in self.bfield_dict while it is
+            # written, and an in-place transformation changes the frames it is given. Shallow copies share the
+            # column data but not the columns that are dropped, replaced or added
+            if isinstance(self.bfield_dict, BFieldStore):
+                snapshot = self.bfield_dict.copy()
+            else:
+                snapshot = {bfield: df.copy(deep=False) for bfield, df in self.bfield_dict.items()}
+            self._submit_save("b-field dictionary", self._save_bfield_dict, snapshot)
 
         self.logger.info("---Completed raw occupation data parsing pipeline---")
         return self.bfield_dict
@@ -72,86 +249,86 @@ class XMLProcessor:
 
         self.logger.info(f"Created metadata DataFrame with {self.meta_df.shape[0]} rows")
 
+        # compact dtypes
+        if self._params.optimize_dtypes:
+            self.meta_df = optimize_dtypes(
+                self.meta_df, "metadata parsing", META_CATEGORY_COLUMNS, self._string_storage
+            )
+
         # save
         if save:
-            self._save_metadata()
+            self._submit_save("metadata", self._save_metadata, self.meta_df)
         else:
             self.logger.warning("Data has not been saved. Consider setting save=True")
 
         self.logger.info("---Completed raw metadata parsing pipeline---")
         return self.meta_df
 
+    def _submit_save(
+            self,
+            label: str,
+            save_func: Callable,
+            *args
+    ):
+        # a shared writer lets the save overlap with the caller's next stage
+        if self.writer is not None:
+            self.writer.submit(label, save_func, *args)
+            return
+        with make_writer(self._params.write_queue_size) as writer:
+            writer.submit(label, save_func, *args)
+
+    def register_extractor(
+            self,
+            tag: str,
+            extractor: Callable
+    ):
+        self.extractors[tag] = extractor
+
     def _get_input_files(
             self,
             prefix: str
     ) -> List[str]:
-        files = []
+        # plain files and members of zip/tar archives in the raw data directory
         try:
             if not os.path.isdir(self.raw_dir):
                 return []
-            for filename in os.listdir(self.raw_dir):
-                f = os.path.join(self.raw_dir, filename)
-                if os.path.isfile(f) and filename.startswith(prefix):
-                    files.append(f)
-            return files
+            return list_inputs(self.raw_dir, prefix)
         except (FileNotFoundError, NotADirectoryError, PermissionError) as e:
             self.logger.error(f"Warning: could not read '{self.raw_dir}'. Error: {e}")
             return []
 
     def _parse_meta_xml_to_data_frame(
             self,
-            prefix: str = "berufe"
+            prefix: str = META_FILE_PREFIX
     ) -> pd.DataFrame:
-        appended_data = []
         self.meta_input_files = self._get_input_files(prefix)
         if not self.meta_input_files:
             self.meta_df = pd.DataFrame()
             return self.meta_df
-        # Loop through each raw data file
-        for file in self.meta_input_files:
-            tree = ET.parse(file)
-            root = tree.getroot()
-            berufe_list = []
-            id_col = self.core_cols["id"]
-            for beruf in root.findall("beruf"):
-                berufe_data = {
-                    id_col: int(beruf.get("id")),
-                    "codenr": beruf.get("codenr"),
-                    "fuenfsteller": int(beruf.get("codenr")[2:7]),
-                    "kurzbezeichnung": beruf.get("kurzbezeichnung"),
-                    "qualistufe": beruf.get("qualistufe"),
-                    "reglementiert": beruf.get("reglementiert"),
-                    "bkgr": beruf.get("bkgr")
-                }
-                nachf = beruf.find("nachfolger")
-                if nachf is not None:
-                    berufe_data["nf_dkz_id"] = int(nachf.get("id"))
-                    berufe_data["nf_codenr"] = nachf.get("codenr")
-                    berufe_data["nf_fuenfsteller"] = int(nachf.get("codenr")[2:7])
-                    berufe_data["nf_kurzbezeichnung"] = nachf.get("kurzbezeichnung")
-                vorg = beruf.find("vorgaenger")
-                if vorg is not None:
-                    berufe_data["vg_dkz_id"] = int(vorg.get("id"))
-                    berufe_data["vg_codenr"] = vorg.get("codenr")
-                    berufe_data["vg_fuenfsteller"] = int(vorg.get("codenr")[2:7])
-                    berufe_data["vg_kurzbezeichnung"] = vorg.get("kurzbezeichnung")
-                berufe_list.append(berufe_data)
-
-            data = pd.DataFrame(berufe_list)
-            data[[id_col, "fuenfsteller", "nf_dkz_id", "vg_dkz_id"]] = data[[
-                id_col, "fuenfsteller", "nf_dkz_id", "vg_dkz_id"
-            ]].astype("Int64")
-            appended_data.append(data)
-        if len(appended_data) > 0:
-            self.meta_df = pd.concat(appended_data)
-            self.meta_df = self.meta_df.set_index(id_col)
-        else:
-            self.meta_df = None
+
+        # Stream each raw data file into one set of typed column buffers
+        id_col = self.core_cols["id"]
+        buffers = _MetaColumnBuffers(id_col)
+        with archive_session():
+            for file in self.meta_input_files:
+                self._stream_meta_xml(file, buffers)
+
+        self.meta_df = buffers.to_frame().set_index(id_col)
         return self.meta_df
 
+    def _stream_meta_xml(
+            self,
+            input_file: str | os.PathLike,
+            buffers: "_MetaColumnBuffers"
+    ):
+        with open_input(input_file) as f:
+            for beruf in self.backend.iter_children(f, ("beruf",)):
+                buffers.append(beruf)
+
     def _parse_occ_xml_to_dict(
             self,
-            input_file: str | os.PathLike
+            input_file: str | os.PathLike,
+            source: BinaryIO | None = None
     ) -> Dict:
         # Get elements from filename
         head, tail = os.path.split(input_file)
@@ -162,36 +339,256 @@ class XMLProcessor:
             "year": int(integers[1])
         }
 
-        # Get elements from XML
-        tree = ET.parse(input_file)
-        root = tree.getroot()
-
-        for key in self.tag_dict.keys():
-            if key == "b20-32":
-                for b in root.findall(key):
-                    data[key + "_revd"] = b.get("rev")
-                    data[key + "_text"] = XMLProcessor._get_comp_ids(b)
-            elif key == "b11-2":
-                for b in root.findall(key):
-                    data[key + "_revd"] = b.get("rev")
-                    text = XMLProcessor._extract_text_b112(b, self.exclude_tags)
-                    data[key + "_text"] = text
-            elif key == "b11-0":
-                for b in root.findall(key):
-                    data[key + "_revd"] = b.get("rev")
-                    text = XMLProcessor._extract_text_b110(b, self.exclude_tags)
-                    data[key + "_text"] = text
-            else:
-                for b in root.findall(key):
-                    data[key + "_revd"] = b.get("rev")
-                    text = XMLProcessor._extract_text(b, self.exclude_tags)
-                    data[key + "_text"] = text
+        # Get elements from XML in a single pass; each requested top-level
+        # b-field is handed to its extractor as soon as it is complete
+        found = {}
+        # input_file names the file or archive member, source is its already opened content
+        with open_input(input_file) if source is None else nullcontext(source) as f:
+            for elem in self.backend.iter_children(f, self.extractors, streaming=False):
+                found[elem.tag] = (elem.get("rev"), self.extractors[elem.tag](elem, self.exclude_tags))
+
+        for key in self.extractors:
+            if key in found:
+                data[key + "_revd"], data[key + "_text"] = found[key]
 
         return data
 
+    def _try_parse_occ_xml(
+            self,
+            input_file: str | os.PathLike,
+            source: BinaryIO | None = None
+    ) -> Tuple[Dict | None, str | None]:
+        try:
+            return self._parse_occ_xml_to_dict(input_file, source), None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    def _parse_occ_files(
+            self,
+            files: List[str],
+            digests: Dict[str, str] | None = None
+    ) -> List[Dict | None]:
+        results = {file: (row, error) for file, row, error in self._iter_parse_results(files, digests)}
+
+        # rows line up with the input order in both paths
+        rows = []
+        for file in files:
+            row, error = results.get(file, (None, "not found in archive"))
+            if error is not None:
+                self.failed_files.append(file)
+                self.logger.error(f"Could not parse '{file}'. Error: {error}")
+            rows.append(row)
+        return rows
+
+    def _iter_parse_results(
+            self,
+            files: List[str],
+            digests: Dict[str, str] | None = None,
+            max_in_flight: Callable[[], int] | None = None
+    ) -> Iterator[Tuple[str, Dict | None, str | None]]:
+        # plain files and zip members are opened by whoever parses them, tar members are
+        # read sequentially here and handed over as bytes (their sha256 is stored in digests).
+        # max_in_flight is asked how many files the worker pool may hold at a time
+        direct = [file for file in files if not is_streamed(file)]
+        streamed = [file for file in files if is_streamed(file)]
+
+        with archive_session():
+            if self.n_workers > 1 and len(files) > 1:
+                self.logger.info(
+                    f"Parsing with {self.n_workers} worker processes (chunksize={self.chunksize})"
+                )
+                with ProcessPoolExecutor(
+                        max_workers=self.n_workers,
+                        initializer=_init_parse_worker,
+                        initargs=(self._config, self.exclude_tags, self.extractors)
+                ) as executor:
+                    yield from self._iter_pool_results(
+                        executor, _parse_in_worker, direct, lambda batch: batch, max_in_flight
+                    )
+                    yield from self._iter_pool_results(
+                        executor, _parse_bytes_in_worker, self._iter_streamed(streamed, digests),
+                        lambda batch: [locator for locator, _ in batch], max_in_flight
+                    )
+            else:
+                for file in direct:
+                    yield file, *self._try_parse_occ_xml(file)
+                for locator, data in self._iter_streamed(streamed, digests):
+                    yield locator, *self._try_parse_occ_xml(locator, io.BytesIO(data))
+
+    def _iter_pool_results(
+            self,
+            executor: ProcessPoolExecutor,
+            func: Callable,
+            items: Iterable,
+            batch_keys: Callable[[list], List[str]],
+            max_in_flight: Callable[[], int] | None = None
+    ) -> Iterator[Tuple[str, Dict | None, str | None]]:
+        # at most two batches per worker in flight: inputs are not read far ahead of the
+        # workers, and parsed rows are not buffered ahead of a slow consumer. With max_in_flight,
+        # batches also shrink and fewer are submitted, so the files held by the pool stay within it
+        items = iter(items)
+        pending = deque()
+        in_flight = 0
+        exhausted = False
+        while True:
+            limit = max_in_flight() if max_in_flight is not None else None
+            size = self.chunksize if limit is None else max(1, min(self.chunksize, limit // self.n_workers))
+            while (
+                    not exhausted and len(pending) < 2 * self.n_workers
+                    and (limit is None or not pending or in_flight + size <= limit)
+            ):
+                batch = list(islice(items, size))
+                if not batch:
+                    exhausted = True
+                    break
+                pending.append((batch_keys(batch), executor.submit(func, batch)))
+                in_flight += len(batch)
+            if not pending:
+                return
+            keys, future = pending.popleft()
+            in_flight -= len(keys)
+            for key, (row, error) in zip(keys, future.result()):
+                yield key, row, error
+
+    def _iter_streamed(
+            self,
+            files: List[str],
+            digests: Dict[str, str] | None = None
+    ) -> Iterator[Tuple[str, bytes]]:
+        if not files:
+            return
+        try:
+            for locator, data in iter_member_bytes(files):
+                if digests is not None:
+                    digests[locator] = hashlib.sha256(data).hexdigest()
+                yield locator, data
+        except Exception as e:
+            # unreadable archive: members not reached so far are reported as failed
+            self.logger.error(f"Could not read archive members. Error: {e}")
+
+    def iter_occupations(
+            self,
+            batch_size: int | Callable[[], int] | None = None
+    ) -> Iterator[Dict] | Iterator[List[Dict]]:
+        """Parses the occupation files lazily; yields one record per file, or lists of ``batch_size`` records.
+
+        A callable ``batch_size`` is asked for the size of each batch when the batch is started.
+        """
+        self.occ_input_files = self._get_input_files(OCC_FILE_PREFIX)
+        self.failed_files = []
+        next_size = batch_size if callable(batch_size) else lambda: batch_size
+        size = next_size()
+        batch = []
+        # a sized stream also bounds the files parsed ahead in the worker pool
+        max_in_flight = batch_size if callable(batch_size) else None
+        for file, row, error in self._iter_parse_results(self.occ_input_files, max_in_flight=max_in_flight):
+            if error is not None:
+                self.failed_files.append(file)
+                self.logger.error(f"Could not parse '{file}'. Error: {error}")
+                continue
+            if size is None:
+                yield row
+                continue
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+                size = next_size()
+        if batch:
+            yield batch
+
+    def iter_bfield_batches(
+            self,
+            batch_size: int | Callable[[], int]
+    ) -> Iterator[Dict[str, pd.DataFrame] | BFieldStore]:
+        """Streams ``iter_occupations`` batches through index, b-field split and task explosion.
+
+        Each item has the layout of ``run_occparsing_pipeline``'s result for ``batch_size`` files. Duplicate
+        (dkz_id, year) keys are only detected within a batch, and dtypes are not narrowed per batch.
+        """
+        for rows in self.iter_occupations(batch_size):
+            batch = self._rows_to_bfield_dict(rows)
+            # released before the next batch is parsed
+            rows = None
+            yield batch
+            batch = None
+
+    def run_occparsing_spilled(
+            self,
+            spill: SpillStore,
+            sizer: BatchSizer
+    ) -> SpillStore:
+        """Parses the occupation files in batches sized by ``sizer`` and writes every finished batch to ``spill``.
+
+        Only the batch being parsed is held in memory. The parts have the layout of ``iter_bfield_batches``.
+        """
+        self.logger.info("--- Started memory-budgeted occupation data parsing pipeline ---")
+        spill.clear()
+        n_files = 0
+        sizer.start()
+        for rows in self.iter_occupations(sizer.next_size):
+            batch_files = len(rows)
+            spill.append(self._rows_to_bfield_dict(rows))
+            rows = None
+            sizer.stop(batch_files)
+            n_files += batch_files
+            self.logger.info(f"Spilled batch of {batch_files} files ({n_files} in total) to: {spill.root}")
+            sizer.start()
+        sizer.stop(0)
+
+        if self.failed_files:
+            self.logger.warning(f"Skipped {len(self.failed_files)} malformed XML files")
+        self.logger.info("---Completed memory-budgeted occupation data parsing pipeline---")
+        return spill
+
+    def _rows_to_bfield_dict(
+            self,
+            rows: List[Dict]
+    ) -> Dict[str, pd.DataFrame] | BFieldStore:
+        df = self._index_frame(pd.DataFrame.from_dict(rows))
+        return self._explode_task_field(self._split_frame(df))
+
+    def _parser_fingerprint(self) -> str:
+        settings = {
+            "extractors": {
+                tag: f"{func.__module__}.{func.__qualname__}" for tag, func in self.extractors.items()
+            },
+            "exclude_tags": sorted(self.exclude_tags or []),
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _parse_occ_files_incremental(
+            self,
+            files: List[str]
+    ) -> List[Dict | None]:
+        cache = ParseCache(self._paths.intermediate_data_dir, self._parser_fingerprint())
+        cache.load()
+
+        # zip members are hashed and parsed from one open archive
+        with archive_session():
+            changed = [file for file in files if not cache.is_current(file)]
+            # tar members are hashed in the single pass that reads them for parsing
+            digests = {}
+            parsed = dict(zip(changed, self._parse_occ_files(changed, digests)))
+            for file, row in parsed.items():
+                if row is not None:
+                    cache.update(file, row, digests.get(file))
+        deleted = cache.prune(files)
+
+        try:
+            cache.save()
+        except Exception as e:
+            self.logger.error(f"Error saving parse cache: {e}")
+
+        self.logger.info(
+            f"Parsed {len(changed)} new or changed files, reused {len(files) - len(changed)} "
+            f"cached rows, dropped {deleted} deleted files"
+        )
+        return [parsed[file] if file in parsed else cache.rows[file] for file in files]
+
     def _process_occdata_to_dataframe(
             self,
-            prefix: str = "beschreibung_beruf_"
+            prefix: str = OCC_FILE_PREFIX
     ) -> pd.DataFrame:
         # Find files
         self.occ_input_files = self._get_input_files(prefix)
@@ -201,7 +598,13 @@ class XMLProcessor:
             return
 
         # Parse
-        rows = [self._parse_occ_xml_to_dict(file) for file in self.occ_input_files]
+        self.failed_files = []
+        if self._params.incremental_parsing:
+            rows = self._parse_occ_files_incremental(self.occ_input_files)
+        else:
+            rows = self._parse_occ_files(self.occ_input_files)
+        if self.failed_files:
+            self.logger.warning(f"Skipped {len(self.failed_files)} malformed XML files")
 
         # Create df
         self.full_occ_df = pd.DataFrame.from_dict([r for r in rows if r is not None])
@@ -212,73 +615,187 @@ class XMLProcessor:
         if self.full_occ_df is None or self.full_occ_df.empty:
             return
 
-        id_col = self.core_cols["id"]
-        date_col = self.core_cols["date"]
-        index_cols = [id_col, date_col]
-
         try:
-            self.full_occ_df = self.full_occ_df.set_index(index_cols, verify_integrity=True)
-            self.full_occ_df.index.set_names(index_cols, inplace=True)
+            self.full_occ_df = self._index_frame(self.full_occ_df)
             self.logger.info(f"Set index columns: {self.full_occ_df.index.names}")
         except ValueError as e:
             self.logger.error(f"Error setting index: {e}")
 
+    def _index_frame(
+            self,
+            df: pd.DataFrame
+    ) -> pd.DataFrame:
+        index_cols = [self.core_cols["id"], self.core_cols["date"]]
+        df = df.set_index(index_cols, verify_integrity=True)
+        df.index.set_names(index_cols, inplace=True)
+        return df
+
     def _split_by_bfield(self):
         if self.full_occ_df is None or self.full_occ_df.empty:
             return
 
-        blist = list(self.tag_dict.keys())
-        self.bfield_dict = {}
-
-        for bfield in blist:
-            cols = self.full_occ_df.filter(regex=f"^{bfield}_").columns.tolist()
+        self.bfield_dict = self._split_frame(self.full_occ_df)
+        if self._params.storage_mode == "long":
+            self.logger.info(f"Stored {len(self.bfield_dict)} b-fields in one long table")
+        else:
+            self.logger.info(f"Split DataFrame into {len(self.bfield_dict)} DataFrames by b-field")
 
+    def _split_frame(
+            self,
+            df: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame] | BFieldStore:
+        if self._params.storage_mode == "long":
+            # one long table, per-field frames are built on access
+            return BFieldStore.from_wide(df, self.bfields)
+
+        bfield_dict = {}
+        for bfield in self.bfields:
+            cols = df.filter(regex=f"^{bfield}_").columns.tolist()
             if cols:
-                subdf = self.full_occ_df[cols].copy()
-                self.bfield_dict[bfield] = subdf
-        self.logger.info(f"Split DataFrame into {len(self.bfield_dict)} DataFrames by b-field")
+                bfield_dict[bfield] = df[cols].copy()
+        return bfield_dict
+
+    def bfield_dict_path(self) -> Path:
+        if self._params.output_format == "parquet":
+            return self._paths.intermediate_data_dir / "bfields"
+        return self._paths.intermediate_data_dir / "bfield_dict.pkl"
+
+    def metadata_path(self) -> Path:
+        suffix = "parquet" if self._params.output_format == "parquet" else "pkl"
+        return self._paths.processed_data_dir / f"dkz_attributes.{suffix}"
+
+    def occ_fingerprint(self) -> str:
+        # inputs and every setting that shapes the b-field dictionary
+        return fingerprint(
+            file_stats(self._get_input_files(OCC_FILE_PREFIX)),
+            self._parser_fingerprint(),
+            self.tag_dict,
+            self.core_cols,
+            self._params.storage_mode,
+            self._params.output_format,
+            self._params.optimize_dtypes,
+            self._string_storage,
+        )
+
+    def meta_fingerprint(self) -> str:
+        return fingerprint(
+            file_stats(self._get_input_files(META_FILE_PREFIX)),
+            self._params.output_format,
+            self._params.export_csv,
+            self._params.optimize_dtypes,
+            self._string_storage,
+        )
+
+    def load_bfield_dict(self) -> Dict[str, pd.DataFrame] | BFieldStore:
+        path = self.bfield_dict_path()
+        if self._params.output_format == "parquet":
+            self.bfield_dict = {
+                bfield: self._arrays_to_lists(read_bfield(path, bfield))
+                for bfield in self.bfields
+                if (path / f"bfield={bfield}").exists()
+            }
+        else:
+            with open(path, "rb") as f:
+                self.bfield_dict = pickle.load(f)
+        self.logger.info(f"Loaded b-field dictionary from: {path}")
+        return self.bfield_dict
 
-    def _save_bfield_dict(self):
-        try:
-            output_path = self._paths.intermediate_data_dir / "bfield_dict.pkl"
+    def load_metadata(self) -> pd.DataFrame:
+        path = self.metadata_path()
+        if self._params.output_format == "parquet":
+            self.meta_df = read_frame(path)
+        else:
+            self.meta_df = pd.read_pickle(path)
+        self.logger.info(f"Loaded metadata from: {path}")
+        return self.meta_df
 
-            with open(output_path, "wb") as f:
-                pickle.dump(self.bfield_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
+    @staticmethod
+    def _arrays_to_lists(df: pd.DataFrame) -> pd.DataFrame:
+        # parquet list columns come back as numpy arrays, the parser produces lists
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = [v.tolist() if isinstance(v, np.ndarray) else v for v in df[col]]
+        return df
+
+    def _save_bfield_dict(
+            self,
+            bfield_dict: Dict[str, pd.DataFrame] | BFieldStore
+    ):
+        try:
+            output_path = self.bfield_dict_path()
+            if self._params.output_format == "parquet":
+                for bfield, df in bfield_dict.items():
+                    write_bfield(df, output_path, bfield)
+            else:
+                with open(output_path, "wb") as f:
+                    pickle.dump(bfield_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
             self.logger.info(f"Saved b-field dictionary to: {output_path}")
 
         except Exception as e:
             self.logger.error(f"Error saving b-field dict: {e}")
+            raise
 
-    def _save_metadata(self):
+    def _save_metadata(
+            self,
+            meta_df: pd.DataFrame
+    ):
         try:
-            output_path = self._paths.processed_data_dir
-            self.meta_df.to_pickle(output_path / "dkz_attributes.pkl")
-            self.meta_df.to_csv(output_path / "dkz_attributes.csv", index=True, na_rep="NA")
+            output_path = self.metadata_path()
+            if self._params.output_format == "parquet":
+                write_frame(meta_df, output_path)
+            else:
+                meta_df.to_pickle(output_path)
+            if self._params.export_csv:
+                meta_df.to_csv(output_path.with_suffix(".csv"), index=True, na_rep="NA")
             self.logger.info("Metadata saved successfully")
         except Exception as e:
             self.logger.error(f"Error while saving metadata: {e}")
+            raise
 
     @staticmethod
     def explode_tasks(
             df: pd.DataFrame,
-            task_col: str
+            task_col: str,
+            position_name: str = "task_no"
     ) -> pd.DataFrame:
-        df_explode = df.copy().explode(task_col).reset_index(drop=True)
-        return df_explode
+        # ragged explode: one row per list item, parent index levels + item position.
+        # Same values as DataFrame.explode (empty lists -> NaN), without copying df first
+        parts = [
+            (value if len(value) else (np.nan,)) if isinstance(value, (list, tuple, np.ndarray)) else (value,)
+            for value in df[task_col].array
+        ]
+        lengths = np.fromiter(map(len, parts), dtype=np.int64, count=len(parts))
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        items = np.fromiter(chain.from_iterable(parts), dtype=object, count=offsets[-1])
+
+        parents = np.repeat(np.arange(len(parts)), lengths)
+        positions = np.arange(offsets[-1]) - offsets[:-1][parents]
+
+        # reuse the parent levels and gather their codes instead of re-factorizing keys
+        parent_index = df.index
+        if not isinstance(parent_index, pd.MultiIndex):
+            parent_index = pd.MultiIndex.from_arrays([parent_index])
+        index = pd.MultiIndex(
+            levels=list(parent_index.levels) + [pd.RangeIndex(int(lengths.max(initial=1)))],
+            codes=[codes[parents] for codes in parent_index.codes] + [positions],
+            names=list(df.index.names) + [position_name],
+            verify_integrity=False
+        )
+
+        data = {}
+        for col in df.columns:
+            data[col] = items if col == task_col else df[col].array.take(parents)
+        return pd.DataFrame(data, index=index, columns=df.columns)
 
     def _transform_explode_tasks(self):
-        b11_2_key = "b11-2"
-        task_col_name = "b11-2_text"
-
-        if b11_2_key in self.bfield_dict:
-            self.logger.info(f"Found {b11_2_key} in dictionary")
-            current_df = self.bfield_dict[b11_2_key]
-            before = current_df.shape[0]
-
-            exploded_df = XMLProcessor.explode_tasks(current_df, task_col_name)
+        if TASK_FIELD in self.bfield_dict:
+            self.logger.info(f"Found {TASK_FIELD} in dictionary")
+            before = self.bfield_dict[TASK_FIELD].shape[0]
 
-            self.bfield_dict[b11_2_key] = exploded_df
+            self._explode_task_field(self.bfield_dict)
 
+            exploded_df = self.bfield_dict[TASK_FIELD]
             self.logger.info(
                 f"Exploded task descriptions to 1 row per task. "
                 f"Created {exploded_df.shape[0] - before} rows. New shape: {exploded_df.shape}"
@@ -287,80 +804,10 @@ class XMLProcessor:
             self.logger.warning("b11-2 not found in dictionary. Skipped task explosion")
 
     @staticmethod
-    def _extract_text(
-            element,
-            exclude_tags: set[str] | None = None
-    ) -> List[str]:
-        if exclude_tags is None:
-            exclude_tags = set()
-        else:
-            exclude_tags = set(exclude_tags)
-
-        texts = []
-
-        def recurse(elem):
-            if elem.tag in exclude_tags:
-                return ""
-            if elem.text and elem.text.strip():
-                texts.append(elem.text.strip())
-            for child in elem:
-                recurse(child)
-                if child.tail and child.tail.strip():
-                    texts.append(child.tail.strip())
-
-        recurse(element)
-        return texts
-
-    @staticmethod
-    def _extract_text_b110(
-            element,
-            exclude_tags: set | None = None
-    ) -> str:
-        if exclude_tags is None:
-            exclude_tags = set()
-        else:
-            exclude_tags = set(exclude_tags)
-
-        if element is None or element.tag in exclude_tags:
-            return None
-        text = [
-            text.strip() for text in element.itertext()
-            if text.strip() and text.strip() != ""
-        ]
-        i_text = " ".join(text)
-        return i_text
-
-    @staticmethod
-    def _extract_text_b112(
-            element,
-            exclude_tags: set | None = None,
-            listitem_tag: str = "listitem"
-    ) -> List[str]:
-        def recurse(subelement):
-            text = subelement.text or ""
-            for child in subelement:
-                if child.tag == listitem_tag:
-                    text += child.tail or ""
-                elif exclude_tags and child.tag in exclude_tags:
-                    pass
-                else:
-                    text += recurse(child)
-                    text += child.tail or ""
-            return text.strip()
-
-        listitems = element.findall(f".//{listitem_tag}")
-        result_list = []
-        for item in listitems:
-            list_item_text = recurse(item)
-            if list_item_text:
-                result_list.append(list_item_text)
-        return result_list
-
-    @staticmethod
-    def _get_comp_ids(element) -> list[str]:
-        ids = []
-        for extsysref in element.findall(".//extsysref"):
-            if extsysref.attrib.get("matrix") == "true":
-                ids.append(extsysref.attrib.get("idref"))
-        return ids
+    def _explode_task_field(
+            bfield_dict: Dict[str, pd.DataFrame] | BFieldStore
+    ) -> Dict[str, pd.DataFrame] | BFieldStore:
+        if TASK_FIELD in bfield_dict:
+            bfield_dict[TASK_FIELD] = XMLProcessor.explode_tasks(bfield_dict[TASK_FIELD], f"{TASK_FIELD}_text")
+        return bfield_dict
 
@@ -6,6 +6,9 @@ from unittest.mock import MagicMock, patch
 
 from src.config import Config, Paths, Params
 
+# as in main.py, which enables pandas copy-on-write once at startup
+pd.set_option("mode.copy_on_write", True)
+
 
 @pytest.fixture
 def mock_config(tmp_path):
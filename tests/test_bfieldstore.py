@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from src.bfieldstore import BFieldStore
+
+
+def make_wide_df():
+    return pd.DataFrame({
+        "dkz_id": [1, 2, 3],
+        "year": [2020, 2020, 2021],
+        "b11-0_revd": ["r1", "r2", None],
+        "b11-0_text": ["Summary A", "Summary B", None],
+        "b11-2_revd": ["r1", "r2", "r3"],
+        "b11-2_text": [["Task A"], ["Task B", "Task C"], []],
+    }).set_index(["dkz_id", "year"])
+
+
+def test_bfield_store_views_match_per_field_frames():
+    """Tests that per-field views reproduce the wide split without storing copies per field"""
+    wide = make_wide_df()
+    store = BFieldStore.from_wide(wide, ["b11-2", "b11-0", "b20-32"])
+
+    assert list(store) == ["b11-2", "b11-0"]
+    assert store.table.index.names == ["dkz_id", "year", "bfield"]
+    assert store.table.shape[0] == 5  # (3, 2020) has no b11-0
+
+    pd.testing.assert_frame_equal(store["b11-2"], wide[["b11-2_revd", "b11-2_text"]])
+    pd.testing.assert_frame_equal(store["b11-0"], wide[["b11-0_revd", "b11-0_text"]].dropna(how="all"))
+    assert "b20-32" not in store
+
+
+def test_bfield_store_assignment_and_selection():
+    """Tests replacing a field (e.g. exploded tasks) and filtering by field"""
+    store = BFieldStore.from_wide(make_wide_df(), ["b11-2", "b11-0"])
+    exploded = pd.DataFrame({"b11-2_text": ["Task A", "Task B", "Task C"]})
+
+    store["b11-2"] = exploded
+
+    assert store["b11-2"] is exploded
+    assert store.table.shape[0] == 2
+    assert dict(store.items()).keys() == {"b11-0", "b11-2"}
+
+    only_summary = store.select(["b11-0"])
+    assert list(only_summary) == ["b11-0"]
+    assert only_summary["b11-0"].shape == (2, 2)
+
+
+def test_bfield_store_fields_can_be_replaced_while_iterating():
+    """Tests the transformation loop pattern: each field is visited once and replaced"""
+    store = BFieldStore.from_wide(make_wide_df(), ["b11-2", "b11-0"])
+
+    visited = []
+    for bfield, frame in store.items():
+        visited.append(bfield)
+        store[bfield] = frame.assign(done=True)
+
+    assert visited == ["b11-2", "b11-0"]
+    assert store.table.empty
+    assert all(store[bfield]["done"].all() for bfield in visited)
+
+
+def test_bfield_store_fields_are_views_of_the_table():
+    """Tests that field frames share the table's values and column assignments stay in the returned frame"""
+    store = BFieldStore.from_wide(make_wide_df(), ["b11-2", "b11-0"])
+
+    summary = store["b11-0"]
+    for column in BFieldStore.COLUMNS:
+        assert np.shares_memory(summary[f"b11-0_{column}"].to_numpy(), store.table[column].to_numpy())
+
+    summary["b11-0_text"] = ["changed", "changed"]
+    assert list(store["b11-0"]["b11-0_text"]) == ["Summary A", "Summary B"]
+
+
+def test_bfield_store_keeps_field_dtypes():
+    """Tests that views have the dtypes of the wide frames, also where the fields' dtypes differ"""
+    wide = make_wide_df()
+    wide["b11-0_revd"] = wide["b11-0_revd"].astype("category")
+    wide["b11-2_revd"] = wide["b11-2_revd"].astype("category")
+    wide["b11-0_text"] = wide["b11-0_text"].astype(pd.StringDtype("python"))
+    store = BFieldStore.from_wide(wide, ["b11-2", "b11-0"])
+
+    # the fields share a categorical revd column with the union of their categories
+    assert isinstance(store.table["revd"].dtype, pd.CategoricalDtype)
+    for bfield in store:
+        expected = wide[[f"{bfield}_revd", f"{bfield}_text"]].dropna(how="all")
+        pd.testing.assert_frame_equal(store[bfield], expected)
+    assert store.select(["b11-0"])["b11-0"]["b11-0_text"].dtype == pd.StringDtype("python")
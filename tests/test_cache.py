@@ -0,0 +1,57 @@
+import os
+from src.cache import LemmaCache, ParseCache, file_digest
+
+
+def test_parse_cache_round_trip_and_fingerprint_invalidation(tmp_path):
+    """Tests that cached rows survive a reload and are dropped when the parser settings change"""
+    input_file = tmp_path / "beschreibung_beruf_1_2024.xml"
+    input_file.write_text("<beruf/>")
+    path = str(input_file)
+
+    cache = ParseCache(tmp_path, fingerprint="a")
+    cache.load()
+    assert not cache.is_current(path)
+    cache.update(path, {"dkz_id": 1, "year": 2024})
+    cache.save()
+
+    reloaded = ParseCache(tmp_path, fingerprint="a")
+    reloaded.load()
+    assert reloaded.is_current(path)
+    assert reloaded.rows[path] == {"dkz_id": 1, "year": 2024}
+    assert reloaded.manifest[path]["sha256"] == file_digest(path)
+
+    # same content with a new mtime is still current
+    os.utime(path, ns=(0, 0))
+    assert reloaded.is_current(path)
+
+    changed_settings = ParseCache(tmp_path, fingerprint="b")
+    changed_settings.load()
+    assert not changed_settings.is_current(path)
+
+
+def test_parse_cache_prune_drops_deleted_files(tmp_path):
+    """Tests that rows of files missing from the current input list are dropped"""
+    cache = ParseCache(tmp_path, fingerprint="a")
+    for name in ("a.xml", "b.xml"):
+        (tmp_path / name).write_text("<beruf/>")
+        cache.update(str(tmp_path / name), {"file": name})
+
+    assert cache.prune([str(tmp_path / "a.xml")]) == 1
+    assert list(cache.rows) == [str(tmp_path / "a.xml")]
+
+
+def test_lemma_cache_evicts_least_recently_used_entries(tmp_path):
+    """Tests LRU eviction and namespace separation of the lemma cache"""
+    cache = LemmaCache(tmp_path, namespace="model|1", max_entries=2)
+    cache.put_many(["a", "b"], [["a"], ["b"]])
+    cache.get_many(["a"])
+    cache.put_many(["c"], [["c"]])
+    cache.save()
+
+    reloaded = LemmaCache(tmp_path, namespace="model|1", max_entries=2)
+    reloaded.load()
+    assert reloaded.get_many(["a", "b", "c"]) == [["a"], None, ["c"]]
+
+    other_model = LemmaCache(tmp_path, namespace="model|2", max_entries=2)
+    other_model.load()
+    assert other_model.get_many(["a"]) == [None]
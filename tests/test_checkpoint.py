@@ -0,0 +1,35 @@
+from src.checkpoint import CheckpointStore, file_stats, fingerprint
+
+
+def test_checkpoint_store_validates_fingerprint_and_outputs(tmp_path):
+    """Tests that a checkpoint is valid only for the recorded fingerprint while its outputs exist"""
+    output = tmp_path / "bfield_dict.pkl"
+    output.write_bytes(b"data")
+    store = CheckpointStore(tmp_path)
+    store.record("parse", "abc", [output])
+
+    reloaded = CheckpointStore(tmp_path)
+    reloaded.load()
+    assert reloaded.is_valid("parse", "abc")
+    assert not reloaded.is_valid("parse", "changed")
+    assert not reloaded.is_valid("transform", "abc")
+
+    output.unlink()
+    assert not reloaded.is_valid("parse", "abc")
+
+    reloaded.invalidate("parse")
+    assert "parse" not in reloaded.entries
+
+
+def test_fingerprint_changes_with_inputs_and_settings(tmp_path):
+    """Tests that fingerprints follow input file changes and settings but not their order"""
+    first, second = tmp_path / "a.xml", tmp_path / "b.xml"
+    first.write_text("<beruf/>")
+    second.write_text("<beruf/>")
+
+    base = fingerprint(file_stats([first, second]), {"b11-0": "Summary"})
+    assert base == fingerprint(file_stats([second, first]), {"b11-0": "Summary"})
+    assert base != fingerprint(file_stats([first, second]), {"b11-0": "Summary", "b11-2": "Tasks"})
+
+    second.write_text("<beruf><b11-0/></beruf>")
+    assert base != fingerprint(file_stats([first, second]), {"b11-0": "Summary"})
@@ -0,0 +1,43 @@
+import pandas as pd
+from src.dtypes import META_CATEGORY_COLUMNS, optimize_dtypes
+
+
+def test_optimize_dtypes_narrows_ids_and_categorizes_revd(caplog):
+    """Tests dtype optimization of a parsed occupation frame"""
+    index = pd.MultiIndex.from_arrays([[1, 2, 140000], [2020, 2021, 2021]], names=["dkz_id", "year"])
+    df = pd.DataFrame({
+        "b11-0_revd": ["2020-01-01", "2020-01-01", "2021-03-01"],
+        "b11-0_text": ["Summary A", None, "Summary C"],
+        "b11-2_text": [["Task A"], ["Task B"], []],
+        "b11-0_len": [2, 0, 5],
+    }, index=index)
+
+    with caplog.at_level("INFO"):
+        optimized = optimize_dtypes(df, "parsing")
+
+    assert optimized.index.levels[0].dtype == "int32"
+    assert optimized.index.levels[1].dtype == "int16"
+    assert isinstance(optimized["b11-0_revd"].dtype, pd.CategoricalDtype)
+    assert isinstance(optimized["b11-0_text"].dtype, pd.StringDtype)
+    assert optimized["b11-2_text"].dtype == object  # token/task lists are left alone
+    assert optimized["b11-0_len"].dtype == "int8"
+    assert optimized.astype(object).where(optimized.notna(), None).values.tolist() == \
+        df.astype(object).where(df.notna(), None).values.tolist()
+    assert "Optimized dtypes after parsing" in caplog.text
+
+
+def test_optimize_dtypes_keeps_nullable_metadata_ids():
+    """Tests metadata ids stay nullable and code fields become categorical"""
+    meta = pd.DataFrame({
+        "nf_dkz_id": pd.array([1001, None], dtype="Int64"),
+        "reglementiert": ["ja", "nein"],
+        "kurzbezeichnung": ["Beruf A", "Beruf C"],
+    }, index=pd.Index(pd.array([1000, 2000], dtype="Int64"), name="dkz_id"))
+
+    optimized = optimize_dtypes(meta, "metadata", META_CATEGORY_COLUMNS)
+
+    assert str(optimized.index.dtype) == "Int16"
+    assert str(optimized["nf_dkz_id"].dtype) == "Int16"
+    assert pd.isna(optimized.loc[2000, "nf_dkz_id"])
+    assert isinstance(optimized["reglementiert"].dtype, pd.CategoricalDtype)
+    assert isinstance(optimized["kurzbezeichnung"].dtype, pd.StringDtype)
@@ -0,0 +1,84 @@
+import subprocess
+import sys
+import pytest
+import src.memory
+from src.memory import BatchSizer, MemoryMonitor, SpillStore, rss_mb
+
+
+class FakeMonitor(MemoryMonitor):
+    """Monitor with a settable RSS"""
+
+    def __init__(self, current_mb):
+        super().__init__()
+        self.rss = current_mb
+
+    def current_mb(self):
+        return self.rss
+
+
+def test_memory_monitor_records_peak_of_window():
+    """Tests that the peak of a window includes memory allocated and freed inside it"""
+    monitor = MemoryMonitor(interval=0.005)
+    with monitor.measure() as window:
+        block = bytearray(64 * 2 ** 20)
+        block[::4096] = b"x" * len(block[::4096])  # touch every page
+        del block
+    assert window.growth_mb >= 48
+
+
+@pytest.mark.skipif(
+    src.memory.psutil is None and src.memory._proc_rss_mb() is None, reason="needs psutil or /proc"
+)
+def test_rss_includes_child_processes(monkeypatch):
+    """Tests that worker processes count towards the measured RSS"""
+    monkeypatch.setattr(src.memory, "_CHILD_SCAN_INTERVAL", 0)
+    # touches 64 MiB, reports and waits for its stdin to close
+    script = (
+        "import sys\n"
+        "block = bytearray(64 * 2 ** 20)\n"
+        "block[::4096] = b'x' * len(block[::4096])\n"
+        "print(flush=True)\n"
+        "sys.stdin.read()\n"
+    )
+    child = subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        child.stdout.readline()  # allocated
+        assert rss_mb(children=True) - rss_mb() >= 48
+    finally:
+        child.communicate()
+
+
+def test_batch_sizer_fails_if_rss_cannot_be_measured(monkeypatch):
+    """Tests that a budget is not silently ignored where no RSS source is available"""
+    monkeypatch.setattr(src.memory, "psutil", None)
+    monkeypatch.setattr(src.memory, "resource", None)
+    monkeypatch.setattr(src.memory, "_proc_rss_mb", lambda pid="self": None)
+    with pytest.raises(ImportError, match="psutil"):
+        BatchSizer(budget_mb=500, initial=10)
+
+
+def test_batch_sizer_scales_batches_to_budget_headroom():
+    """Tests that batch sizes follow the measured cost per item and shrink to the minimum over budget"""
+    monitor = FakeMonitor(100)
+    sizer = BatchSizer(budget_mb=500, initial=10, minimum=2, monitor=monitor)
+    assert sizer.next_size() == 10
+
+    with sizer.batch(10):
+        monitor.rss = 120  # 2 MiB per item
+    monitor.rss = 100
+    assert sizer.next_size() == 100  # half of 400 MiB headroom at 2 MiB per item
+
+    monitor.rss = 600
+    assert sizer.next_size() == 2
+
+
+def test_spill_store_roundtrip(tmp_path):
+    """Tests that spilled parts are read back in order and cleared on request"""
+    spill = SpillStore(tmp_path / "spill")
+    spill.append({"b11-0": 1})
+    spill.append({"b11-0": 2})
+    assert len(spill) == 2
+    assert list(spill.iter_batches()) == [{"b11-0": 1}, {"b11-0": 2}]
+
+    spill.clear()
+    assert len(spill) == 0 and spill.root.exists()
@@ -0,0 +1,160 @@
+import threading
+import pytest
+from src.checkpoint import CheckpointStore
+from src.pipeline import CACHED, DONE, FAILED, SKIPPED, Checkpoint, Pipeline
+
+
+def test_pipeline_runs_independent_stages_concurrently_and_passes_results():
+    """Tests that independent stages overlap and dependents receive their inputs"""
+    both_started = threading.Barrier(2, timeout=5)
+
+    def independent(value):
+        both_started.wait()  # only passes if both stages run at the same time
+        return value
+
+    pipeline = Pipeline()
+    pipeline.add_stage("meta", lambda: independent("meta"))
+    pipeline.add_stage("parse", lambda: independent([1, 2]))
+    pipeline.add_stage("transform", lambda parsed, meta: (sum(parsed), meta), deps=["parse", "meta"])
+
+    results = pipeline.run()
+
+    assert pipeline.status() == {"meta": DONE, "parse": DONE, "transform": DONE}
+    assert results["transform"].value == (3, "meta")
+    assert all(result.seconds is not None for result in results.values())
+
+
+def test_pipeline_runs_subset_with_dependencies():
+    """Tests that a subset run only executes the requested stages and their dependencies"""
+    calls = []
+    pipeline = Pipeline()
+    pipeline.add_stage("meta", lambda: calls.append("meta"))
+    pipeline.add_stage("parse", lambda: calls.append("parse") or {"b11-0": None})
+    pipeline.add_stage("transform", lambda parsed: calls.append("transform"), deps=["parse"])
+
+    assert list(pipeline.run(["meta"])) == ["meta"]
+    assert calls == ["meta"]
+
+    calls.clear()
+    assert list(pipeline.run(["transform"])) == ["parse", "transform"]
+    assert calls == ["parse", "transform"]
+
+    with pytest.raises(ValueError):
+        pipeline.run(["sanity"])
+    with pytest.raises(ValueError):
+        pipeline.add_stage("sanity", lambda: None, deps=["unknown"])
+
+
+def test_pipeline_skips_dependents_of_failed_stage():
+    """Tests that a failing stage skips its dependents but not independent stages"""
+    def fail():
+        raise OSError("missing input")
+
+    pipeline = Pipeline()
+    pipeline.add_stage("meta", lambda: "ok")
+    pipeline.add_stage("parse", fail)
+    pipeline.add_stage("transform", lambda parsed: parsed, deps=["parse"])
+
+    results = pipeline.run()
+
+    assert pipeline.status() == {"meta": DONE, "parse": FAILED, "transform": SKIPPED}
+    assert isinstance(results["parse"].error, OSError)
+
+
+def test_pipeline_resumes_from_valid_checkpoints(tmp_path):
+    """Tests that unchanged stages are skipped and only loaded when a re-running stage needs them"""
+    settings = {"parse": "v1", "transform": "v1"}
+    calls = []
+
+    def make_stage(name, func):
+        output = tmp_path / f"{name}.out"
+
+        def run(*inputs):
+            calls.append(name)
+            output.write_text(name)
+            return func(*inputs)
+
+        def load():
+            calls.append(f"load {name}")
+            return f"loaded {name}"
+
+        checkpoint = Checkpoint(fingerprint=lambda: settings[name], outputs=lambda value: [output], load=load)
+        return run, checkpoint
+
+    def build():
+        store = CheckpointStore(tmp_path)
+        store.load()
+        pipeline = Pipeline(checkpoints=store)
+        run, checkpoint = make_stage("parse", lambda: "parsed")
+        pipeline.add_stage("parse", run, checkpoint=checkpoint)
+        run, checkpoint = make_stage("transform", lambda parsed: f"transformed {parsed}")
+        pipeline.add_stage("transform", run, deps=["parse"], checkpoint=checkpoint)
+        return pipeline
+
+    build().run()
+    assert calls == ["parse", "transform"]
+
+    # nothing changed: no stage runs and nothing is loaded
+    calls.clear()
+    pipeline = build()
+    pipeline.run()
+    assert calls == [] and pipeline.status() == {"parse": CACHED, "transform": CACHED}
+
+    # transform settings changed: parse is loaded from its checkpoint instead of re-run
+    calls.clear()
+    settings["transform"] = "v2"
+    results = build().run()
+    assert calls == ["load parse", "transform"]
+    assert results["transform"].value == "transformed loaded parse"
+
+    # parse inputs changed: the change propagates to the dependent stage
+    calls.clear()
+    settings["parse"] = "v2"
+    build().run()
+    assert calls == ["parse", "transform"]
+
+    calls.clear()
+    build().run(force=True)
+    assert calls == ["parse", "transform"]
+
+
+def test_pipeline_reruns_stages_whose_checkpoint_cannot_be_loaded(tmp_path):
+    """Tests that a failing checkpoint load falls back to running the stage and its cached dependencies load"""
+    settings = {"meta": "v1", "parse": "v1", "transform": "v1"}
+    calls = []
+    broken = set()
+
+    def build():
+        store = CheckpointStore(tmp_path)
+        store.load()
+        pipeline = Pipeline(checkpoints=store)
+        for name, deps in [("meta", []), ("parse", ["meta"]), ("transform", ["parse"])]:
+            output = tmp_path / f"{name}.out"
+
+            def run(*inputs, name=name, output=output):
+                calls.append(name)
+                output.write_text(name)
+                return name
+
+            def load(name=name):
+                calls.append(f"load {name}")
+                if name in broken:
+                    raise EOFError("truncated pickle")
+                return name
+
+            checkpoint = Checkpoint(
+                fingerprint=lambda name=name: settings[name], outputs=lambda value, output=output: [output], load=load
+            )
+            pipeline.add_stage(name, run, deps=deps, checkpoint=checkpoint)
+        return pipeline
+
+    build().run()
+    calls.clear()
+    settings["transform"] = "v2"
+    broken.add("parse")
+    pipeline = build()
+    results = pipeline.run()
+
+    assert calls == ["load parse", "load meta", "parse", "transform"]
+    assert pipeline.status() == {"meta": CACHED, "parse": DONE, "transform": DONE}
+    assert results["transform"].error is None
@@ -0,0 +1,104 @@
+import os
+import tarfile
+import zipfile
+import multiprocessing
+import pytest
+import src.sources
+from src.sources import (
+    archive_session, close_archives, hold_archives, input_name, input_stat, is_streamed, iter_member_bytes, list_inputs,
+    open_input, release_archives, split_locator
+)
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    (tmp_path / "beschreibung_beruf_1_2024.xml").write_bytes(b"<beruf>plain</beruf>")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    with zipfile.ZipFile(tmp_path / "delivery.zip", "w") as zf:
+        zf.writestr("2024/beschreibung_beruf_2_2024.xml", "<beruf>zip</beruf>")
+        zf.writestr("2024/berufe.xml", "<root/>")
+
+    member = tmp_path / "beschreibung_beruf_3_2024.xml"
+    member.write_bytes(b"<beruf>tar</beruf>")
+    with tarfile.open(tmp_path / "delivery.tar.gz", "w:gz") as tf:
+        tf.add(member, arcname="beschreibung_beruf_3_2024.xml")
+    member.unlink()
+
+    yield tmp_path
+    close_archives()
+
+
+def test_list_inputs_finds_plain_files_and_archive_members(raw_dir):
+    """Tests that matching plain files, zip members and tar members are listed"""
+    inputs = sorted(list_inputs(raw_dir, "beschreibung_beruf_"))
+
+    assert [input_name(locator) for locator in inputs] == [
+        "beschreibung_beruf_1_2024.xml",
+        "delivery.tar.gz!/beschreibung_beruf_3_2024.xml",
+        "delivery.zip!/2024/beschreibung_beruf_2_2024.xml",
+    ]
+    assert [input_name(locator) for locator in list_inputs(raw_dir, "berufe")] == ["delivery.zip!/2024/berufe.xml"]
+    assert split_locator(inputs[2]) == (str(raw_dir / "delivery.zip"), "2024/beschreibung_beruf_2_2024.xml")
+    assert [is_streamed(locator) for locator in inputs] == [False, True, False]
+
+
+def test_open_input_and_stat_work_for_all_sources(raw_dir):
+    """Tests reading and stat of plain files and archive members"""
+    for locator in list_inputs(raw_dir, "beschreibung_beruf_"):
+        with open_input(locator) as f:
+            content = f.read()
+        assert content.startswith(b"<beruf>")
+        assert input_stat(locator)[0] == len(content)
+
+    with pytest.raises(FileNotFoundError):
+        input_stat(f"{raw_dir / 'delivery.zip'}!/missing.xml")
+
+
+def test_iter_member_bytes_reads_each_input_once(raw_dir):
+    """Tests that all requested inputs are returned, tar members in one pass"""
+    inputs = list_inputs(raw_dir, "beschreibung_beruf_")
+    contents = dict(iter_member_bytes(inputs))
+
+    assert sorted(contents) == sorted(inputs)
+    assert sorted(contents.values()) == [b"<beruf>plain</beruf>", b"<beruf>tar</beruf>", b"<beruf>zip</beruf>"]
+
+
+def test_archive_session_keeps_zip_open_until_the_outermost_session_ends(raw_dir):
+    """Tests that zip files are reused within nested sessions and closed when the last one ends"""
+    locator = f"{raw_dir / 'delivery.zip'}!/2024/beschreibung_beruf_2_2024.xml"
+    with open_input(locator) as f:
+        f.read()
+    assert src.sources._open_zips == {}
+
+    with archive_session():
+        with archive_session():
+            with open_input(locator) as f:
+                f.read()
+        (zf,) = src.sources._open_zips.values()
+        with open_input(locator) as f:
+            assert f.read() == b"<beruf>zip</beruf>"
+        assert list(src.sources._open_zips.values()) == [zf]
+    assert src.sources._open_zips == {}
+    assert zf.fp is None
+
+
+def _read_in_session(locator):
+    hold_archives()
+    with open_input(locator) as f:
+        assert f.read() == b"<beruf>zip</beruf>"
+    release_archives()
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="needs fork")
+def test_forked_worker_can_take_the_zip_lock_held_at_fork(raw_dir):
+    """Tests that a worker forked while the parent holds the zip lock does not deadlock on it"""
+    locator = f"{raw_dir / 'delivery.zip'}!/2024/beschreibung_beruf_2_2024.xml"
+    with src.sources._zip_lock:
+        process = multiprocessing.get_context("fork").Process(target=_read_in_session, args=(locator,))
+        process.start()
+    process.join(timeout=10)
+    if process.is_alive():
+        process.kill()
+        process.join()
+    assert process.exitcode == 0
@@ -0,0 +1,70 @@
+import dataclasses
+import pytest
+import pandas as pd
+from src.storage import read_bfield, read_bfields, read_frame, write_bfield, write_frame
+from src.texttransformer import TextTransformer
+
+pytest.importorskip("pyarrow")
+
+
+def make_tasks_df():
+    index = pd.MultiIndex.from_tuples(
+        [(1, 2020, 0), (1, 2020, 1), (2, 2021, 0), (3, 2022, 0)], names=["dkz_id", "year", "task_no"]
+    )
+    return pd.DataFrame({
+        "b11-2_text": ["Task A", "Task B", "Task C", "Task D"],
+        "b11-2_revd": ["r1", "r1", "r2", "r3"],
+        "b11-2_normalized": [["task", "a"], ["task", "b"], ["task", "c"], []],
+    }, index=index)
+
+
+def test_write_and_read_partitioned_bfield(tmp_path):
+    """Tests the year-partitioned layout, column projection and partition filters"""
+    df = make_tasks_df()
+    write_bfield(df, tmp_path, "b11-2")
+
+    assert sorted(p.name for p in (tmp_path / "bfield=b11-2").iterdir()) == ["year=2020", "year=2021", "year=2022"]
+
+    full = read_bfield(tmp_path, "b11-2")
+    assert list(full.index.names) == ["dkz_id", "year", "task_no"]
+    assert full["b11-2_text"].tolist() == df["b11-2_text"].tolist()
+    assert [list(tokens) for tokens in full["b11-2_normalized"]] == df["b11-2_normalized"].tolist()
+
+    subset = read_bfield(tmp_path, "b11-2", columns=["b11-2_text"], years=[2020, 2022], memory_map=True)
+    assert list(subset.columns) == ["b11-2_text"]
+    assert subset["b11-2_text"].tolist() == ["Task A", "Task B", "Task D"]
+
+    # the year partition key comes back with the written dtype, not the int32 inferred from directory names
+    assert full.index.dtypes["year"] == df.index.dtypes["year"]
+
+    # a second write replaces the b-field instead of adding to it
+    write_bfield(df.iloc[:1], tmp_path, "b11-2")
+    assert read_bfields(tmp_path)["b11-2"].shape[0] == 1
+
+
+def test_write_and_read_frame_keeps_categorical_index(tmp_path):
+    """Tests single-file parquet for the metadata table"""
+    meta = pd.DataFrame(
+        {"qualistufe": pd.Categorical(["1", "2"]), "kurzbezeichnung": ["A", "B"]},
+        index=pd.Index(pd.array([1000, 2000], dtype="Int64"), name="dkz_id"),
+    )
+    write_frame(meta, tmp_path / "dkz_attributes.parquet")
+
+    pd.testing.assert_frame_equal(read_frame(tmp_path / "dkz_attributes.parquet"), meta)
+    assert list(read_frame(tmp_path / "dkz_attributes.parquet", columns=["kurzbezeichnung"]).columns) == [
+        "kurzbezeichnung"
+    ]
+
+
+def test_transformer_saves_parquet_without_csv(mock_config):
+    """Tests that CSV export is optional in the parquet output format"""
+    params = dataclasses.replace(mock_config.params, output_format="parquet", export_csv=False)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+
+    df = make_tasks_df()
+    transformer._save_df(df, "b11-2")
+
+    processed = mock_config.paths.processed_data_dir
+    assert (processed / "bfields" / "bfield=b11-2").is_dir()
+    assert not (processed / "b11-2.csv").exists()
+    assert not (processed / "b11-2.pkl").exists()
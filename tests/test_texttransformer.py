@@ -1,7 +1,9 @@
 import pytest
+import dataclasses
+import warnings
 import pandas as pd
 from unittest.mock import MagicMock, patch
-from src.texttransformer import TextTransformer
+from src.texttransformer import TextTransformer, load_nlp
 
 # ----- Helper functions (data cleaning) -----
 
@@ -45,6 +47,32 @@ def test_clean_text_columns_removes_special_chars(mock_config):
     assert processor._clean_text_columns(df_no_col, "b11-0").shape == (1, 1)
 
 
+def test_clean_text_columns_keeps_missing_values_and_applies_field_rules(mock_config):
+    """Tests vectorized cleaning with per-b-field rules and missing values"""
+    rules = {"b11-2": [(r"\d+", ""), (r"[!?]", ""), (r"\s+", " ")]}
+    params = dataclasses.replace(mock_config.params, cleaning_rules=rules)
+    processor = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+
+    df = pd.DataFrame({"b11-2_text": ["Task 1 done!", None, "Why?  now"]})
+    df_cleaned = processor._clean_text_columns(df, "b11-2")
+
+    assert df_cleaned.loc[0, "b11-2_text"] == "Task done"
+    assert pd.isna(df_cleaned.loc[1, "b11-2_text"])
+    assert df_cleaned.loc[2, "b11-2_text"] == "Why now"
+
+    # each rule sees the output of the previous one
+    rules = {"b11-2": [("x", ""), ("ab", ""), (r"(?i)C", "c")]}
+    params = dataclasses.replace(mock_config.params, cleaning_rules=rules)
+    ordered = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+    df_ordered = ordered._clean_text_columns(pd.DataFrame({"b11-2_text": ["axb", "axbC"]}), "b11-2")
+    assert df_ordered["b11-2_text"].tolist() == ["", "c"]
+
+    # b-fields without rules use the default pattern
+    df_default = processor._clean_text_columns(pd.DataFrame({"b11-0_text": ["A1 b?", None]}), "b11-0")
+    assert df_default.loc[0, "b11-0_text"] == "A b"
+    assert pd.isna(df_default.loc[1, "b11-0_text"])
+
+
 # ----- Normalization method mocking -----
 @patch('src.texttransformer.TextTransformer.normalize')
 def test_normalize_columns_creates_new_column(mock_normalize, mock_config):
@@ -64,6 +92,58 @@ def test_normalize_columns_creates_new_column(mock_normalize, mock_config):
     # check if normalize method was called with text list
     mock_normalize.assert_called_once()
     assert mock_normalize.call_args[0][0] == ["Text A", "Text B"]
+    assert mock_normalize.call_args.kwargs["n_process"] == mock_config.params.nlp_n_process
+    assert mock_normalize.call_args.kwargs["batch_size"] == mock_config.params.nlp_batch_size
+
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_normalize_columns_deduplicates_texts(mock_normalize, mock_config):
+    """Tests that every distinct text is normalized once and scattered back to all rows"""
+    processor = TextTransformer(config=mock_config)
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+
+    df = pd.DataFrame({"b11-2_text": ["Task A", "Task B", "Task A", "Task A"]})
+    df_norm = processor._normalize_columns(df, "b11-2")
+
+    assert mock_normalize.call_args[0][0] == ["Task A", "Task B"]
+    assert list(df_norm["b11-2_normalized"]) == [["task", "a"], ["task", "b"], ["task", "a"], ["task", "a"]]
+
+
+@patch('src.texttransformer.load_nlp')
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_lemma_cache_is_reused_across_runs(mock_normalize, mock_load_nlp, mock_config):
+    """Tests that the persistent lemma cache serves texts normalized in an earlier run"""
+    mock_load_nlp.return_value = MagicMock(meta={"version": "3.8.0"})
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, lemma_cache_size=100)
+    cfg = dataclasses.replace(mock_config, params=params)
+
+    TextTransformer(config=cfg).run_transformation_pipeline(
+        {"b11-0": pd.DataFrame({"b11-0_text": ["Text A", "Text B"]})}, save=False
+    )
+    mock_normalize.reset_mock()
+    result = TextTransformer(config=cfg).run_transformation_pipeline(
+        {"b11-2": pd.DataFrame({"b11-2_text": ["Text B", "Text C"]})}, save=False
+    )
+
+    assert mock_normalize.call_args[0][0] == ["Text C"]
+    assert list(result["b11-2"]["b11-2_normalized"]) == [["text", "b"], ["text", "c"]]
+
+
+@patch('src.texttransformer.load_nlp')
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_lemma_cache_is_not_shared_across_excluded_components(mock_normalize, mock_load_nlp, mock_config):
+    """Tests that a different spacy_exclude does not reuse cached lemmas"""
+    mock_load_nlp.return_value = MagicMock(meta={"version": "3.8.0"})
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+
+    for exclude in [("parser", "ner"), ("parser", "ner", "morphologizer")]:
+        params = dataclasses.replace(mock_config.params, lemma_cache_size=100, spacy_exclude=exclude)
+        mock_normalize.reset_mock()
+        TextTransformer(config=dataclasses.replace(mock_config, params=params)).run_transformation_pipeline(
+            {"b11-0": pd.DataFrame({"b11-0_text": ["Text A"]})}, save=False
+        )
+        assert mock_normalize.call_args[0][0] == ["Text A"]
+
 
 def test_static_normalize_method_removes_stopwords_and_lemmatizes():
     """Tests static normalize-method with spacy mock"""
@@ -90,17 +170,301 @@ def test_static_normalize_method_removes_stopwords_and_lemmatizes():
     mock_nlp = MagicMock()
     mock_nlp.pipe.return_value = [mock_doc]
 
+    load_nlp.cache_clear()
     with patch('src.texttransformer.spacy.load', return_value=mock_nlp) as mock_spacy_load:
         texts = ["Testtext mit Aufgaben der."]
         normalized = TextTransformer.normalize(texts, nlp=None)  # nlp=None forces spacy.load
 
         # Keep only cleaned lemma
         assert normalized == [['aufgabe']]
-        mock_spacy_load.assert_called_once_with("de_core_news_lg")
+        mock_spacy_load.assert_called_once_with("de_core_news_lg", exclude=["parser", "ner"])
+    load_nlp.cache_clear()
+
+
+def test_load_nlp_loads_each_model_once():
+    """Tests the process-wide model cache"""
+    load_nlp.cache_clear()
+    with patch('src.texttransformer.spacy.load', side_effect=lambda *args, **kwargs: MagicMock()) as mock_spacy_load:
+        first = load_nlp("de_core_news_lg", ("parser", "ner"))
+        second = load_nlp("de_core_news_lg", ("parser", "ner"))
+        other = load_nlp("de_core_news_sm", ("parser",))
+
+        assert first is second
+        assert other is not first
+        assert mock_spacy_load.call_count == 2
+    load_nlp.cache_clear()
 
     #todo textlen_test
 
 # ----- Pipeline and logic test -----
 
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_run_transformation_pipeline_skips_unrequested_bfields(mock_normalize, mock_config, sample_df_dict):
+    """Tests that only b-fields in tags_to_extract are transformed"""
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [[t] for t in texts]
+    sample_df_dict["b20-32"] = pd.DataFrame({"b20-32_text": [["100"]], "b20-32_revd": ["1.0"]})
+
+    result = TextTransformer(config=mock_config).run_transformation_pipeline(sample_df_dict, save=False)
+
+    assert "b11-0_normalized" in result["b11-0"].columns
+    assert "b11-2_normalized" in result["b11-2"].columns
+    assert "b20-32_normalized" not in result["b20-32"].columns
+
 
     #todo test_run_transfromation_pipeline_calls_steps_returns_dict
+
+
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_incremental_transform_only_normalizes_changed_rows(mock_normalize, mock_config):
+    """Tests that stored rows are reused and only revised or changed texts are normalized"""
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, incremental_transform=True)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+
+    def make_df(texts, revds):
+        index = pd.MultiIndex.from_tuples([(1, 2020), (2, 2020), (3, 2020)], names=["dkz_id", "year"])
+        return pd.DataFrame({"b11-0_text": texts, "b11-0_revd": revds}, index=index)
+
+    first = transformer.run_transformation_pipeline(
+        {"b11-0": make_df(["Text A", "Text B", "Text C"], ["1", "1", "1"])}, save=False
+    )["b11-0"]
+
+    mock_normalize.reset_mock()
+    second = transformer.run_transformation_pipeline(
+        {"b11-0": make_df(["Text A", "Text B!", "Text C"], ["1", "1", "2"])}, save=False
+    )["b11-0"]
+
+    assert mock_normalize.call_args[0][0] == ["Text B", "Text C"]
+    assert list(first["b11-0_normalized"]) == [["text", "a"], ["text", "b"], ["text", "c"]]
+    assert list(second["b11-0_normalized"]) == [["text", "a"], ["text", "b"], ["text", "c"]]
+    assert list(second["b11-0_text"]) == ["Text A", "Text B", "Text C"]
+
+    # same frame and dtypes as a cold run
+    cold = TextTransformer(config=mock_config).run_transformation_pipeline(
+        {"b11-0": make_df(["Text A", "Text B!", "Text C"], ["1", "1", "2"])}, save=False
+    )["b11-0"]
+    assert second.dtypes.to_dict() == cold.dtypes.to_dict()
+    pd.testing.assert_frame_equal(second, cold)
+
+
+@patch('src.texttransformer.spacy.util.get_package_version')
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_incremental_transform_renormalizes_after_model_upgrade(mock_normalize, mock_version, mock_config):
+    """Tests that stored rows are not reused once the spaCy model version changes"""
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, incremental_transform=True)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+    df = pd.DataFrame({"b11-0_text": ["Text A", "Text B"], "b11-0_revd": ["1", "1"]})
+
+    mock_version.return_value = "3.7.0"
+    transformer.run_transformation_pipeline({"b11-0": df.copy()}, save=False)
+    mock_normalize.reset_mock()
+    mock_version.return_value = "3.8.0"
+    transformer.run_transformation_pipeline({"b11-0": df.copy()}, save=False)
+
+    assert mock_normalize.call_args[0][0] == ["Text A", "Text B"]
+
+
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_compact_tokens_replace_normalized_column(mock_normalize, mock_config, tmp_path):
+    """Tests compact token storage and vectorized text length"""
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, compact_tokens=True)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+
+    df = pd.DataFrame({"b11-2_text": ["Task A", "Task B long", None]})
+    result = transformer.run_transformation_pipeline({"b11-2": df}, save=True)["b11-2"]
+
+    assert "b11-2_normalized" not in result.columns
+    assert list(result["b11-2_len"]) == [2, 3]
+    assert list(transformer.get_normalized("b11-2")) == [["task", "a"], ["task", "b", "long"]]
+    assert (mock_config.paths.processed_data_dir / "b11-2_tokens.npz").exists()
+
+
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_compact_tokens_stay_aligned_with_loaded_parquet_rows(mock_normalize, mock_config):
+    """Tests that tokens loaded for a resumed parquet run pair with the key-sorted rows"""
+    pytest.importorskip("pyarrow")
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, compact_tokens=True, output_format="parquet")
+    config = dataclasses.replace(mock_config, params=params)
+
+    index = pd.MultiIndex.from_arrays([[3, 1, 2], [2024] * 3], names=["dkz_id", "year"])
+    df = pd.DataFrame({"b11-2_text": ["drei drei drei", "eins", "zwei zwei"]}, index=index)
+    TextTransformer(config=config).run_transformation_pipeline({"b11-2": df}, save=True)
+
+    resumed = TextTransformer(config=config)
+    loaded = resumed.load_transformed(["b11-2"])["b11-2"]
+    assert list(loaded.index.get_level_values("dkz_id")) == [1, 2, 3]
+    assert list(resumed.get_normalized("b11-2")) == [["eins"], ["zwei", "zwei"], ["drei", "drei", "drei"]]
+    assert list(loaded["b11-2_len"]) == [1, 2, 3]
+
+
+@patch('src.texttransformer.load_nlp')
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_parallel_bfields_match_sequential_run(mock_normalize, mock_load_nlp, mock_config):
+    """Tests that b-fields transformed in worker processes give the sequential result and fill the lemma cache"""
+    mock_load_nlp.return_value = MagicMock(meta={"version": "3.8.0"})
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+
+    def make_dict():
+        return {
+            "b11-0": pd.DataFrame({"b11-0_text": ["Summary A", None], "b11-0_revd": ["1", "1"]}),
+            "b11-2": pd.DataFrame({"b11-2_text": ["Task A", "Task B", "Task A"], "b11-2_revd": ["1"] * 3}),
+        }
+
+    sequential = TextTransformer(config=mock_config).run_transformation_pipeline(make_dict(), save=False)
+
+    params = dataclasses.replace(mock_config.params, field_workers=2, lemma_cache_size=100)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+    parallel = transformer.run_transformation_pipeline(make_dict(), save=False)
+
+    assert list(parallel) == list(sequential)
+    for b_field in sequential:
+        pd.testing.assert_frame_equal(parallel[b_field], sequential[b_field])
+    assert len(transformer._lemma_cache.entries) == 3
+    assert (mock_config.paths.intermediate_data_dir / "lemma_cache.pkl").exists()
+
+
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_field_workers_share_the_spacy_processes(mock_normalize, mock_config):
+    """Tests that each field worker lemmatizes with its share of nlp_n_process"""
+    from concurrent.futures import Future
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+
+    class InlineExecutor:
+        """Runs the worker initializer and jobs in this process"""
+
+        def __init__(self, max_workers, initializer, initargs):
+            self.max_workers = max_workers
+            initializer(*initargs)
+
+        def submit(self, func, *args):
+            future = Future()
+            future.set_result(func(*args))
+            return future
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    params = dataclasses.replace(mock_config.params, field_workers=7, nlp_n_process=7)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+    df_dict = {
+        "b11-0": pd.DataFrame({"b11-0_text": ["Summary A"], "b11-0_revd": ["1"]}),
+        "b11-2": pd.DataFrame({"b11-2_text": ["Task A"], "b11-2_revd": ["1"]}),
+    }
+    with patch("src.texttransformer.ProcessPoolExecutor", InlineExecutor):
+        transformer.run_transformation_pipeline(df_dict, save=False)
+
+    # two fields: two workers with three of the seven processes each
+    assert [call.kwargs["n_process"] for call in mock_normalize.call_args_list] == [3, 3]
+
+
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_transformation_stream_appends_batches(mock_normalize, mock_config):
+    """Tests that streamed batches are written as parts that add up to the in-memory transformation"""
+    pytest.importorskip("pyarrow")
+    from src.storage import read_bfield
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, output_format="parquet")
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+
+    def make_batch(ids, texts):
+        index = pd.MultiIndex.from_arrays([ids, [2024] * len(ids)], names=["dkz_id", "year"])
+        return {"b11-0": pd.DataFrame({"b11-0_revd": "1", "b11-0_text": texts}, index=index)}
+
+    batches = [make_batch([1, 2], ["Text A", None]), make_batch([3], ["Text C!"])]
+    rows = transformer.run_transformation_stream(iter(batches))
+
+    assert rows == {"b11-0": 2}
+    written = read_bfield(mock_config.paths.processed_data_dir / "bfields", "b11-0")
+    assert list(written.index.get_level_values("dkz_id")) == [1, 3]
+    assert [list(tokens) for tokens in written["b11-0_normalized"]] == [["text", "a"], ["text", "c"]]
+
+    # a new stream replaces the parts of the previous one
+    transformer.run_transformation_stream(iter(batches[1:]))
+    assert read_bfield(mock_config.paths.processed_data_dir / "bfields", "b11-0").shape[0] == 1
+
+
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_transformation_stream_chunks_rows_with_sizer(mock_normalize, mock_config):
+    """Tests that a sizer splits the frames of a batch into separately normalized chunks"""
+    from src.memory import BatchSizer
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, nlp_n_process=2)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+    index = pd.MultiIndex.from_arrays([[1, 2, 3], [2024] * 3], names=["dkz_id", "year"])
+    batch = {"b11-0": pd.DataFrame({"b11-0_revd": "1", "b11-0_text": ["A a", "B b", "C c"]}, index=index)}
+
+    rows = transformer.run_transformation_stream(iter([batch]), sizer=BatchSizer(10 ** 6, initial=2, maximum=2))
+
+    assert rows == {"b11-0": 3}
+    assert mock_normalize.call_count == 2
+    # no spaCy pool is started per chunk
+    assert [call.kwargs["n_process"] for call in mock_normalize.call_args_list] == [1, 1]
+    assert transformer.n_process == 2
+    parts = sorted((mock_config.paths.processed_data_dir / "b11-0_parts").glob("part-*.pkl"))
+    assert [pd.read_pickle(part).shape[0] for part in parts] == [2, 1]
+
+
+@pytest.mark.parametrize("inplace", [False, True])
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_transform_field_without_chained_assignment_warnings(mock_normalize, mock_config, inplace):
+    """Tests that a b-field slice is transformed without warnings and only changed in place mode"""
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    params = dataclasses.replace(mock_config.params, transform_inplace=inplace)
+    transformer = TextTransformer(config=dataclasses.replace(mock_config, params=params))
+    parent = pd.DataFrame({"b11-0_revd": "1", "b11-0_text": ["Text A!", None, "Text B"], "b11-2_text": "x"})
+    df = parent[["b11-0_revd", "b11-0_text"]]  # column slice, as split off per b-field
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = transformer._transform_field(df, "b11-0")
+
+    assert list(result["b11-0_normalized"]) == [["text", "a"], ["text", "b"]]
+    assert (result is df) == inplace
+    assert ("b11-0_normalized" in df.columns) == inplace
+    assert parent["b11-0_text"].tolist() == ["Text A!", None, "Text B"]
+
+
+@pytest.mark.parametrize("storage_mode", ["wide", "long"])
+@patch('src.texttransformer.TextTransformer.normalize')
+def test_inplace_transform_does_not_change_queued_parse_output(
+        mock_normalize, mock_config, mock_occ_xml_content, storage_mode
+):
+    """Tests that the parse output is written as parsed while an in-place transformation runs on its frames"""
+    import threading
+    from src.writer import make_writer
+    from src.xmlprocessor import XMLProcessor
+    mock_normalize.side_effect = lambda texts, *args, **kwargs: [t.lower().split() for t in texts]
+    for i in range(2):
+        (mock_config.paths.raw_data_dir / f"beschreibung_beruf_{i}_2024.xml").write_text(mock_occ_xml_content)
+    params = dataclasses.replace(
+        mock_config.params, storage_mode=storage_mode, transform_inplace=True, output_format="parquet",
+        write_queue_size=2
+    )
+    config = dataclasses.replace(mock_config, params=params)
+
+    # the parse output is written only after the transformation has finished
+    transformed = threading.Event()
+    written = {}
+
+    def slow_write(df, root, bfield):
+        transformed.wait(10)
+        written[bfield] = df.copy()
+
+    writer = make_writer(params.write_queue_size)
+    with patch("src.xmlprocessor.write_bfield", side_effect=slow_write):
+        try:
+            parsed = XMLProcessor(config=config, writer=writer).run_occparsing_pipeline(save=True)
+            raw_tasks = parsed["b11-2"]["b11-2_text"].tolist()
+            TextTransformer(config=config, writer=writer).run_transformation_pipeline(parsed, save=False)
+        finally:
+            transformed.set()
+            assert writer.close() == []
+
+    assert list(written["b11-2"].columns) == ["b11-2_revd", "b11-2_text"]
+    assert written["b11-2"]["b11-2_text"].tolist() == raw_tasks
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from src.tokens import TokenTable
+
+TOKEN_LISTS = [["kunde", "beraten"], [], ["anlage", "warten", "kunde"]]
+
+
+def test_token_table_round_trip_and_lengths():
+    """Tests CSR construction, lengths and lazy row access"""
+    table = TokenTable.from_lists(TOKEN_LISTS)
+
+    assert len(table) == 3
+    assert table.ids.dtype == np.int32
+    assert list(table.offsets) == [0, 2, 2, 5]
+    assert list(table.lengths()) == [2, 0, 3]
+    assert list(table.vocab) == ["kunde", "beraten", "anlage", "warten"]
+    assert table[2] == ["anlage", "warten", "kunde"]
+    assert table[-1] == ["anlage", "warten", "kunde"]
+    assert list(table) == TOKEN_LISTS
+    assert table.to_lists() == TOKEN_LISTS
+
+
+def test_token_table_take_filter_and_drop_tokens():
+    """Tests vectorized row selection and token filtering"""
+    table = TokenTable.from_lists(TOKEN_LISTS)
+
+    assert table.take([2, 0, 2]).to_lists() == [TOKEN_LISTS[2], TOKEN_LISTS[0], TOKEN_LISTS[2]]
+    assert table.filter([True, False, True]).to_lists() == [TOKEN_LISTS[0], TOKEN_LISTS[2]]
+    assert table[1:].to_lists() == TOKEN_LISTS[1:]
+    assert table.drop_tokens(["kunde"]).to_lists() == [["beraten"], [], ["anlage", "warten"]]
+
+
+def test_token_table_export_and_save(tmp_path):
+    """Tests long-format export and npz persistence"""
+    table = TokenTable.from_lists(TOKEN_LISTS)
+    index = pd.MultiIndex.from_tuples([(1, 2020), (2, 2020), (3, 2021)], names=["dkz_id", "year"])
+
+    frame = table.to_frame(index=index)
+    assert list(frame["token"]) == ["kunde", "beraten", "anlage", "warten", "kunde"]
+    assert list(frame["position"]) == [0, 1, 0, 1, 2]
+    assert list(frame.index) == [(1, 2020), (1, 2020), (3, 2021), (3, 2021), (3, 2021)]
+
+    table.save(tmp_path / "tokens.npz")
+    assert TokenTable.load(tmp_path / "tokens.npz").to_lists() == TOKEN_LISTS
@@ -0,0 +1,55 @@
+import threading
+import time
+from src.writer import AsyncWriter, SyncWriter, make_writer
+
+
+def test_async_writer_keeps_order_and_waits_on_close():
+    """Tests that queued writes run in submission order and close waits for all of them"""
+    written = []
+
+    def slow_write(item):
+        time.sleep(0.01)
+        written.append(item)
+
+    writer = AsyncWriter(max_pending=2)
+    for i in range(5):
+        writer.submit(f"item {i}", slow_write, i)
+
+    assert writer.close() == []
+    assert written == [0, 1, 2, 3, 4]
+
+
+def test_async_writer_applies_backpressure():
+    """Tests that submit blocks once max_pending writes are queued"""
+    release = threading.Event()
+    writer = AsyncWriter(max_pending=1)
+    writer.submit("blocking", release.wait)  # taken by the writer thread
+    writer.submit("queued", lambda: None)  # fills the queue
+
+    submitted = threading.Event()
+    producer = threading.Thread(target=lambda: (writer.submit("third", lambda: None), submitted.set()))
+    producer.start()
+    assert not submitted.wait(0.1)
+
+    release.set()
+    assert submitted.wait(1)
+    producer.join()
+    writer.close()
+
+
+def test_writers_report_failures():
+    """Tests that failing writes are collected per label without stopping later writes"""
+    written = []
+
+    def fail():
+        raise OSError("disk full")
+
+    for writer in (make_writer(0), make_writer(2)):
+        with writer:
+            writer.submit("broken", fail)
+            writer.submit("fine", written.append, "ok")
+        assert [label for label, _ in writer.failures] == ["broken"]
+        assert isinstance(writer.failures[0][1], OSError)
+
+    assert isinstance(make_writer(0), SyncWriter) and not isinstance(make_writer(0), AsyncWriter)
+    assert written == ["ok", "ok"]
@@ -0,0 +1,102 @@
+import dataclasses
+import xml.etree.ElementTree as ET
+import pytest
+from src.xmlbackend import StdlibBackend, extract_text_b112, lxml_etree, make_backend
+from src.xmlprocessor import XMLProcessor
+
+pytest.importorskip("lxml")
+
+# nested markup, tails, comments, entities, nested list items, excluded tags and incomplete references
+OCC_XML_SAMPLES = [
+    """<beruf>
+        <b11-2 rev="2020-01-01">
+            <listitem>Task A</listitem>
+            <listitem>Task B with <b>formatting</b> and tail</listitem>
+            <listitem>  <i> spaced </i>  <note>hidden</note> after note </listitem>
+            <listitem>Outer <ul><listitem>Inner</listitem> between</ul> end</listitem>
+            <irrelevant_tag>Ignore</irrelevant_tag>
+        </b11-2>
+        <b11-0 rev="2020-01-01"><p>Short &amp; <b>bold</b>.</p><!-- comment --><p>Second<?pi x?> part</p></b11-0>
+        <b11-1 rev="2020-02-01">Lead <p>one <note>skip</note> two</p> tail <p/> last</b11-1>
+        <b20-32 rev="2020-01-01">
+             <extsysref matrix="true" idref="100"/>
+             <group><extsysref matrix="true"/></group>
+             <extsysref matrix="false" idref="300"/>
+        </b20-32>
+    </beruf>""",
+    """<beruf><b11-2 rev="x"/><b11-0 rev="y">  </b11-0><b11-1>text<!-- c -->joined</b11-1></beruf>""",
+    # nesting beyond lxml's default limit and the former recursive extractors
+    "<beruf><b11-0>{0}{1}</b11-0><b11-1>{0}<note>skip</note>{1}</b11-1><b11-2><listitem>{0}{1}</listitem></b11-2>"
+    "</beruf>".format(
+        "".join(f"<p>level {i} " for i in range(1500)), "".join(f"</p> tail {i}" for i in range(1500))
+    ),
+]
+META_XML = """<root>
+    <beruf id="1" codenr="B 12345-101" kurzbezeichnung="K&#252;che" qualistufe="2" reglementiert="nein">
+        <nachfolger id="2" codenr="B 54321-100"/><!-- comment -->
+    </beruf>
+    <beruf id="2" codenr="B 54321-100" bkgr="9"/>
+</root>"""
+
+
+def make_processor(config, backend, exclude_tags=None):
+    params = dataclasses.replace(
+        config.params, xml_backend=backend, tags_to_extract=[], tag_map={**config.params.tag_map, "b11-1": "Description"}
+    )
+    return XMLProcessor(config=dataclasses.replace(config, params=params), exclude_tags=exclude_tags)
+
+
+def test_make_backend_resolves_names():
+    """Tests that auto prefers lxml and unknown backend names are rejected"""
+    assert make_backend("auto").name == "lxml"
+    assert isinstance(make_backend("stdlib"), StdlibBackend)
+    with pytest.raises(ValueError):
+        make_backend("sax")
+
+
+@pytest.mark.parametrize("exclude_tags", [None, ["note"], ["note", "b11-1"]])
+@pytest.mark.parametrize("sample", range(len(OCC_XML_SAMPLES)))
+def test_lxml_backend_matches_stdlib_rows(mock_config, exclude_tags, sample):
+    """Tests that both backends parse identical occupation rows"""
+    path = mock_config.paths.raw_data_dir / "beschreibung_beruf_123_2024.xml"
+    path.write_text(OCC_XML_SAMPLES[sample], encoding="utf-8")
+
+    stdlib = make_processor(mock_config, "stdlib", exclude_tags)
+    lxml = make_processor(mock_config, "lxml", exclude_tags)
+
+    expected = stdlib._parse_occ_xml_to_dict(path)
+    assert lxml.backend.name == "lxml"
+    assert set(expected) >= {"b11-0_text", "b11-1_text", "b11-2_text"}
+    assert lxml._parse_occ_xml_to_dict(path) == expected
+
+
+@pytest.mark.parametrize("exclude_tags, expected", [
+    (None, ["Task A", "Task B with formatting and tail", "spaced  hidden after note", "Outer between end", "Inner"]),
+    (frozenset(["note"]), ["Task A", "Task B with formatting and tail", "spaced", "Outer between end", "Inner"]),
+])
+def test_extract_text_b112_strips_each_level_and_skips_nested_items(exclude_tags, expected):
+    """Tests list item texts: nested items keep only their tail, excluded elements lose theirs"""
+    xml = OCC_XML_SAMPLES[0].split("<b11-0")[0].split("<beruf>")[1]
+    for element in (ET.fromstring(xml), lxml_etree.fromstring(xml)):
+        assert extract_text_b112(element, exclude_tags) == expected
+
+
+def test_extract_text_b112_strips_whitespace_only_levels():
+    """Tests that levels left empty by stripping add nothing to their parent's text"""
+    xml = (
+        "<r><listitem> <b> <i> </i> </b> x <b> y <i> </i></b> z<b><i> </i> </b></listitem>"
+        "<listitem> <b> <i> </i> </b> </listitem></r>"
+    )
+    for element in (ET.fromstring(xml), lxml_etree.fromstring(xml)):
+        assert extract_text_b112(element) == ["x y z"]
+
+
+def test_lxml_backend_matches_stdlib_metadata(mock_config):
+    """Tests that both backends build identical metadata frames"""
+    (mock_config.paths.raw_data_dir / "berufe.xml").write_text(META_XML, encoding="utf-8")
+
+    stdlib = make_processor(mock_config, "stdlib")._parse_meta_xml_to_data_frame()
+    lxml = make_processor(mock_config, "lxml")._parse_meta_xml_to_data_frame()
+
+    assert stdlib.loc[1, "kurzbezeichnung"] == "Küche"
+    assert lxml.equals(stdlib)
@@ -1,6 +1,10 @@
 import pytest
 import os
+import json
+import hashlib
+import dataclasses
 import pandas as pd
+from unittest.mock import patch
 from src.xmlprocessor import XMLProcessor
 
 # ----- Initialization-----
@@ -50,7 +54,7 @@ def test_get_input_files_handles_file_not_found_error(mock_config):
 # ----- Parsing methods -----
 def test_parse_occ_xml_to_dict_extracts_correct_data(mock_config, mock_occ_xml_content, tmp_path):
     """Tests _parse_occ_xml_to_dict with mock XML content"""
-    processor = XMLProcessor(config=mock_config)
+    processor = XMLProcessor(config=mock_config, tags_to_extract=list(mock_config.params.tag_map))
 
     # Create mock XML file (Simulation: dkz_id 123, year 2024)
     mock_file = tmp_path / "beschreibung_beruf_123_2024.xml"
@@ -68,6 +72,131 @@ def test_parse_occ_xml_to_dict_extracts_correct_data(mock_config, mock_occ_xml_c
     assert result["b20-32_text"] == ["100", "200"]
 
 
+def test_parse_occ_xml_to_dict_uses_registered_extractors_on_top_level_fields(mock_config, tmp_path):
+    """Tests that only top-level b-fields are dispatched to their registered extractor"""
+    processor = XMLProcessor(config=mock_config, tags_to_extract=list(mock_config.params.tag_map))
+    processor.register_extractor("b20-32", lambda element, exclude_tags: element.get("rev"))
+
+    mock_file = tmp_path / "beschreibung_beruf_5_2021.xml"
+    mock_file.write_text(
+        "<beruf>"
+        "<b20-32 rev='r1'><b11-0 rev='nested'>Not top level</b11-0></b20-32>"
+        "<b11-0 rev='r2'><p>Summary</p></b11-0>"
+        "</beruf>"
+    )
+    result = processor._parse_occ_xml_to_dict(mock_file)
+
+    assert result["b20-32_text"] == "r1"
+    assert result["b11-0_revd"] == "r2"
+    assert result["b11-0_text"] == "Summary"
+    assert "b11-2_text" not in result
+
+
+def test_parse_occ_xml_to_dict_only_extracts_requested_bfields(mock_config, mock_occ_xml_content, tmp_path):
+    """Tests projection pushdown with the default tags_to_extract (b11-0, b11-2)"""
+    processor = XMLProcessor(config=mock_config)
+    processor.extractors["b11-0"] = lambda element, exclude_tags: "summary"
+
+    mock_file = tmp_path / "beschreibung_beruf_123_2024.xml"
+    mock_file.write_text(mock_occ_xml_content)
+    result = processor._parse_occ_xml_to_dict(mock_file)
+
+    assert processor.bfields == ["b11-2", "b11-0"]
+    assert result["b11-0_text"] == "summary"
+    assert result["b11-2_text"] == ["Task A", "Task B with formatting"]
+    assert "b20-32_text" not in result
+    assert "b20-32_revd" not in result
+
+
+def test_parallel_parsing_matches_serial_and_reports_malformed_files(mock_config, mock_occ_xml_content):
+    """Tests process pool parsing against the serial path with one broken file"""
+    raw_dir = mock_config.paths.raw_data_dir
+    for i in range(6):
+        (raw_dir / f"beschreibung_beruf_{100 + i}_2024.xml").write_text(mock_occ_xml_content)
+    (raw_dir / "beschreibung_beruf_999_2024.xml").write_text("<beruf><b11-0>")
+
+    serial = XMLProcessor(config=mock_config)
+    serial_df = serial._process_occdata_to_dataframe()
+
+    params = dataclasses.replace(mock_config.params, parse_workers=2, parse_chunksize=2)
+    parallel = XMLProcessor(config=dataclasses.replace(mock_config, params=params))
+    parallel_df = parallel._process_occdata_to_dataframe()
+
+    assert parallel_df.shape[0] == 6
+    pd.testing.assert_frame_equal(serial_df, parallel_df)
+    assert [os.path.basename(f) for f in parallel.failed_files] == ["beschreibung_beruf_999_2024.xml"]
+
+
+def test_incremental_parsing_only_parses_changed_files_and_matches_cold_run(mock_config, mock_occ_xml_content):
+    """Tests manifest-based re-runs: new/changed files are parsed, deleted files dropped"""
+    raw_dir = mock_config.paths.raw_data_dir
+    for i in range(3):
+        (raw_dir / f"beschreibung_beruf_{i}_2024.xml").write_text(mock_occ_xml_content)
+
+    params = dataclasses.replace(mock_config.params, incremental_parsing=True)
+    incremental_cfg = dataclasses.replace(mock_config, params=params)
+    XMLProcessor(config=incremental_cfg)._process_occdata_to_dataframe()
+
+    # new delivery: one changed, one deleted, one new file
+    (raw_dir / "beschreibung_beruf_0_2024.xml").write_text(
+        mock_occ_xml_content.replace("Task A", "Task A changed")
+    )
+    (raw_dir / "beschreibung_beruf_1_2024.xml").unlink()
+    (raw_dir / "beschreibung_beruf_3_2024.xml").write_text(mock_occ_xml_content)
+
+    processor = XMLProcessor(config=incremental_cfg)
+    with patch.object(processor, "_parse_occ_xml_to_dict", wraps=processor._parse_occ_xml_to_dict) as spy:
+        incremental_df = processor._process_occdata_to_dataframe()
+    parsed = sorted(os.path.basename(call.args[0]) for call in spy.call_args_list)
+
+    assert parsed == ["beschreibung_beruf_0_2024.xml", "beschreibung_beruf_3_2024.xml"]
+    cold_df = XMLProcessor(config=mock_config)._process_occdata_to_dataframe()
+    pd.testing.assert_frame_equal(incremental_df, cold_df)
+    assert "Task A changed" in incremental_df.set_index("dkz_id").loc[0, "b11-2_text"]
+
+
+def test_incremental_parsing_opens_a_tar_archive_once_per_pass(mock_config, mock_occ_xml_content, tmp_path):
+    """Tests that tar members are hashed from the parsing pass instead of reopening the archive per member"""
+    import tarfile
+    import src.sources
+
+    archive_dir = tmp_path / "archives"
+    archive_dir.mkdir()
+
+    def write_archive(changed: int):
+        with tarfile.open(archive_dir / "delivery.tar.gz", "w:gz") as tf:
+            for i in range(6):
+                content = mock_occ_xml_content.replace("Task A", "Task A changed") if i == changed else mock_occ_xml_content
+                member = tmp_path / f"beschreibung_beruf_{i}_2024.xml"
+                member.write_text(content)
+                os.utime(member, ns=(10 ** 18 + i + changed, 10 ** 18 + i + changed))
+                tf.add(member, arcname=member.name)
+
+    paths = dataclasses.replace(mock_config.paths, raw_data_dir=archive_dir)
+    params = dataclasses.replace(mock_config.params, incremental_parsing=True)
+    config = dataclasses.replace(mock_config, paths=paths, params=params)
+
+    opens = []
+    real_open = tarfile.open
+
+    def counting_open(*args, **kwargs):
+        opens.append(kwargs.get("mode"))
+        return real_open(*args, **kwargs)
+
+    for changed in (-1, 2):
+        write_archive(changed)
+        opens.clear()
+        with patch.object(src.sources.tarfile, "open", side_effect=counting_open):
+            df = XMLProcessor(config=config)._process_occdata_to_dataframe()
+        # one listing of the archive index, one sequential read
+        assert opens == ["r:*", "r|*"]
+        assert df.shape[0] == 6
+
+    manifest = json.loads((mock_config.paths.intermediate_data_dir / "occ_manifest.json").read_text())
+    digest = manifest["files"][f"{archive_dir / 'delivery.tar.gz'}!/beschreibung_beruf_2_2024.xml"]["sha256"]
+    assert digest == hashlib.sha256((tmp_path / "beschreibung_beruf_2_2024.xml").read_bytes()).hexdigest()
+
+
 def test_parse_meta_xml_to_data_frame_creates_correct_df(mock_config, mock_meta_xml_content, tmp_path):
     """Tests metadata parsing with mock metadata XML"""
     processor = XMLProcessor(config=mock_config)
@@ -88,6 +217,24 @@ def test_parse_meta_xml_to_data_frame_creates_correct_df(mock_config, mock_meta_
     assert pd.isna(df.loc[2000, "nf_dkz_id"])  # nan in Int64 is <NA>
 
 
+def test_parse_meta_xml_to_data_frame_uses_typed_columns(mock_config, mock_meta_xml_content):
+    """Tests dtypes of the streamed metadata columns"""
+    processor = XMLProcessor(config=mock_config)
+    (mock_config.paths.raw_data_dir / "berufe_meta_1.xml").write_text(mock_meta_xml_content)
+
+    df = processor._parse_meta_xml_to_data_frame(prefix="berufe")
+
+    assert str(df.index.dtype) == "Int64"
+    assert str(df["fuenfsteller"].dtype) == "Int64"
+    assert str(df["vg_fuenfsteller"].dtype) == "Int64"
+    assert isinstance(df["qualistufe"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["bkgr"].dtype, pd.CategoricalDtype)
+    assert df.loc[1000, "fuenfsteller"] == 10000
+    assert df.loc[2000, "vg_fuenfsteller"] == 20000
+    assert df.loc[2000, "qualistufe"] == "2"
+    assert pd.isna(df.loc[1000, "bkgr"])
+
+
 # ----- DataFrame methods -----
 def test_set_and_clean_index_sets_correct_multiindex(mock_config):
     """Tests index setting and integrity check"""
@@ -138,6 +285,28 @@ def test_split_by_bfield_creates_correct_dictionary(mock_config):
     assert "andere_spalte" not in processor.bfield_dict["b11-2"].columns
 
 
+@pytest.mark.parametrize("optimize", [False, True])
+def test_occparsing_pipeline_long_storage_mode_matches_wide(mock_config, mock_occ_xml_content, optimize):
+    """Tests that the long b-field store yields the same per-field frames and dtypes as the wide split"""
+    raw_dir = mock_config.paths.raw_data_dir
+    for i in range(3):
+        (raw_dir / f"beschreibung_beruf_{i}_2024.xml").write_text(mock_occ_xml_content)
+
+    wide_params = dataclasses.replace(mock_config.params, optimize_dtypes=optimize)
+    wide = XMLProcessor(config=dataclasses.replace(mock_config, params=wide_params)).run_occparsing_pipeline(
+        save=False
+    )
+    params = dataclasses.replace(wide_params, storage_mode="long")
+    long = XMLProcessor(config=dataclasses.replace(mock_config, params=params)).run_occparsing_pipeline(save=False)
+
+    assert sorted(long) == sorted(wide)
+    for bfield in wide:
+        assert long[bfield].dtypes.to_dict() == wide[bfield].dtypes.to_dict()
+        pd.testing.assert_frame_equal(
+            long[bfield].sort_index(), wide[bfield].sort_index(), check_like=True
+        )
+
+
 def test_explode_tasks_increases_row_count():
     """Tests static method explode_tasks"""
     mock_data = {
@@ -152,3 +321,158 @@ def test_explode_tasks_increases_row_count():
     assert exploded_df.iloc[0]["task_list"] == 'A'
     assert exploded_df.iloc[1]["task_list"] == 'B'
     assert "id" in exploded_df.columns
+
+
+def test_explode_tasks_keeps_parent_keys_and_adds_task_no():
+    """Tests that exploded tasks can be joined back to their occupation-year"""
+    index = pd.MultiIndex.from_tuples([(1, 2020), (2, 2020), (3, 2021)], names=["dkz_id", "year"])
+    df = pd.DataFrame({
+        "b11-2_text": [["A", "B"], [], ["C"]],
+        "b11-2_revd": ["r1", "r2", "r3"]
+    }, index=index)
+
+    exploded_df = XMLProcessor.explode_tasks(df, "b11-2_text")
+    expected = df.explode("b11-2_text")
+
+    assert exploded_df.index.names == ["dkz_id", "year", "task_no"]
+    assert list(exploded_df.index) == [(1, 2020, 0), (1, 2020, 1), (2, 2020, 0), (3, 2021, 0)]
+    assert exploded_df["b11-2_text"].tolist()[:2] == ["A", "B"]
+    assert pd.isna(exploded_df["b11-2_text"].iloc[2])
+    assert exploded_df["b11-2_revd"].tolist() == expected["b11-2_revd"].tolist()
+    assert df["b11-2_text"].iloc[0] == ["A", "B"]  # input untouched
+
+
+def test_occparsing_checkpoint_roundtrip_and_fingerprint(mock_config, mock_occ_xml_content):
+    """Tests that the saved b-field dictionary loads back and that input changes alter the fingerprint"""
+    raw_dir = mock_config.paths.raw_data_dir
+    for i in range(2):
+        (raw_dir / f"beschreibung_beruf_{i}_2024.xml").write_text(mock_occ_xml_content)
+
+    processor = XMLProcessor(config=mock_config)
+    parsed = processor.run_occparsing_pipeline(save=True)
+    before = processor.occ_fingerprint()
+
+    loaded = XMLProcessor(config=mock_config).load_bfield_dict()
+    assert sorted(loaded) == sorted(parsed)
+    for bfield in parsed:
+        pd.testing.assert_frame_equal(loaded[bfield], parsed[bfield])
+
+    assert XMLProcessor(config=mock_config).occ_fingerprint() == before
+    (raw_dir / "beschreibung_beruf_2_2024.xml").write_text(mock_occ_xml_content)
+    assert processor.occ_fingerprint() != before
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parsing_from_archives_matches_unpacked_files(mock_config, mock_occ_xml_content, tmp_path, workers):
+    """Tests that zip and tar.gz deliveries give the same b-fields as unpacked files"""
+    import tarfile
+    import zipfile
+    import src.sources
+
+    unpacked = XMLProcessor(config=mock_config)
+    for i in range(4):
+        (mock_config.paths.raw_data_dir / f"beschreibung_beruf_{i}_2024.xml").write_text(mock_occ_xml_content)
+    expected = unpacked.run_occparsing_pipeline(save=False)
+
+    archive_dir = tmp_path / "archives"
+    archive_dir.mkdir()
+    with zipfile.ZipFile(archive_dir / "part1.zip", "w") as zf:
+        for i in range(2):
+            zf.writestr(f"xml/beschreibung_beruf_{i}_2024.xml", mock_occ_xml_content)
+        zf.writestr("xml/beschreibung_beruf_9_2024.xml", "<beruf><b11-0>")  # malformed
+    with tarfile.open(archive_dir / "part2.tar.gz", "w:gz") as tf:
+        for i in range(2, 4):
+            tf.add(mock_config.paths.raw_data_dir / f"beschreibung_beruf_{i}_2024.xml",
+                   arcname=f"beschreibung_beruf_{i}_2024.xml")
+
+    paths = dataclasses.replace(mock_config.paths, raw_data_dir=archive_dir)
+    params = dataclasses.replace(mock_config.params, parse_workers=workers, parse_chunksize=1)
+    processor = XMLProcessor(config=dataclasses.replace(mock_config, paths=paths, params=params))
+    result = processor.run_occparsing_pipeline(save=False)
+
+    assert len(processor.failed_files) == 1
+    assert processor.failed_files[0].endswith("part1.zip!/xml/beschreibung_beruf_9_2024.xml")
+    # zip files opened for parsing are closed again
+    assert src.sources._open_zips == {}
+    for bfield in expected:
+        pd.testing.assert_frame_equal(result[bfield].sort_index(), expected[bfield].sort_index())
+
+
+def test_pool_prefetch_is_bounded_by_max_in_flight(mock_config):
+    """Tests that a sized stream shrinks the batches submitted to the worker pool and the files held by it"""
+    from concurrent.futures import Future
+
+    class RecordingExecutor:
+        def __init__(self):
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        def submit(self, func, batch):
+            self.in_flight += len(batch)
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            future = Future()
+            future.set_result([({"file": item}, None) for item in batch])
+            return future
+
+    params = dataclasses.replace(mock_config.params, parse_workers=2, parse_chunksize=8)
+    processor = XMLProcessor(config=dataclasses.replace(mock_config, params=params))
+    executor = RecordingExecutor()
+    files = [f"file_{i}" for i in range(40)]
+
+    keys = []
+    for key, row, error in processor._iter_pool_results(
+            executor, None, files, lambda batch: batch, max_in_flight=lambda: 3
+    ):
+        keys.append(key)
+        executor.in_flight -= 1
+    assert keys == files
+    assert executor.max_in_flight == 3
+
+    # unbounded: two batches of parse_chunksize per worker
+    executor = RecordingExecutor()
+    for _ in processor._iter_pool_results(executor, None, files, lambda batch: batch):
+        executor.in_flight -= 1
+    assert executor.max_in_flight == 32
+
+
+def test_iter_occupations_streams_records_and_batches(mock_config, mock_occ_xml_content):
+    """Tests the lazy record/batch API and that streamed b-field batches add up to the in-memory result"""
+    raw_dir = mock_config.paths.raw_data_dir
+    for i in range(5):
+        (raw_dir / f"beschreibung_beruf_{i}_2024.xml").write_text(mock_occ_xml_content)
+    (raw_dir / "beschreibung_beruf_9_2024.xml").write_text("<beruf><b11-0>")
+
+    processor = XMLProcessor(config=mock_config)
+    records = processor.iter_occupations()
+    first = next(records)
+    assert set(first) >= {"dkz_id", "year", "b11-0_text", "b11-2_text"}
+    assert len(list(records)) == 4
+    assert len(processor.failed_files) == 1
+
+    assert [len(batch) for batch in processor.iter_occupations(batch_size=2)] == [2, 2, 1]
+
+    expected = XMLProcessor(config=mock_config).run_occparsing_pipeline(save=False)
+    batches = list(XMLProcessor(config=mock_config).iter_bfield_batches(batch_size=2))
+    assert len(batches) == 3
+    for bfield in expected:
+        streamed = pd.concat([batch[bfield] for batch in batches])
+        pd.testing.assert_frame_equal(streamed.sort_index(), expected[bfield].sort_index())
+
+
+def test_spilled_parsing_matches_in_memory_result(mock_config, mock_occ_xml_content):
+    """Tests that budgeted parsing spills sized batches that add up to the in-memory result"""
+    from src.memory import BatchSizer, SpillStore
+    raw_dir = mock_config.paths.raw_data_dir
+    for i in range(5):
+        (raw_dir / f"beschreibung_beruf_{i}_2024.xml").write_text(mock_occ_xml_content)
+
+    spill = SpillStore(mock_config.paths.intermediate_data_dir / "spill")
+    sizer = BatchSizer(budget_mb=10 ** 6, initial=2, maximum=2)
+    XMLProcessor(config=mock_config).run_occparsing_spilled(spill, sizer)
+
+    expected = XMLProcessor(config=mock_config).run_occparsing_pipeline(save=False)
+    batches = list(spill.iter_batches())
+    assert len(batches) == 3
+    for bfield in expected:
+        spilled = pd.concat([batch[bfield] for batch in batches])
+        pd.testing.assert_frame_equal(spilled.sort_index(), expected[bfield].sort_index())